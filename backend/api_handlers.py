@@ -0,0 +1,376 @@
+"""
+Lógica de los endpoints /api/* sin depender del framework.
+
+Cada función devuelve un ApiResult (payload, status, ETag) y tanto app_V0
+(Flask, WSGI) como asgi_app (Quart, ASGI) se limitan a leer la petición y
+convertir el resultado en respuesta HTTP, así ambos sirven exactamente lo mismo.
+"""
+import hashlib
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from euroleague_api_wrappers.standings_wrapper import get_euroleague_standings, get_live_euroleague_standings
+from euroleague_api_wrappers.scheduled_games_wrapper import (
+    get_scheduled_matches,
+    get_scheduled_matches_for_team,
+    get_scheduled_matches_between,
+)
+from euroleague_api_wrappers.played_matches_wrapper import get_played_matches, get_all_played_matches
+from euroleague_api_wrappers.season_utils import get_current_season_code, get_latest_round
+from euroleague_api_wrappers import season_archive
+from euroleague_api_wrappers.season_archive import get_team_results, get_head_to_head, get_archived_standings
+from euroleague_api_wrappers.team_registry import get_teams
+
+from response_cache import cached_endpoint, cached_endpoint_body
+from scrapper.models import MatchDetails, field_names
+import encoded_json
+import match_timeline
+from app_logging import get_logger
+from live_cache_manager import (
+    get_cached_match_details,
+    get_cached_match_details_batch,
+    get_live_snapshot,
+    get_live_matches_body,
+    get_live_matches_since,
+    match_id_from_url,
+)
+
+logger = get_logger(__name__)
+
+# status 304 => payload None: responder "Not Modified" con el ETag.
+# body (encoded_json.EncodedBody) => respuesta ya serializada y comprimida: se
+# sirve tal cual, eligiendo la variante por Accept-Encoding, y el ETag
+# (fuerte) y el 304 salen de ella.
+ApiResult = namedtuple("ApiResult", ["payload", "status", "etag", "weak", "body"], defaults=[200, None, False, None])
+
+
+def _encoded(body):
+    return ApiResult(None, body=body)
+
+# Campos que se pueden pedir con ?fields= (los de scrapper.models.MatchDetails)
+DETAILS_FIELDS = set(field_names(MatchDetails))
+
+# Campos que necesita la tarjeta de un partido (sin estadísticas de jugadores/equipo)
+_CARD_FIELDS = ["home_team", "away_team", "home_team_id", "away_team_id", "quarter_scores"]
+DETAILS_VIEWS = {
+    "card": _CARD_FIELDS,
+    # Tarjeta desplegada: top 3 y estadísticas básicas, sin las tablas completas
+    "summary": _CARD_FIELDS + ["top_player_stats", "team_statistics"],
+}
+
+# Cada cuánto se manda un comentario a los clientes SSE para mantener viva la conexión
+SSE_KEEPALIVE = 15
+# Jornadas de una temporada (liga regular, play-in, playoffs y Final Four
+# caben de sobra): fuera de este rango no se consulta ni se cachea nada
+MAX_ROUND = 50
+
+
+def _latest_round():
+    return get_latest_round(get_current_season_code())
+
+
+def current_round():
+    try:
+        round_number = cached_endpoint("current_round", _latest_round)
+        return ApiResult({"round": round_number})
+    except Exception as e:
+        logger.error("❌ Error fetching current round: %s", e)
+        return ApiResult({"error": "Could not fetch round"}, 500)
+
+
+def all_played_matches():
+    try:
+        return _encoded(cached_endpoint_body("all_played_matches", get_all_played_matches))
+    except Exception as e:
+        logger.error("❌ Error en /api/all_played_matches: %s", e)
+        return ApiResult([], 500)
+
+
+def _invalid_round(round_param):
+    return round_param is not None and not 1 <= round_param <= MAX_ROUND
+
+
+def played_matches(round_param):
+    if _invalid_round(round_param):
+        return ApiResult({"error": f"Invalid round, expected 1-{MAX_ROUND}"}, 400)
+    try:
+        return _encoded(cached_endpoint_body("played_matches", get_played_matches, round_param))
+    except Exception as e:
+        logger.error("❌ Error en /api/played_matches: %s", e)
+        return ApiResult([], 500)
+
+
+def euroleague_standings(live=False):
+    try:
+        if live:
+            # Barato (se calcula sobre la tabla local): no pasa por la caché de respuestas
+            return ApiResult(get_live_euroleague_standings(get_live_snapshot()["matches"]))
+        return _encoded(cached_endpoint_body("euroleague_standings", get_euroleague_standings))
+    except Exception as e:
+        logger.error("❌ Error en /api/euroleague_standings: %s", e)
+        return ApiResult([], 500)
+
+
+def _date_range(date_from, date_to):
+    """
+    (inicio, fin) de un rango from/to en formato YYYY-MM-DD, con `to` incluido.
+    Lanza ValueError si alguna fecha no es válida.
+    """
+    start = datetime.strptime(date_from, "%Y-%m-%d") if date_from else datetime.min
+    if not date_to:
+        return start, datetime.max
+    end = datetime.strptime(date_to, "%Y-%m-%d")
+    return start, end + timedelta(days=1) if end.date() < datetime.max.date() else datetime.max
+
+
+def scheduled_matches(round_param, team_param=None, date_from=None, date_to=None):
+    if _invalid_round(round_param):
+        return ApiResult({"error": f"Invalid round, expected 1-{MAX_ROUND}"}, 400)
+    if not team_param and (date_from or date_to):
+        try:
+            start, end = _date_range(date_from, date_to)
+        except ValueError:
+            return ApiResult({"error": "Invalid date, expected YYYY-MM-DD"}, 400)
+    try:
+        # Equipo y rango de fechas se resuelven directamente sobre el índice del calendario
+        if team_param:
+            matches = get_scheduled_matches_for_team(team_param)
+        elif date_from or date_to:
+            matches = get_scheduled_matches_between(start, end)
+        # Si el parámetro de round está presente, lo pasamos al wrapper
+        elif round_param:
+            return _encoded(cached_endpoint_body("scheduled_matches", get_scheduled_matches, round_param))
+        else:
+            # Si no se pasa ningún parámetro, devolvemos todos los partidos programados
+            return _encoded(cached_endpoint_body("scheduled_matches", get_scheduled_matches))
+
+        return ApiResult(matches)
+
+    except Exception as e:
+        logger.error("❌ Error en /api/scheduled_matches: %s", e)
+        return ApiResult([], 500)
+
+
+def teams():
+    """
+    Registro canónico de equipos: id (código de club), nombre, alias y escudo.
+    """
+    return ApiResult(get_teams())
+
+
+def _archive_status(since, until, standings=False):
+    # 202: el archivo se está rellenando y la respuesta puede estar incompleta
+    return 202 if season_archive.pending(since, until, standings) else 200
+
+
+def archive_team_results(team, since=None, until=None):
+    if not team:
+        return ApiResult({"error": "Missing team"}, 400)
+    try:
+        results = get_team_results(team, since, until)
+        return ApiResult(results, _archive_status(since, until))
+    except Exception as e:
+        logger.error("❌ Error en /api/archive/team_results: %s", e)
+        return ApiResult([], 500)
+
+
+def archive_head_to_head(team1, team2, since=None, until=None):
+    if not team1 or not team2:
+        return ApiResult({"error": "Missing team1/team2"}, 400)
+    try:
+        head_to_head = get_head_to_head(team1, team2, since, until)
+        return ApiResult(head_to_head, _archive_status(since, until))
+    except Exception as e:
+        logger.error("❌ Error en /api/archive/head_to_head: %s", e)
+        return ApiResult({"error": "Could not read archive"}, 500)
+
+
+def archive_standings(season):
+    if season is None:
+        return ApiResult({"error": "Missing season"}, 400)
+    try:
+        standings = get_archived_standings(season)
+        return ApiResult(standings, _archive_status(season, season, standings=True))
+    except Exception as e:
+        logger.error("❌ Error en /api/archive/standings: %s", e)
+        return ApiResult([], 500)
+
+
+def live_matches(since, if_none_match):
+    """
+    Con since=<version> sólo devuelve los partidos cambiados desde esa versión
+    (más "removed"). 304 si el If-None-Match coincide con la versión actual.
+    Sin since se sirve el snapshot ya serializado de la versión actual.
+    """
+    if since is None:
+        return _encoded(get_live_matches_body())
+
+    payload = get_live_matches_since(since)
+    etag = f"live-{payload['version']}-since-{since}"
+    if if_none_match.contains_weak(etag):
+        return ApiResult(None, 304, etag, True)
+
+    logger.debug("🟡 FLASK accede a cache. Tamaño: %d", len(payload["matches"]))
+    return ApiResult(payload, 200, etag, True)
+
+
+def match_details(url, since, if_none_match):
+    if not url:
+        return ApiResult({"error": "Missing URL"}, 400)
+
+    data = get_cached_match_details(url)
+    if not data:
+        return ApiResult({"error": "No cached details for this match"}, 404)
+
+    if (since is not None and data.version <= since) or data.hash in if_none_match:
+        return ApiResult(None, 304, data.hash)
+    return ApiResult(data, 200, data.hash)
+
+
+def _timeline_id(match_id, url):
+    return match_id or (match_id_from_url(url) if url else None)
+
+
+def match_timeline_entries(match_id, url, kind=None, since=None, until=None):
+    """
+    Cambios de un partido a lo largo del tiempo (?id= o ?url=), para gráficos de rachas y repeticiones.
+    """
+    match_id = _timeline_id(match_id, url)
+    if not match_id:
+        return ApiResult({"error": "Missing id or url"}, 400)
+    if kind and kind not in match_timeline.KINDS:
+        return ApiResult({"error": f"Unknown kind '{kind}'"}, 400)
+    timeline = match_timeline.get_timeline(match_id, kind, since, until)
+    if timeline is None:
+        return ApiResult({"error": "No timeline for this match"}, 404)
+    return ApiResult(timeline)
+
+
+def match_state_at(match_id, url, at=None):
+    match_id = _timeline_id(match_id, url)
+    if not match_id:
+        return ApiResult({"error": "Missing id or url"}, 400)
+    state = match_timeline.get_state_at(match_id, at)
+    if state is None:
+        return ApiResult({"error": "No timeline for this match at that time"}, 404)
+    return ApiResult(state)
+
+
+def _split_list(values):
+    items = []
+    for value in values:
+        items += [item for item in value.split(",") if item]
+    return items
+
+
+def _content_etag(urls, ids, fields, details, missing):
+    """
+    ETag de la respuesta del lote: lo pedido, el hash de cada partido
+    encontrado y los que faltan. No depende de la versión global, así que
+    sólo cambia cuando cambia algo de lo pedido.
+    """
+    key = "|".join([
+        ",".join(fields or []),
+        ",".join(urls or []),
+        ",".join(ids or []),
+        ",".join(f"{url}={d.hash}" for url, d in sorted(details.items())),
+        ",".join(missing),
+    ])
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+
+def _flag(value):
+    # ?all=1 / ?all=true, o true en el JSON; "0" y "false" no activan nada
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "on")
+    return value is True or value == 1
+
+
+def batch_args_from_query(args):
+    """
+    ?url=...&url=...  |  ?id=abc,def  |  sin parámetros = todos los en vivo
+    &fields=quarter_scores,home_team_id  o  &view=card
+    """
+    urls = args.getlist("url") or None
+    ids = _split_list(args.getlist("id")) or None
+    if _flag(args.get("all")):
+        urls = ids = None
+    return urls, ids, _split_list(args.getlist("fields")) or None, args.get("view")
+
+
+def batch_args_from_body(body):
+    """
+    {"urls": [...], "ids": [...], "all": true, "fields": [...], "view": "card"}
+
+    Lanza ValueError si el cuerpo no tiene esa forma (p. ej. "urls" como
+    cadena suelta en vez de lista).
+    """
+    body = {} if body is None else body
+    if not isinstance(body, dict):
+        raise ValueError("Body must be a JSON object")
+    for name in ("urls", "ids", "fields"):
+        value = body.get(name)
+        if value is not None and not (isinstance(value, list) and all(isinstance(item, str) for item in value)):
+            raise ValueError(f"'{name}' must be a list of strings")
+    if body.get("view") is not None and not isinstance(body["view"], str):
+        raise ValueError("'view' must be a string")
+    urls = body.get("urls")
+    ids = body.get("ids")
+    if _flag(body.get("all")):
+        urls = ids = None
+    return urls, ids, body.get("fields"), body.get("view")
+
+
+def match_details_batch(urls, ids, fields, view, if_none_match):
+    if view:
+        if view not in DETAILS_VIEWS:
+            return ApiResult({"error": f"Unknown view '{view}'"}, 400)
+        fields = DETAILS_VIEWS[view]
+    elif fields:
+        unknown = [name for name in fields if name not in DETAILS_FIELDS]
+        if unknown:
+            return ApiResult({"error": f"Unknown fields: {', '.join(unknown)}"}, 400)
+
+    version, details, missing = get_cached_match_details_batch(urls=urls, ids=ids)
+    etag = _content_etag(urls, ids, fields, details, missing)
+    if etag in if_none_match:
+        return ApiResult(None, 304, etag)
+
+    if fields:
+        # version, hash y error siempre, para poder usar ?since= / If-None-Match por partido
+        keep = set(fields) | {"version", "hash", "error"}
+        details = {
+            url: {name: getattr(d, name) for name in field_names(d) if name in keep}
+            for url, d in details.items()
+        }
+
+    return ApiResult({"version": version, "details": details, "missing": missing}, 200, etag)
+
+
+def sse_event(event, data, event_id):
+    return f"id: {event_id}\nevent: {event}\ndata: {encoded_json.dumps(data).decode()}\n\n"
+
+
+SSE_KEEPALIVE_COMMENT = ": keepalive\n\n"
+
+
+def sse_start(last_event_id):
+    """
+    Primer paso de /api/live_stream. Devuelve (versión desde la que seguir,
+    evento inicial o None si el cliente reanuda con Last-Event-ID).
+    """
+    snapshot = get_live_snapshot()
+    if last_event_id is not None and last_event_id <= snapshot["version"]:
+        return last_event_id, None
+    return snapshot["version"], sse_event("snapshot", snapshot, snapshot["version"])
+
+
+def sse_update(update):
+    """
+    Convierte el resultado de wait_for_changes en (nueva versión, evento).
+    """
+    event = "snapshot" if update.pop("resync") else "update"
+    return update["version"], sse_event(event, update, update["version"])
+
+
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
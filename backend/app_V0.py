@@ -1,113 +1,242 @@
 import sys
 import os
+import threading
+import time
 sys.path.append(os.path.join(os.path.dirname(__file__), "euroleague_api", "src"))
 
 
-from flask import Flask, jsonify, request, render_template
+from flask import Flask, jsonify, request, render_template, Response, g
 from flask_cors import CORS
-from scrapper.scrapper import get_live_matches, get_match_details
-from euroleague_api_wrappers.standings_wrapper import get_euroleague_standings
-from euroleague_api_wrappers.scheduled_games_wrapper import get_scheduled_matches
-from euroleague_api_wrappers.played_matches_wrapper import get_played_matches, get_all_played_matches
-from euroleague_api_wrappers.season_utils import get_current_season_code, get_latest_round
 
+import api_handlers
+import encoded_json
+import metrics
+import tipoff_prefetcher
+import warmup
+from response_cache import get_cache_stats
+from shared_cache import get_shared_mode_stats
 from live_cache_manager import (
-    get_cached_live_matches,
-    get_cached_match_details,
     start_background_scrapper,
-    get_last_updated_time,
+    get_scraper_stats,
+    wait_for_changes,
 )
 
 # Inicializa la aplicación Flask
 app = Flask(__name__, template_folder="frontend", static_folder="static")
 CORS(app)
 
+# Cada cliente SSE ocupa un hilo del worker mientras está conectado (con
+# gunicorn --threads 8, 8 pestañas abiertas dejarían al worker sin hilos para
+# /api/*). Por encima del límite se contesta 503 y el cliente sigue con el
+# polling de /api/live_matches?since=. Sin límite: asgi_app o un worker gevent.
+SSE_MAX_STREAMS = int(os.environ.get("FLASK_SSE_MAX_STREAMS", "4"))
+_sse_slots = threading.BoundedSemaphore(SSE_MAX_STREAMS)
+
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+
+@app.after_request
+def observe_request(response):
+    started = g.pop("request_started", None)
+    if started is not None:
+        metrics.http_request_seconds.observe(
+            time.perf_counter() - started,
+            endpoint=request.url_rule.rule if request.url_rule else "unmatched",
+            method=request.method,
+            status=response.status_code,
+        )
+    return response
+
+
 @app.route('/')
 def home():
     return render_template("index.html")
 
+
+def _not_modified(etag, weak=False):
+    response = Response(status=304)
+    response.set_etag(etag, weak=weak)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+def _respond(result):
+    """
+    Convierte un api_handlers.ApiResult en respuesta Flask.
+    """
+    if result.body is not None:
+        status, data, headers = encoded_json.http_parts(
+            result.body, request.headers.get("Accept-Encoding"), request.if_none_match
+        )
+        return Response(data, status=status, headers=headers)
+    if result.status == 304:
+        return _not_modified(result.etag, result.weak)
+    # orjson: serializa directamente los registros de scrapper.models
+    response = Response(encoded_json.dumps(result.payload), status=result.status, mimetype="application/json")
+    if result.etag:
+        response.set_etag(result.etag, weak=result.weak)
+        response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
 @app.route("/api/current_round")
 def current_round():
-    try:
-        season = get_current_season_code()
-        round_number = get_latest_round(season)
-        return jsonify({"round": round_number})
-    except Exception as e:
-        print("❌ Error fetching current round:", e)
-        return jsonify({"error": "Could not fetch round"}), 500
+    return _respond(api_handlers.current_round())
     
 @app.route("/api/all_played_matches", methods=["GET"])
 def api_all_played_matches():
-    try:
-        matches = get_all_played_matches()
-        return jsonify(matches)
-    except Exception as e:
-        print(f"❌ Error en /api/all_played_matches: {e}")
-        return jsonify([]), 500
+    return _respond(api_handlers.all_played_matches())
 
 
 @app.route("/api/played_matches", methods=["GET"])
 def api_played_matches():
-    try:
-        round_param = request.args.get("round", default=None, type=int)
-        matches = get_played_matches(round=round_param)
-        return jsonify(matches)
-    except Exception as e:
-        print(f"❌ Error en /api/played_matches: {e}")
-        return jsonify([]), 500
+    round_param = request.args.get("round", default=None, type=int)
+    return _respond(api_handlers.played_matches(round_param))
 
 
 
 @app.route("/api/live_matches", methods=["GET"])
 def api_live_matches():
-    data = get_cached_live_matches()
-    last_updated = get_last_updated_time()
-    print("🟡 FLASK accede a cache. Tamaño:", len(data))
-    return jsonify({
-        "last_updated": last_updated,
-        "matches": data
-    })
-           
+    since = request.args.get("since", type=int)
+    return _respond(api_handlers.live_matches(since, request.if_none_match))
+
 
 
 @app.route("/api/match_details")
 def api_match_details():
     url = request.args.get("url")
-    if not url:
-        return jsonify({"error": "Missing URL"}), 400
-
-    data = get_cached_match_details(url)
-    if data:
-        return jsonify(data)
+    since = request.args.get("since", type=int)
+    return _respond(api_handlers.match_details(url, since, request.if_none_match))
+
+
+@app.route("/api/match_details/batch", methods=["GET", "POST"])
+def api_match_details_batch():
+    """
+    Detalles de varios partidos en una sola respuesta (ver api_handlers.batch_args_*).
+    """
+    if request.method == "POST":
+        try:
+            args = api_handlers.batch_args_from_body(request.get_json(silent=True))
+        except ValueError as e:
+            return _respond(api_handlers.ApiResult({"error": str(e)}, 400))
     else:
-        return jsonify({"error": "No cached details for this match"}), 404
+        args = api_handlers.batch_args_from_query(request.args)
+    return _respond(api_handlers.match_details_batch(*args, request.if_none_match))
+
+
+@app.route("/api/match_timeline")
+def api_match_timeline():
+    return _respond(api_handlers.match_timeline_entries(
+        request.args.get("id"),
+        request.args.get("url"),
+        kind=request.args.get("kind"),
+        since=request.args.get("since", type=float),
+        until=request.args.get("until", type=float),
+    ))
+
+@app.route("/api/match_state")
+def api_match_state():
+    return _respond(api_handlers.match_state_at(
+        request.args.get("id"), request.args.get("url"), at=request.args.get("at", type=float)
+    ))
+
+@app.route("/api/live_stream")
+def api_live_stream():
+    """
+    Server-Sent Events: al conectar manda un snapshot con partidos y detalles;
+    después sólo los partidos/detalles que cambian en cada publicación.
+    Al reconectar, el navegador envía Last-Event-ID y se reanuda desde ahí.
+    Como mucho SSE_MAX_STREAMS conexiones por proceso; el resto recibe 503.
+    """
+    if not _sse_slots.acquire(blocking=False):
+        return jsonify({"error": "Too many live streams, poll /api/live_matches?since="}), 503, {"Retry-After": "30"}
+    last_event_id = request.headers.get("Last-Event-ID", type=int)
+
+    def stream():
+        version, first_event = api_handlers.sse_start(last_event_id)
+        if first_event:
+            yield first_event
+
+        while True:
+            update = wait_for_changes(version, timeout=api_handlers.SSE_KEEPALIVE)
+            if update is None:
+                yield api_handlers.SSE_KEEPALIVE_COMMENT
+                continue
+            version, event = api_handlers.sse_update(update)
+            yield event
+
+    response = Response(stream(), mimetype="text/event-stream", headers=api_handlers.SSE_HEADERS)
+    # Al cerrar la respuesta (cliente desconectado) se libera el hueco, aunque el generador no llegara a arrancar
+    response.call_on_close(_sse_slots.release)
+    return response
+
+
+@app.route("/api/scraper_stats")
+def api_scraper_stats():
+    stats = get_scraper_stats()
+    stats["shared_mode"] = get_shared_mode_stats()
+    stats["warmup"] = warmup.get_warmup_stats()
+    stats["tipoff_prefetch"] = tipoff_prefetcher.get_prefetch_stats()
+    return jsonify(stats)
+
+
+@app.route("/metrics")
+def api_metrics():
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+
+@app.route("/api/cache_stats")
+def api_cache_stats():
+    return jsonify(get_cache_stats())
 
 
 @app.route("/api/euroleague_standings")
 def euroleague_standings():
-    standings = get_euroleague_standings()
-    return jsonify(standings)
+    return _respond(api_handlers.euroleague_standings(request.args.get("live", type=int) == 1))
 
 @app.route("/api/scheduled_matches", methods=["GET"])
 def scheduled_matches():
-    # Obtener el parámetro "round" de la query string
-    round_param = request.args.get("round", default=None, type=int)
-    
-    try:
-        # Si el parámetro de round está presente, lo pasamos al wrapper
-        if round_param:
-            matches = get_scheduled_matches(round=round_param)
-        else:
-            # Si no se pasa ningún parámetro, devolvemos todos los partidos programados
-            matches = get_scheduled_matches()
-        
-        return jsonify(matches)
-    
-    except Exception as e:
-        print(f"❌ Error en /api/scheduled_matches: {e}")
-        return jsonify([]), 500
+    # Obtener los parámetros de la query string
+    return _respond(api_handlers.scheduled_matches(
+        request.args.get("round", default=None, type=int),
+        team_param=request.args.get("team"),
+        date_from=request.args.get("from"),
+        date_to=request.args.get("to"),
+    ))
+
+@app.route("/api/teams")
+def api_teams():
+    return _respond(api_handlers.teams())
+
+@app.route("/api/archive/team_results")
+def api_archive_team_results():
+    return _respond(api_handlers.archive_team_results(
+        request.args.get("team"),
+        since=request.args.get("since", type=int),
+        until=request.args.get("until", type=int),
+    ))
+
+
+@app.route("/api/archive/head_to_head")
+def api_archive_head_to_head():
+    return _respond(api_handlers.archive_head_to_head(
+        request.args.get("team1"),
+        request.args.get("team2"),
+        since=request.args.get("since", type=int),
+        until=request.args.get("until", type=int),
+    ))
+
+
+@app.route("/api/archive/standings")
+def api_archive_standings():
+    return _respond(api_handlers.archive_standings(request.args.get("season", type=int)))
 
 # ✅ Lanza el hilo del scrapper dentro del main
 if __name__ == "__main__":
     start_background_scrapper()
+    tipoff_prefetcher.start()
+    warmup.start_warm_up()
     app.run(debug=True, host="0.0.0.0", port=5000)
@@ -0,0 +1,80 @@
+"""
+Logging de la app: niveles en lugar de print y sin coste de E/S en el hilo
+que atiende la petición.
+
+- get_logger(__name__) devuelve un logger bajo "liveapp". El nivel se
+  controla con LOG_LEVEL (INFO por defecto).
+- Los registros se encolan (QueueHandler) y un único hilo los escribe en
+  stdout (QueueListener).
+- RateLimitFilter limita cada mensaje (por logger y plantilla, sin los
+  argumentos) a LOG_RATE_LIMIT apariciones por LOG_RATE_WINDOW segundos; lo
+  descartado se resume en el siguiente mensaje que pasa. Por eso los
+  mensajes repetitivos usan logger.info("... %s", valor) y no f-strings.
+"""
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+LOG_RATE_LIMIT = int(os.environ.get("LOG_RATE_LIMIT", "20"))
+LOG_RATE_WINDOW = float(os.environ.get("LOG_RATE_WINDOW", "60"))
+
+ROOT_LOGGER = "liveapp"
+
+
+class RateLimitFilter(logging.Filter):
+    def __init__(self, limit=LOG_RATE_LIMIT, window=LOG_RATE_WINDOW):
+        super().__init__()
+        self.limit = limit
+        self.window = window
+        self._windows = {}  # (logger, plantilla) -> [inicio de ventana, emitidos, suprimidos]
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        key = (record.name, record.msg)
+        now = time.monotonic()
+        with self._lock:
+            state = self._windows.get(key)
+            if state is None or now - state[0] >= self.window:
+                suppressed = state[2] if state else 0
+                self._windows[key] = [now, 1, 0]
+                if suppressed:
+                    record.msg = f"{record.msg} (+{suppressed} iguales suprimidos)"
+                return True
+            if state[1] < self.limit:
+                state[1] += 1
+                return True
+            state[2] += 1
+            return False
+
+
+def _configure():
+    root = logging.getLogger(ROOT_LOGGER)
+    if root.handlers:
+        return root
+    root.setLevel(LOG_LEVEL)
+    root.propagate = False
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(RateLimitFilter())
+    root.addHandler(queue_handler)
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    listener.start()
+    atexit.register(listener.stop)
+    return root
+
+
+_configure()
+
+
+def get_logger(name):
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
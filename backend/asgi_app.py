@@ -0,0 +1,294 @@
+"""
+Modo de servicio asíncrono (ASGI) con las mismas rutas y respuestas que app_V0:
+
+    uvicorn asgi_app:app --host 0.0.0.0 --port 5000 --workers 4
+
+- Las llamadas a la API de la Euroliga (bloqueantes: euroleague_api usa
+  requests) corren en un pool de hilos acotado (UPSTREAM_WORKERS), así una API
+  lenta no bloquea el event loop ni a los endpoints que leen de memoria.
+- Los endpoints en vivo leen la caché directamente en el loop; si el snapshot
+  de la versión actual aún no está codificado, la codificación va al executor.
+- El SSE no ocupa un hilo por cliente: un único hilo vigila la versión de la
+  caché y despierta a todos los clientes con un asyncio.Event.
+- El arranque del scraper (elección de líder, chromedriver) se hace en un
+  executor, como en wsgi.py.
+"""
+import asyncio
+import functools
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "euroleague_api", "src"))
+
+from quart import Quart, Response, g, jsonify, render_template, request
+
+import api_handlers
+import encoded_json
+import metrics
+import live_cache_manager
+import tipoff_prefetcher
+import warmup
+from response_cache import get_cache_stats
+from shared_cache import get_shared_mode_stats, start_shared_mode
+
+UPSTREAM_WORKERS = int(os.environ.get("ASGI_UPSTREAM_WORKERS", "16"))
+# Como flask_cors en app_V0: cualquier origen, y el preflight acepta las cabeceras que pida el cliente
+CORS_ALLOW_METHODS = "GET, POST, OPTIONS"
+CORS_MAX_AGE = "600"
+
+app = Quart(__name__, template_folder="frontend", static_folder="static")
+upstream_executor = ThreadPoolExecutor(max_workers=UPSTREAM_WORKERS, thread_name_prefix="upstream")
+
+_cache_changed_event = None  # asyncio.Event que se sustituye en cada cambio de versión
+
+
+async def _upstream(fn, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(upstream_executor, functools.partial(fn, *args, **kwargs))
+
+
+def _signal_cache_changed():
+    global _cache_changed_event
+    event, _cache_changed_event = _cache_changed_event, asyncio.Event()
+    event.set()
+
+
+def _watch_cache_version(loop):
+    version = None
+    while True:
+        with live_cache_manager.cache_changed:
+            changed = live_cache_manager.cache_changed.wait_for(
+                lambda: live_cache_manager.cache_version != version, timeout=api_handlers.SSE_KEEPALIVE
+            )
+            version = live_cache_manager.cache_version
+        if changed:
+            loop.call_soon_threadsafe(_signal_cache_changed)
+
+
+@app.before_serving
+async def startup():
+    global _cache_changed_event
+    loop = asyncio.get_running_loop()
+    _cache_changed_event = asyncio.Event()
+    threading.Thread(target=_watch_cache_version, args=(loop,), daemon=True, name="sse-watch").start()
+    await loop.run_in_executor(None, start_shared_mode)
+    warmup.start_warm_up()
+
+
+@app.before_request
+async def start_request_timer():
+    g.request_started = time.perf_counter()
+
+
+@app.after_request
+async def add_cors_headers(response):
+    response.headers.setdefault("Access-Control-Allow-Origin", "*")
+    if request.method == "OPTIONS":
+        # Preflight (p. ej. el POST JSON de /api/match_details/batch): Quart ya contesta el OPTIONS
+        response.headers["Access-Control-Allow-Methods"] = CORS_ALLOW_METHODS
+        response.headers["Access-Control-Allow-Headers"] = request.headers.get(
+            "Access-Control-Request-Headers", "Content-Type"
+        )
+        response.headers["Access-Control-Max-Age"] = CORS_MAX_AGE
+    started = g.pop("request_started", None)
+    if started is not None:
+        metrics.http_request_seconds.observe(
+            time.perf_counter() - started,
+            endpoint=request.url_rule.rule if request.url_rule else "unmatched",
+            method=request.method,
+            status=response.status_code,
+        )
+    return response
+
+
+def _not_modified(etag, weak=False):
+    response = Response("", status=304)
+    response.set_etag(etag, weak=weak)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+def _respond(result):
+    """
+    Convierte un api_handlers.ApiResult en respuesta Quart.
+    """
+    if result.body is not None:
+        status, data, headers = encoded_json.http_parts(
+            result.body, request.headers.get("Accept-Encoding"), request.if_none_match
+        )
+        return Response(data, status=status, headers=headers)
+    if result.status == 304:
+        return _not_modified(result.etag, result.weak)
+    # orjson: serializa directamente los registros de scrapper.models
+    response = Response(encoded_json.dumps(result.payload), status=result.status, mimetype="application/json")
+    if result.etag:
+        response.set_etag(result.etag, weak=result.weak)
+        response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+@app.route("/")
+async def home():
+    return await render_template("index.html")
+
+
+@app.route("/api/current_round")
+async def current_round():
+    return _respond(await _upstream(api_handlers.current_round))
+
+
+@app.route("/api/all_played_matches", methods=["GET"])
+async def api_all_played_matches():
+    return _respond(await _upstream(api_handlers.all_played_matches))
+
+
+@app.route("/api/played_matches", methods=["GET"])
+async def api_played_matches():
+    round_param = request.args.get("round", default=None, type=int)
+    return _respond(await _upstream(api_handlers.played_matches, round_param))
+
+
+@app.route("/api/live_matches", methods=["GET"])
+async def api_live_matches():
+    since = request.args.get("since", type=int)
+    if since is None and not live_cache_manager.live_matches_body_ready():
+        # Versión aún sin codificar (p. ej. un seguidor justo tras cargar el snapshot): brotli fuera del loop
+        return _respond(await _upstream(api_handlers.live_matches, since, request.if_none_match))
+    return _respond(api_handlers.live_matches(since, request.if_none_match))
+
+
+@app.route("/api/match_details")
+async def api_match_details():
+    url = request.args.get("url")
+    since = request.args.get("since", type=int)
+    return _respond(api_handlers.match_details(url, since, request.if_none_match))
+
+
+@app.route("/api/match_details/batch", methods=["GET", "POST"])
+async def api_match_details_batch():
+    if request.method == "POST":
+        try:
+            args = api_handlers.batch_args_from_body(await request.get_json(silent=True))
+        except ValueError as e:
+            return _respond(api_handlers.ApiResult({"error": str(e)}, 400))
+    else:
+        args = api_handlers.batch_args_from_query(request.args)
+    return _respond(api_handlers.match_details_batch(*args, request.if_none_match))
+
+
+# Leen y descomprimen el log del partido en disco: fuera del event loop
+@app.route("/api/match_timeline")
+async def api_match_timeline():
+    return _respond(await _upstream(
+        api_handlers.match_timeline_entries,
+        request.args.get("id"),
+        request.args.get("url"),
+        kind=request.args.get("kind"),
+        since=request.args.get("since", type=float),
+        until=request.args.get("until", type=float),
+    ))
+
+
+@app.route("/api/match_state")
+async def api_match_state():
+    return _respond(await _upstream(
+        api_handlers.match_state_at, request.args.get("id"), request.args.get("url"), at=request.args.get("at", type=float)
+    ))
+
+
+@app.route("/api/live_stream")
+async def api_live_stream():
+    last_event_id = request.headers.get("Last-Event-ID", type=int)
+
+    async def stream():
+        version, first_event = api_handlers.sse_start(last_event_id)
+        if first_event:
+            yield first_event.encode("utf-8")
+
+        while True:
+            # Coger el evento antes de mirar la caché: un cambio entre ambas cosas lo dispara igualmente
+            changed = _cache_changed_event
+            update = live_cache_manager.wait_for_changes(version, timeout=0)
+            if update is None:
+                try:
+                    await asyncio.wait_for(changed.wait(), api_handlers.SSE_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    yield api_handlers.SSE_KEEPALIVE_COMMENT.encode("utf-8")
+                continue
+            version, event = api_handlers.sse_update(update)
+            yield event.encode("utf-8")
+
+    response = Response(stream(), mimetype="text/event-stream", headers=api_handlers.SSE_HEADERS)
+    response.timeout = None
+    return response
+
+
+@app.route("/api/scraper_stats")
+async def api_scraper_stats():
+    stats = live_cache_manager.get_scraper_stats()
+    stats["shared_mode"] = get_shared_mode_stats()
+    stats["warmup"] = warmup.get_warmup_stats()
+    stats["tipoff_prefetch"] = tipoff_prefetcher.get_prefetch_stats()
+    stats["upstream_workers"] = UPSTREAM_WORKERS
+    return jsonify(stats)
+
+
+@app.route("/metrics")
+async def api_metrics():
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+
+@app.route("/api/cache_stats")
+async def api_cache_stats():
+    return jsonify(get_cache_stats())
+
+
+@app.route("/api/euroleague_standings")
+async def euroleague_standings():
+    return _respond(await _upstream(api_handlers.euroleague_standings, request.args.get("live", type=int) == 1))
+
+
+@app.route("/api/scheduled_matches", methods=["GET"])
+async def scheduled_matches():
+    return _respond(await _upstream(
+        api_handlers.scheduled_matches,
+        request.args.get("round", default=None, type=int),
+        team_param=request.args.get("team"),
+        date_from=request.args.get("from"),
+        date_to=request.args.get("to"),
+    ))
+
+
+@app.route("/api/teams")
+async def api_teams():
+    return _respond(api_handlers.teams())
+
+
+# La primera consulta de un rango puede descargar temporadas: va al executor
+@app.route("/api/archive/team_results")
+async def api_archive_team_results():
+    return _respond(await _upstream(
+        api_handlers.archive_team_results,
+        request.args.get("team"),
+        since=request.args.get("since", type=int),
+        until=request.args.get("until", type=int),
+    ))
+
+
+@app.route("/api/archive/head_to_head")
+async def api_archive_head_to_head():
+    return _respond(await _upstream(
+        api_handlers.archive_head_to_head,
+        request.args.get("team1"),
+        request.args.get("team2"),
+        since=request.args.get("since", type=int),
+        until=request.args.get("until", type=int),
+    ))
+
+
+@app.route("/api/archive/standings")
+async def api_archive_standings():
+    return _respond(await _upstream(api_handlers.archive_standings, request.args.get("season", type=int)))
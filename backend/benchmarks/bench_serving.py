@@ -0,0 +1,189 @@
+"""
+Benchmark de carga: servidor Flask actual (app_V0, WSGI con hilos) frente al
+modo ASGI (asgi_app sobre uvicorn), con las mismas rutas.
+
+La API de la Euroliga se sustituye por funciones que duermen
+--upstream-delay segundos, y la caché en vivo se rellena con partidos de
+prueba, así que no hace falta red ni Chrome.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_serving [--concurrency 32] [--duration 10]
+        [--upstream-delay 0.3] [--cold] [--path /api/live_matches ...]
+
+Con --cold se desactiva la caché de respuestas y cada petición a un endpoint
+de la Euroliga espera al upstream simulado.
+"""
+import argparse
+import http.client
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+BACKEND_DIR = os.path.join(os.path.dirname(__file__), "..")
+sys.path.append(os.path.join(BACKEND_DIR, "euroleague_api", "src"))
+sys.path.append(BACKEND_DIR)
+
+DEFAULT_PATHS = ["/api/live_matches", "/api/match_details/batch?view=card", "/api/euroleague_standings"]
+
+
+def _install_fakes(upstream_delay, cold):
+    """
+    Sustituye los wrappers por versiones que sólo duermen y rellena la caché en vivo.
+    Debe llamarse antes de importar api_handlers / app_V0 / asgi_app.
+    """
+    from euroleague_api_wrappers import standings_wrapper, played_matches_wrapper, scheduled_games_wrapper, season_utils
+    import response_cache
+    import shared_cache
+    import live_cache_manager
+    from scrapper.models import LiveMatch, MatchDetails, PlayerStat, QuarterScores, TeamStat
+
+    def slow(value):
+        def fetch(*args, **kwargs):
+            time.sleep(upstream_delay)
+            return value
+        return fetch
+
+    standings_wrapper.get_euroleague_standings = slow([{"position": i, "club.name": f"Team {i}"} for i in range(18)])
+    played_matches_wrapper.get_played_matches = slow([{"home_team": "A", "away_team": "B"}] * 9)
+    played_matches_wrapper.get_all_played_matches = slow([{"home_team": "A", "away_team": "B"}] * 300)
+    scheduled_games_wrapper.get_scheduled_matches = slow([{"home_team": "A", "away_team": "B"}] * 9)
+    season_utils.get_latest_round = slow(20)
+    if cold:
+        response_cache.ENDPOINT_TTLS = {key: (0, 0) for key in response_cache.ENDPOINT_TTLS}
+    shared_cache.start_shared_mode = lambda: None
+
+    matches = []
+    for i in range(9):
+        url = f"https://www.flashscore.com/match/bench{i}/#/match-summary/match-summary"
+        matches.append(LiveMatch(f"Home {i}", f"Away {i}", 78, 74, "4th Quarter", "03:12", url))
+    live_cache_manager.publish_live_matches(matches)
+    for match in matches:
+        live_cache_manager.publish_match_details(match.url, MatchDetails(
+            home_team=match.team1, away_team=match.team2,
+            quarter_scores=QuarterScores((20, 18, 22, 18, None), (19, 20, 17, 18, None), 78, 74),
+            top_player_stats=tuple(PlayerStat(f"Player {j}", "H", 20 - j) for j in range(3)),
+            team_statistics=(TeamStat("Total Rebounds", 30, 28),),
+        ))
+
+
+def serve(kind, port, upstream_delay, cold):
+    _install_fakes(upstream_delay, cold)
+    if kind == "flask":
+        from werkzeug.serving import run_simple
+        import logging
+        logging.getLogger("werkzeug").setLevel(logging.ERROR)
+        from app_V0 import app
+        run_simple("127.0.0.1", port, app, threaded=True)
+    else:
+        import uvicorn
+        from asgi_app import app
+        uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_until_up(port, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/api/cache_stats")
+            conn.getresponse().read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"El servidor en el puerto {port} no arrancó")
+
+
+def run_load(port, paths, concurrency, duration):
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    stop_at = time.time() + duration
+
+    def worker(offset):
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        i = offset
+        local = []
+        while time.time() < stop_at:
+            path = paths[i % len(paths)]
+            i += 1
+            start = time.perf_counter()
+            try:
+                conn.request("GET", path)
+                response = conn.getresponse()
+                response.read()
+                if response.status >= 500:
+                    raise RuntimeError(response.status)
+                local.append(time.perf_counter() - start)
+            except Exception:
+                with lock:
+                    errors[0] += 1
+                conn.close()
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    latencies.sort()
+
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000 if latencies else float("nan")
+
+    return {
+        "requests": len(latencies),
+        "rps": len(latencies) / duration,
+        "p50_ms": pct(0.50),
+        "p99_ms": pct(0.99),
+        "errors": errors[0],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--serve", choices=["flask", "asgi"], help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--servers", nargs="+", default=["flask", "asgi"], choices=["flask", "asgi"])
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--upstream-delay", type=float, default=0.3)
+    parser.add_argument("--cold", action="store_true")
+    parser.add_argument("--path", action="append", dest="paths")
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.port, args.upstream_delay, args.cold)
+        return
+
+    paths = args.paths or DEFAULT_PATHS
+    print(f"{args.concurrency} clientes, {args.duration}s, upstream {args.upstream_delay}s, "
+          f"caché {'desactivada' if args.cold else 'activada'}, rutas: {', '.join(paths)}")
+    print(f"{'servidor':<8} {'peticiones':>10} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'errores':>8}")
+    for kind in args.servers:
+        port = _free_port()
+        cmd = [sys.executable, "-m", "benchmarks.bench_serving", "--serve", kind, "--port", str(port),
+               "--upstream-delay", str(args.upstream_delay)] + (["--cold"] if args.cold else [])
+        proc = subprocess.Popen(cmd, cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            _wait_until_up(port)
+            r = run_load(port, paths, args.concurrency, args.duration)
+        finally:
+            proc.terminate()
+            proc.wait()
+        print(f"{kind:<8} {r['requests']:>10} {r['rps']:>9.1f} {r['p50_ms']:>9.1f} {r['p99_ms']:>9.1f} {r['errors']:>8}")
+
+
+if __name__ == "__main__":
+    main()
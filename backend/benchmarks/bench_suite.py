@@ -0,0 +1,331 @@
+"""
+Benchmark del scraper y de la API sin tocar Flashscore ni la Euroliga: las
+respuestas grabadas en benchmarks/fixtures se sirven con fixture_server y
+todos los wrappers apuntan a él.
+
+Mide por etapa el tiempo (media y mínimo de --repeat vueltas) y el pico de
+memoria con tracemalloc (en una vuelta aparte, para no falsear los tiempos):
+arranque de Chrome, carga de página, extracción del DOM, publicación en la
+caché, serialización JSON, wrappers de la Euroliga y el throughput de los
+endpoints Flask en proceso.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_suite [--repeat 20] [--selenium] [--latency 0]
+        [--endpoint-seconds 2] [--json out.json] [--baseline base.json] [--tolerance 0.25]
+
+Con --baseline compara con un --json anterior y sale con código 1 si alguna
+etapa es más lenta que baseline * (1 + tolerance). También sale con código 1
+si algún endpoint no devuelve 200 (no se mide una respuesta de error).
+"""
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import replace
+from urllib.parse import quote
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "euroleague_api", "src"))
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from euroleague_api.EuroLeagueData import EuroLeagueData
+
+from benchmarks.fixture_server import LIVE_PATH, load_fixture, start_fixture_server
+
+
+class Skipped(Exception):
+    pass
+
+
+@contextlib.contextmanager
+def _quiet():
+    # Los módulos de la app imprimen en cada llamada: se descarta durante las mediciones
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        yield
+
+
+def measure(name, fn, repeat):
+    """
+    Devuelve {"stage", "mean_ms", "min_ms", "peak_kb"} o {"stage", "skipped"}.
+    """
+    try:
+        with _quiet():
+            fn()  # calentamiento
+            times = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                fn()
+                times.append(time.perf_counter() - start)
+            tracemalloc.start()
+            fn()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+    except Skipped as e:
+        return {"stage": name, "skipped": str(e)}
+    return {
+        "stage": name,
+        "mean_ms": 1000 * sum(times) / len(times),
+        "min_ms": 1000 * min(times),
+        "peak_kb": peak / 1024,
+    }
+
+
+def point_wrappers_at(base_url):
+    from euroleague_api_wrappers import scheduled_games_wrapper, season_metadata
+    season_metadata.V1_RESULTS_URL = f"{base_url}/v1/results"
+    scheduled_games_wrapper.SCHEDULES_URL = f"{base_url}/v1/schedules"
+    EuroLeagueData.BASE_URL = base_url
+
+
+def scraper_stages(base_url, repeat, use_selenium):
+    from scrapper import html_parser, http_scrapper
+    import encoded_json
+    import live_cache_manager
+
+    live_url = base_url + LIVE_PATH
+    match_url = f"{base_url}/match/MADBARLv00/"
+    live_html = load_fixture("flashscore_live.html", "r")
+    match_html = load_fixture("flashscore_match.html", "r")
+    live_data = html_parser.parse_live_matches_html(live_html)
+    details = html_parser.parse_match_details_html(match_html)
+
+    results = []
+    driver = None
+    if use_selenium:
+        from scrapper import scrapper
+        from scrapper.driver_pool import create_driver, resolve_driver_path
+        try:
+            resolve_driver_path()
+            results.append(measure("driver start", lambda: create_driver().quit(), max(1, repeat // 10)))
+            driver = create_driver()
+        except Exception as e:
+            print(f"⚠️ Sin Chrome: se omiten las etapas de Selenium ({e})")
+
+    def selenium_stage(fn):
+        def run():
+            if driver is None:
+                raise Skipped("sin --selenium o sin Chrome")
+            return fn()
+        return run
+
+    results += [
+        measure("page load: live (selenium)", selenium_stage(lambda: driver.get(live_url)), repeat),
+        measure("page load: live (http)", lambda: http_scrapper.fetch_html(live_url), repeat),
+        measure("page load: match (http)", lambda: http_scrapper.fetch_html(match_url), repeat),
+    ]
+    if driver is not None:
+        driver.get(live_url)
+    results += [
+        measure("dom extraction: live (selenium)",
+                selenium_stage(lambda: scrapper._parse_live_matches(scrapper._page_html(driver, scrapper.LIVE_READY))), repeat),
+        measure("dom extraction: live (bs4)", lambda: html_parser.parse_live_matches_html(live_html), repeat),
+    ]
+    if driver is not None:
+        driver.get(match_url)
+    results += [
+        measure("dom extraction: match (selenium)",
+                selenium_stage(lambda: scrapper._parse_match_details(
+                    scrapper._page_html(driver, scrapper.DETAILS_READY, scrapper.DETAILS_OPTIONAL))), repeat),
+        measure("dom extraction: match (bs4)", lambda: html_parser.parse_match_details_html(match_html), repeat),
+    ]
+    if driver is not None:
+        driver.quit()
+
+    tick = [0]
+
+    def publish():
+        # Cambia un marcador en cada vuelta para que haya trabajo real (hash nuevo)
+        tick[0] += 1
+        data = [replace(m, score1=tick[0], score2=i) for i, m in enumerate(live_data)]
+        scores = replace(details.quarter_scores, home_total=tick[0])
+        start_version = live_cache_manager.cache_version
+        live_cache_manager.publish_live_matches(data)
+        for m in data:
+            live_cache_manager.publish_match_details(m.url, replace(details, quarter_scores=scores))
+        with live_cache_manager.cache_lock:
+            live_cache_manager._close_cycle(start_version)
+
+    results.append(measure("cache publish (9 matches + details)", publish, repeat))
+    def encode_live_snapshot():
+        # Fuerza una versión nueva para medir la serialización + gzip + brotli de cada ciclo
+        with live_cache_manager.cache_lock:
+            live_cache_manager._live_body["key"] = None
+        return live_cache_manager.get_live_matches_body()
+
+    results += [
+        measure("json: live snapshot", lambda: encoded_json.dumps(live_cache_manager.get_live_snapshot()), repeat),
+        measure("json: details batch",
+                lambda: encoded_json.dumps(live_cache_manager.get_cached_match_details_batch()[1]), repeat),
+        measure("encoded snapshot: live (orjson+gzip+br)", encode_live_snapshot, repeat),
+    ]
+    return results
+
+
+def wrapper_stages(repeat):
+    from euroleague_api.standings import Standings
+    from euroleague_api_wrappers import scheduled_games_wrapper, season_metadata, standings_engine
+    from euroleague_api_wrappers.played_matches_wrapper import played_matches_to_records
+
+    schedules_xml = load_fixture("euroleague_v1_schedules.xml")
+
+    def full_season():
+        if not hasattr(EuroLeagueData, "get_game_metadata_season"):
+            raise Skipped("euroleague_api sin get_game_metadata_season")
+        return season_metadata.fetch_full_season(2025)
+
+    def standings_engine_rebuild():
+        if not hasattr(EuroLeagueData, "get_game_metadata_season"):
+            raise Skipped("euroleague_api sin get_game_metadata_season")
+        table = standings_engine._SeasonTable(2025)
+        table.reconciled_at = time.time()
+        standings_engine._sync(table)
+        return table.records()
+
+    def schedule_revalidate():
+        # Fuerza la revalidación: el servidor contesta 304 y se reutiliza el índice
+        scheduled_games_wrapper._feed["checked_at"] = 0.0
+        return scheduled_games_wrapper.get_schedule_index()
+
+    round_df = season_metadata._fetch_round(2025, 10)
+    played = round_df[round_df["played"] == True]
+
+    return [
+        measure("wrapper: parse schedules xml", lambda: scheduled_games_wrapper.parse_scheduled_matches(schedules_xml), repeat),
+        measure("wrapper: build schedule index", lambda: scheduled_games_wrapper.ScheduleIndex(
+            list(scheduled_games_wrapper.iter_scheduled_items(schedules_xml))), repeat),
+        measure("wrapper: schedule revalidation (304)", schedule_revalidate, repeat),
+        measure("wrapper: fetch one round (v1 results)", lambda: season_metadata._fetch_round(2025, 10), repeat),
+        measure("wrapper: fetch full season", full_season, max(1, repeat // 5)),
+        measure("wrapper: played matches to records", lambda: played_matches_to_records(played), repeat),
+        measure("wrapper: upstream standings (v3)", lambda: Standings().get_standings(2025, 20), repeat),
+        measure("wrapper: standings engine rebuild", standings_engine_rebuild, repeat),
+    ]
+
+
+def endpoint_throughput(seconds):
+    from app_V0 import app
+    import live_cache_manager
+
+    client = app.test_client()
+    first_url = live_cache_manager.get_cached_live_matches()[0].url
+    endpoints = [
+        "/api/live_matches",
+        f"/api/match_details?url={quote(first_url, safe='')}",
+        "/api/match_details/batch?view=card",
+        "/api/match_details/batch",
+        "/api/scheduled_matches",
+        "/api/euroleague_standings",
+        "/api/played_matches?round=10",
+    ]
+
+    results = []
+    for path in endpoints:
+        with _quiet():
+            status = client.get(path).status_code  # llena la caché de respuestas
+        stage = f"endpoint: {path.split('?url=')[0]}"
+        if status != 200:
+            # Se estaría midiendo la respuesta de error, no el handler
+            results.append({"stage": stage, "status": status, "failed": f"status {status}"})
+            continue
+        with _quiet():
+            count = 0
+            start = time.perf_counter()
+            while time.perf_counter() - start < seconds:
+                client.get(path)
+                count += 1
+            elapsed = time.perf_counter() - start
+            tracemalloc.start()
+            client.get(path)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        results.append({
+            "stage": stage,
+            "status": status,
+            "rps": count / elapsed,
+            "mean_ms": 1000 * elapsed / count,
+            "min_ms": None,
+            "peak_kb": peak / 1024,
+        })
+    return results
+
+
+def print_table(results):
+    print(f"{'etapa':<45} {'media ms':>10} {'mín ms':>10} {'pico KB':>10} {'req/s':>9}")
+    for r in results:
+        if "skipped" in r:
+            print(f"{r['stage']:<45} {'omitida: ' + r['skipped']:>42}")
+            continue
+        if "failed" in r:
+            print(f"{r['stage']:<45} {'❌ ' + r['failed']:>42}")
+            continue
+        min_ms = f"{r['min_ms']:.3f}" if r.get("min_ms") is not None else "-"
+        rps = f"{r['rps']:.0f}" if "rps" in r else "-"
+        print(f"{r['stage']:<45} {r['mean_ms']:>10.3f} {min_ms:>10} {r['peak_kb']:>10.1f} {rps:>9}")
+
+
+def compare_with_baseline(results, baseline_path, tolerance):
+    with open(baseline_path) as f:
+        baseline = {r["stage"]: r for r in json.load(f)["stages"] if "mean_ms" in r}
+    regressions = []
+    for r in results:
+        base = baseline.get(r["stage"])
+        if "mean_ms" in r and base and r["mean_ms"] > base["mean_ms"] * (1 + tolerance):
+            regressions.append(f"{r['stage']}: {base['mean_ms']:.3f} → {r['mean_ms']:.3f} ms")
+    if regressions:
+        print("❌ Regresiones frente a la baseline:")
+        for line in regressions:
+            print("   " + line)
+    else:
+        print("✅ Sin regresiones frente a la baseline")
+    return not regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del scraper y de la API con fixtures grabadas")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--selenium", action="store_true", help="incluir arranque de Chrome y etapas de Selenium")
+    parser.add_argument("--latency", type=float, default=0.0, help="latencia simulada del servidor de fixtures (s)")
+    parser.add_argument("--endpoint-seconds", type=float, default=2.0)
+    parser.add_argument("--json", help="guardar los resultados en este fichero")
+    parser.add_argument("--baseline", help="resultados --json anteriores con los que comparar")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    # Los logs de la app van por su propio hilo a stdout: se silencian para no mezclarlos con la tabla
+    logging.getLogger("liveapp").setLevel(logging.CRITICAL)
+    # La publicación escribe las líneas de tiempo de los partidos: a un directorio temporal
+    import match_timeline
+    match_timeline.TIMELINE_DIR = tempfile.mkdtemp(prefix="bench-timelines-")
+    server, base_url = start_fixture_server(latency=args.latency)
+    point_wrappers_at(base_url)
+    try:
+        results = scraper_stages(base_url, args.repeat, args.selenium)
+        results += wrapper_stages(args.repeat)
+        results += endpoint_throughput(args.endpoint_seconds)
+    finally:
+        server.shutdown()
+
+    print_table(results)
+    max_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"📈 Pico de memoria del proceso (RSS): {max_rss_mb:.1f} MB")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"stages": results, "max_rss_mb": max_rss_mb}, f, indent=2)
+    failed = [r["stage"] for r in results if "failed" in r]
+    if failed:
+        print(f"❌ Etapas que no devolvieron 200: {', '.join(failed)}")
+    if args.baseline and not compare_with_baseline(results, args.baseline, args.tolerance):
+        sys.exit(1)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Comprueba que los dos backends del scraper (HTTP + BeautifulSoup y Selenium)
+sacan lo mismo de las páginas grabadas en benchmarks/fixtures, servidas con
+fixture_server.
+
+Sin Chrome la parte de Selenium se omite (salvo con --selenium, que la exige).
+Sale con código 1 si algo no cuadra.
+
+Uso (desde backend/):
+    python -m benchmarks.check_backends [--selenium]
+"""
+import argparse
+import logging
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "euroleague_api", "src"))
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from benchmarks.fixture_server import LIVE_PATH, start_fixture_server
+from scrapper import http_scrapper
+
+MATCH_PATH = "/match/MADBARLv00/"
+
+
+def scrape(backend, base_url):
+    return backend.get_live_matches(base_url + LIVE_PATH), backend.get_match_details(base_url + MATCH_PATH)
+
+
+def check_http(base_url):
+    live, details = scrape(http_scrapper, base_url)
+    problems = []
+    if not live:
+        problems.append("HTTP: la página de la liga no dio partidos en vivo")
+    if details.error or details.quarter_scores is None:
+        problems.append(f"HTTP: detalles sin datos ({details.error})")
+    return (live, details), problems
+
+
+def check_selenium(base_url, reference, required):
+    try:
+        from scrapper import scrapper as selenium_scrapper
+        from scrapper.driver_pool import resolve_driver_path
+        resolve_driver_path()
+        result = scrape(selenium_scrapper, base_url)
+    except Exception as e:
+        if required:
+            return [f"Selenium: no se pudo scrapear ({e})"]
+        print(f"⚠️ Sin Chrome: se omite Selenium ({e})")
+        return []
+
+    live, details = result
+    problems = []
+    if live != reference[0]:
+        problems.append(f"Selenium y HTTP no coinciden en los partidos en vivo ({len(live)} frente a {len(reference[0])})")
+    if details != reference[1]:
+        problems.append("Selenium y HTTP no coinciden en los detalles del partido")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara los backends del scraper con las fixtures grabadas")
+    parser.add_argument("--selenium", action="store_true", help="fallar si Selenium no puede ejecutarse")
+    args = parser.parse_args()
+
+    logging.getLogger("liveapp").setLevel(logging.CRITICAL)
+    server, base_url = start_fixture_server()
+    try:
+        reference, problems = check_http(base_url)
+        if not problems:
+            problems += check_selenium(base_url, reference, args.selenium)
+    finally:
+        server.shutdown()
+
+    if problems:
+        for problem in problems:
+            print("❌ " + problem)
+        sys.exit(1)
+    live, details = reference
+    print(f"✅ Backends coinciden: {len(live)} partidos en vivo, detalles de {details.home_team} - {details.away_team}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Servidor local que sustituye a Flashscore y a la API de la Euroliga en los
+benchmarks, sirviendo las respuestas grabadas de benchmarks/fixtures:
+
+    /basketball/europe/euroleague/                      flashscore_live.html
+    /match/<id>/                                        flashscore_match.html
+    /v1/results[?gameNumber=N]                          euroleague_v1_results.xml (filtrado por jornada)
+    /v1/schedules                                       euroleague_v1_schedules.xml (con ETag / 304)
+    /v3/competitions/E/seasons/<s>/rounds/<r>/basicstandings
+                                                        euroleague_v3_basicstandings.json
+
+Uso suelto (desde backend/):
+    python -m benchmarks.fixture_server [--port 8765] [--latency 0.05]
+"""
+import argparse
+import hashlib
+import os
+import threading
+import time
+import xml.etree.ElementTree as ET
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+LIVE_PATH = "/basketball/europe/euroleague/"
+
+
+def load_fixture(name, mode="rb"):
+    with open(os.path.join(FIXTURES_DIR, name), mode) as f:
+        return f.read()
+
+
+def _results_by_round(xml_data):
+    root = ET.fromstring(xml_data)
+    by_round = {}
+    for game in root.findall("game"):
+        by_round.setdefault(game.findtext("gameday"), []).append(ET.tostring(game))
+    return {
+        gameday: b'<?xml version="1.0" encoding="utf-8"?><results>' + b"".join(games) + b"</results>"
+        for gameday, games in by_round.items()
+    }
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Cabeceras y cuerpo van en dos write(): sin esto Nagle + delayed ACK añaden ~40 ms por petición
+    disable_nagle_algorithm = True
+    fixtures = None
+    latency = 0.0
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body=b"", content_type="text/html; charset=utf-8", headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.latency:
+            time.sleep(self.latency)
+        fx = self.fixtures
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+
+        if url.path.rstrip("/") == LIVE_PATH.rstrip("/"):
+            return self._send(200, fx["live"])
+        if url.path.startswith("/match/"):
+            return self._send(200, fx["match"])
+        if url.path.rstrip("/") == "/v1/results":
+            gameday = query.get("gameNumber", [None])[0]
+            body = fx["results"] if gameday is None else fx["results_by_round"].get(gameday, b"<results/>")
+            return self._send(200, body, "application/xml")
+        if url.path.rstrip("/") == "/v1/schedules":
+            etag = fx["schedules_etag"]
+            if self.headers.get("If-None-Match") == etag:
+                return self._send(304, headers={"ETag": etag})
+            return self._send(200, fx["schedules"], "application/xml", {"ETag": etag})
+        if url.path.endswith("/basicstandings"):
+            return self._send(200, fx["standings"], "application/json")
+        return self._send(404, b"not found", "text/plain")
+
+
+def start_fixture_server(port=0, latency=0.0):
+    """
+    Arranca el servidor en un hilo. Devuelve (server, base_url); server.shutdown() lo para.
+    """
+    results = load_fixture("euroleague_v1_results.xml")
+    schedules = load_fixture("euroleague_v1_schedules.xml")
+    handler = type("Handler", (FixtureHandler,), {
+        "latency": latency,
+        "fixtures": {
+            "live": load_fixture("flashscore_live.html"),
+            "match": load_fixture("flashscore_match.html"),
+            "results": results,
+            "results_by_round": _results_by_round(results),
+            "schedules": schedules,
+            "schedules_etag": '"' + hashlib.sha1(schedules).hexdigest()[:16] + '"',
+            "standings": load_fixture("euroleague_v3_basicstandings.json"),
+        },
+    })
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True, name="fixture-server").start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor local con las respuestas grabadas")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0)
+    args = parser.parse_args()
+    server, base_url = start_fixture_server(args.port, args.latency)
+    print(f"🧪 Sirviendo fixtures en {base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,78 @@
+"""
+Vuelve a grabar las fixtures de los benchmarks desde las fuentes reales.
+
+Flashscore se captura con Selenium (page_source ya renderizado), que es lo
+que ven tanto el scraper como el parser HTML; la API de la Euroliga se
+guarda tal cual la devuelve. Conviene grabar con partidos en vivo para que
+la página de liga tenga la sección en vivo.
+
+Uso (desde backend/):
+    python -m benchmarks.record_fixtures [--season 2025] [--round 20] [--match-url URL]
+"""
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "euroleague_api", "src"))
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import requests
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from benchmarks.fixture_server import FIXTURES_DIR
+from euroleague_api_wrappers.season_utils import get_current_season_code
+from scrapper.driver_pool import create_driver
+
+FLASHSCORE_LIVE_URL = "https://www.flashscore.com/basketball/europe/euroleague/"
+EUROLEAGUE_BASE_URL = "https://api-live.euroleague.net"
+
+
+def _save(name, content):
+    mode = "w" if isinstance(content, str) else "wb"
+    with open(os.path.join(FIXTURES_DIR, name), mode) as f:
+        f.write(content)
+    print(f"💾 {name}: {len(content)} bytes")
+
+
+def _rendered_html(driver, url, selector):
+    driver.get(url)
+    WebDriverWait(driver, 15).until(EC.presence_of_element_located((By.CSS_SELECTOR, selector)))
+    return driver.page_source
+
+
+def record_flashscore(match_url=None):
+    driver = create_driver()
+    try:
+        _save("flashscore_live.html", _rendered_html(driver, FLASHSCORE_LIVE_URL, ".event__match"))
+        if match_url is None:
+            first = driver.find_elements(By.CSS_SELECTOR, ".event__match")[0].get_attribute("id").replace("g_3_", "")
+            match_url = f"https://www.flashscore.com/match/{first}/#/match-summary/match-summary"
+        _save("flashscore_match.html", _rendered_html(driver, match_url, ".smh__part"))
+    finally:
+        driver.quit()
+
+
+def record_euroleague(season, round_number):
+    session = requests.Session()
+    _save("euroleague_v1_results.xml",
+          session.get(f"{EUROLEAGUE_BASE_URL}/v1/results", params={"seasonCode": f"E{season}"}, timeout=30).content)
+    _save("euroleague_v1_schedules.xml", session.get(f"{EUROLEAGUE_BASE_URL}/v1/schedules", timeout=30).content)
+    _save("euroleague_v3_basicstandings.json", session.get(
+        f"{EUROLEAGUE_BASE_URL}/v3/competitions/E/seasons/E{season}/rounds/{round_number}/basicstandings",
+        headers={"Accept": "application/json"}, timeout=30,
+    ).content)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Graba las fixtures de los benchmarks")
+    parser.add_argument("--season", type=int, default=get_current_season_code())
+    parser.add_argument("--round", type=int, default=1)
+    parser.add_argument("--match-url")
+    parser.add_argument("--skip-flashscore", action="store_true")
+    args = parser.parse_args()
+
+    record_euroleague(args.season, args.round)
+    if not args.skip_flashscore:
+        record_flashscore(args.match_url)
@@ -0,0 +1,86 @@
+"""
+Respuestas JSON serializadas y comprimidas una sola vez.
+
+encode(payload) serializa con orjson y guarda junto al JSON sus variantes
+gzip y brotli, con un ETag fuerte calculado sobre los bytes. Los endpoints
+calientes (partidos en vivo, temporada completa, calendario) guardan este
+EncodedBody cuando se publica el snapshot y en cada petición sólo eligen la
+variante según Accept-Encoding: ni jsonify ni compresión por petición.
+"""
+import gzip
+import hashlib
+import os
+from collections import namedtuple
+
+import brotli
+import orjson
+
+GZIP_LEVEL = int(os.environ.get("SNAPSHOT_GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.environ.get("SNAPSHOT_BROTLI_QUALITY", "9"))
+# Por debajo de este tamaño la compresión no compensa: sólo se guarda el JSON
+MIN_COMPRESS_SIZE = 1024
+
+EncodedBody = namedtuple("EncodedBody", ["identity", "gzip", "br", "etag"])
+
+# Orden de preferencia si el cliente acepta varias
+_ENCODINGS = ("br", "gzip")
+
+
+def dumps(payload):
+    return orjson.dumps(payload, default=str, option=orjson.OPT_NON_STR_KEYS)
+
+
+def encode(payload):
+    identity = dumps(payload)
+    etag = hashlib.sha1(identity).hexdigest()[:16]
+    if len(identity) < MIN_COMPRESS_SIZE:
+        return EncodedBody(identity, None, None, etag)
+    return EncodedBody(
+        identity,
+        gzip.compress(identity, compresslevel=GZIP_LEVEL, mtime=0),
+        brotli.compress(identity, quality=BROTLI_QUALITY),
+        etag,
+    )
+
+
+def _accepted(accept_encoding):
+    accepted = set()
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(name.strip().lower())
+    return accepted
+
+
+def http_parts(body, accept_encoding, if_none_match):
+    """
+    (status, bytes, cabeceras) para servir `body`. Cada variante lleva su
+    propio ETag fuerte ("<hash>-br"); un If-None-Match con cualquiera de
+    ellas da 304, porque el contenido es el mismo.
+    """
+    accepted = _accepted(accept_encoding)
+    data, encoding, etag = body.identity, None, body.etag
+    for name in _ENCODINGS:
+        variant = getattr(body, name)
+        if variant is not None and name in accepted:
+            data, encoding, etag = variant, name, f"{body.etag}-{name}"
+            break
+
+    headers = {
+        "Content-Type": "application/json",
+        "ETag": f'"{etag}"',
+        "Cache-Control": "no-cache",
+        "Vary": "Accept-Encoding",
+    }
+    tags = [body.etag] + [f"{body.etag}-{name}" for name in _ENCODINGS]
+    if any(tag in if_none_match for tag in tags):
+        return 304, b"", headers
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return 200, data, headers
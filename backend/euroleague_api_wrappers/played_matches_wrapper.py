@@ -1,7 +1,58 @@
-from euroleague_api.EuroLeagueData import EuroLeagueData
+from euroleague_api_wrappers.season_metadata import get_season_metadata
 from euroleague_api_wrappers.season_utils import get_current_season_code, get_latest_round
-import traceback
-from datetime import datetime
+from euroleague_api_wrappers import team_registry
+import numpy as np
+import pandas as pd
+from app_logging import get_logger
+
+logger = get_logger(__name__)
+
+RESULT_COLUMNS = {
+    "hometeam": "home_team",
+    "awayteam": "away_team",
+    "homescore": "home_score",
+    "awayscore": "away_score",
+    "gameday": "round",
+}
+
+
+def _team_id_column(names, codes):
+    """
+    Id canónico de cada fila. El registro se consulta una vez por cada par
+    (nombre, código) distinto, no por fila: una temporada son ~20 equipos.
+    """
+    labels, pairs = pd.MultiIndex.from_arrays([names, codes]).factorize()
+    ids = np.array([team_registry.team_id(name, code) for name, code in pairs], dtype=object)
+    return ids[labels]
+
+
+def played_matches_to_records(played_df):
+    """
+    Convierte el DataFrame de partidos jugados a la lista de diccionarios que
+    devuelve la API, en una sola pasada vectorizada. Las fechas que no encajan
+    con "%b %d, %Y %H:%M" salen como "Invalid Date".
+    """
+    if played_df.empty:
+        return []
+
+    def text_column(name):
+        if name in played_df.columns:
+            return played_df[name].astype(str)
+        return pd.Series("", index=played_df.index)
+
+    dt = pd.to_datetime(
+        text_column("date") + " " + text_column("time"),
+        format="%b %d, %Y %H:%M",
+        errors="coerce",
+    )
+
+    out = played_df[list(RESULT_COLUMNS)].rename(columns=RESULT_COLUMNS)
+    for side in ("home", "away"):
+        out[f"{side}_team_id"] = _team_id_column(out[f"{side}_team"], text_column(f"{side}code"))
+    out["arena"] = played_df["location"] if "location" in played_df.columns else "Unknown Arena"
+    out["datetime"] = dt.dt.strftime("%Y-%m-%d %H:%M").fillna("Invalid Date")
+    out["status"] = "Finished"
+    return out.to_dict("records")
 
 def get_played_matches(round=None):
     """
@@ -11,51 +62,24 @@ def get_played_matches(round=None):
     try:
         season = get_current_season_code()
         round_number = round or get_latest_round(season)
-        print(f"📅 Temporada: {season}-{season+1}, Ronda solicitada: {round_number}")
+        logger.debug("📅 Temporada: %s-%s, Ronda solicitada: %s", season, season + 1, round_number)
 
-        euro = EuroLeagueData(competition="E")
-        df = euro.get_game_metadata_season(season)
+        df = get_season_metadata(season)
 
-        print(f"🔍 Total de partidos descargados: {len(df)}")
-        print("📋 Columnas:", df.columns.tolist())
+        logger.debug("🔍 Total de partidos descargados: %d", len(df))
 
         # Filtra la ronda especificada
         round_df = df[df["gameday"] == round_number]
-        print(f"🌟 Partidos en la ronda {round_number}: {len(round_df)}")
+        logger.debug("🌟 Partidos en la ronda %s: %d", round_number, len(round_df))
 
         # Filtra partidos ya jugados
         played_df = round_df[round_df["played"] == True]
-        print(f"✅ Partidos jugados en esa ronda: {len(played_df)}")
-
-        result = []
-        for _, row in played_df.iterrows():
-            # Extrae fecha y hora
-            date_str = row.get("date", "")
-            time_str = row.get("time", "")
-            try:
-                dt = datetime.strptime(f"{date_str} {time_str}", "%b %d, %Y %H:%M")
-                datetime_str = dt.strftime("%Y-%m-%d %H:%M")
-            except Exception:
-                datetime_str = "Invalid Date"
-
-            arena_name = row.get("location", "Unknown Arena")
-
-            result.append({
-                "home_team": row["hometeam"],
-                "away_team": row["awayteam"],
-                "home_score": row["homescore"],
-                "away_score": row["awayscore"],
-                "round": row["gameday"],
-                "arena": arena_name,
-                "datetime": datetime_str,
-                "status": "Finished"
-            })
+        logger.debug("✅ Partidos jugados en esa ronda: %d", len(played_df))
 
-        return result
+        return played_matches_to_records(played_df)
 
     except Exception as e:
-        print(f"❌ Error al obtener partidos jugados: {e}")
-        traceback.print_exc()
+        logger.exception("❌ Error al obtener partidos jugados: %s", e)
         return []
 
 def get_all_played_matches():
@@ -64,42 +88,16 @@ def get_all_played_matches():
     """
     try:
         season = get_current_season_code()
-        euro = EuroLeagueData(competition="E")
-        df = euro.get_game_metadata_season(season)
+        df = get_season_metadata(season)
 
         played_df = df[df["played"] == True]
 
-        result = []
-        for _, row in played_df.iterrows():
-            date_str = row.get("date", "")
-            time_str = row.get("time", "")
-            try:
-                dt = datetime.strptime(f"{date_str} {time_str}", "%b %d, %Y %H:%M")
-                datetime_str = dt.strftime("%Y-%m-%d %H:%M")
-            except Exception:
-                datetime_str = "Invalid Date"
-
-            arena_name = row.get("location", "Unknown Arena")
-
-            result.append({
-                "home_team": row["hometeam"],
-                "away_team": row["awayteam"],
-                "home_score": row["homescore"],
-                "away_score": row["awayscore"],
-                "round": row["gameday"],
-                "arena": arena_name,
-                "datetime": datetime_str,
-                "status": "Finished"
-            })
-
-        # 🔪 LOGS de depuración
-        print("✅ get_all_played_matches ejecutado")
-        print("📋 Total partidos devueltos:", len(result))
-        print("🧠 Rondas detectadas:", set(r["round"] for r in result))
+        result = played_matches_to_records(played_df)
+
+        logger.debug("✅ get_all_played_matches: %d partidos", len(result))
 
         return result
 
     except Exception as e:
-        print(f"❌ Error en get_all_played_matches: {e}")
-        traceback.print_exc()
+        logger.exception("❌ Error en get_all_played_matches: %s", e)
         return []
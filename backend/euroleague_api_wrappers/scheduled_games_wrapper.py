@@ -1,67 +1,208 @@
+import bisect
+import io
+import threading
+import time
 import requests
+from requests.adapters import HTTPAdapter
 from datetime import datetime
 import xml.etree.ElementTree as ET
 
+import upstream
+from app_logging import get_logger
+from euroleague_api_wrappers import team_registry
+
+logger = get_logger(__name__)
+
+SCHEDULES_URL = "https://api-live.euroleague.net/v1/schedules"
+SCHEDULES_TIMEOUT = upstream.timeout("euroleague_schedules")
+# Durante este tiempo se usa el índice en memoria sin preguntar a la API;
+# pasado, se revalida con If-None-Match / If-Modified-Since
+SCHEDULES_REVALIDATE = 120
+
+session = requests.Session()
+session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+
+_feed = {"etag": None, "last_modified": None, "checked_at": 0.0, "index": None}
+_feed_lock = threading.Lock()
+
+
+def _get_schedules(headers):
+    response = session.get(SCHEDULES_URL, headers=headers, timeout=SCHEDULES_TIMEOUT)
+    if response.status_code != 304:
+        response.raise_for_status()
+    return response
+
+
 def get_scheduled_matches_from_api_v1():
-    url = "https://api-live.euroleague.net/v1/schedules"
+    """
+    Descarga el XML del calendario. Devuelve (bytes, validadores): b"" si no
+    ha cambiado desde la última descarga (304) o None si hubo error. Los
+    validadores (ETag, Last-Modified) no se guardan aquí: get_schedule_index
+    los guarda sólo cuando el índice se ha construido con ese XML.
+    """
+    headers = {}
+    if _feed["etag"]:
+        headers["If-None-Match"] = _feed["etag"]
+    if _feed["last_modified"]:
+        headers["If-Modified-Since"] = _feed["last_modified"]
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-        return response.content  # XML
+        response = upstream.call("euroleague_schedules", _get_schedules, headers)
+        if response.status_code == 304:
+            return b"", None
+        validators = {"etag": response.headers.get("ETag"), "last_modified": response.headers.get("Last-Modified")}
+        return response.content, validators  # XML
     except Exception as e:
-        print(f"❌ Error al obtener datos de la API V1: {e}")
-        return None
+        logger.error("❌ Error al obtener datos de la API V1: %s", e)
+        return None, None
 
-def parse_scheduled_matches(xml_data):
-    root = ET.fromstring(xml_data)
-    matches_by_gameday = {}
-    now = datetime.now()
 
-    for item in root.findall("item"):
+def iter_scheduled_items(xml_data):
+    """
+    Recorre el XML de forma incremental (iterparse) y va liberando cada
+    <item> ya leído. Produce (datetime, partido) y salta fechas inválidas.
+    """
+    for _, item in ET.iterparse(io.BytesIO(xml_data), events=("end",)):
+        if item.tag != "item":
+            continue
         gameday = int(item.findtext("gameday", default="0"))
         date_str = item.findtext("date")
         time_str = item.findtext("startime")
         try:
             dt = datetime.strptime(f"{date_str} {time_str}", "%b %d, %Y %H:%M")
         except ValueError:
+            item.clear()
             continue
 
+        home_team = item.findtext("hometeam", "")
+        away_team = item.findtext("awayteam", "")
         match = {
-            "home_team": item.findtext("hometeam", ""),
-            "away_team": item.findtext("awayteam", ""),
+            "home_team": home_team,
+            "away_team": away_team,
+            "home_team_id": team_registry.team_id(home_team, item.findtext("homecode")),
+            "away_team_id": team_registry.team_id(away_team, item.findtext("awaycode")),
             "arena": item.findtext("arenaname", ""),
             "datetime": dt.strftime("%Y-%m-%d %H:%M"),
             "round": gameday
         }
+        item.clear()
+        yield dt, match
+
+
+def parse_scheduled_matches(xml_data):
+    matches_by_gameday = {}
+    now = datetime.now()
 
+    for dt, match in iter_scheduled_items(xml_data):
         if dt > now:
-            matches_by_gameday.setdefault(gameday, []).append(match)
+            matches_by_gameday.setdefault(match["round"], []).append(match)
 
     return matches_by_gameday
 
+
+class ScheduleIndex:
+    """
+    Índice en memoria del calendario completo (también los partidos pasados,
+    que se filtran al consultar). Las búsquedas por ronda, equipo y rango de
+    fechas cuestan O(resultado).
+    """
+
+    def __init__(self, items):
+        # Orden del feed, agrupado por jornada en orden de aparición (como
+        # devolvía get_scheduled_matches antes del índice)
+        round_rank = {}
+        for _, match in items:
+            round_rank.setdefault(match["round"], len(round_rank))
+        self.items = [
+            item for _, item in sorted(
+                enumerate(items), key=lambda pair: (round_rank[pair[1][1]["round"]], pair[0])
+            )
+        ]
+        self.by_round = {}
+        self.by_team = {}
+        for dt, match in self.items:
+            self.by_round.setdefault(match["round"], []).append((dt, match))
+            for side in ("home", "away"):
+                # Por id canónico; sin id, por el nombre tal cual
+                key = match[f"{side}_team_id"] or match[f"{side}_team"].strip().lower()
+                self.by_team.setdefault(key, []).append((dt, match))
+        self.by_date = sorted(self.items, key=lambda pair: pair[0])
+        self.dates = [dt for dt, _ in self.by_date]
+
+    @staticmethod
+    def _future(pairs, now):
+        return [match for dt, match in pairs if dt > now]
+
+    def all(self, now):
+        return self._future(self.items, now)
+
+    def round(self, round_number, now):
+        return self._future(self.by_round.get(round_number, []), now)
+
+    def team(self, team, now):
+        """
+        `team` puede ser el id ("MAD") o cualquier nombre que reconozca el registro de equipos.
+        """
+        key = team.strip().upper() if team.strip().upper() in self.by_team else team_registry.resolve(team)
+        return self._future(self.by_team.get(key or team.strip().lower(), []), now)
+
+    def between(self, start, end, now):
+        lo = bisect.bisect_right(self.dates, max(start, now))
+        hi = bisect.bisect_right(self.dates, end)
+        return [match for _, match in self.by_date[lo:hi]]
+
+    def upcoming(self, now):
+        """
+        Partidos futuros con su datetime, ordenados por hora de inicio.
+        """
+        return self.by_date[bisect.bisect_right(self.dates, now):]
+
+
+def get_schedule_index():
+    """
+    Devuelve el índice del calendario, revalidando el feed como mucho cada
+    SCHEDULES_REVALIDATE segundos. Si la API falla, o el XML no se puede
+    indexar, se sigue usando el índice anterior; en ese último caso no se
+    guarda el ETag, así que la siguiente revalidación lo descarga entero.
+    """
+    with _feed_lock:
+        if _feed["index"] is not None and time.time() - _feed["checked_at"] < SCHEDULES_REVALIDATE:
+            return _feed["index"]
+
+        xml_data, validators = get_scheduled_matches_from_api_v1()
+        _feed["checked_at"] = time.time()
+        if xml_data:
+            try:
+                _feed["index"] = ScheduleIndex(list(iter_scheduled_items(xml_data)))
+            except Exception as e:
+                logger.error("❌ No se pudo indexar el calendario: %s", e)
+            else:
+                _feed.update(validators)
+        elif xml_data == b"":
+            logger.debug("📦 Calendario sin cambios (304), usando índice en memoria")
+        return _feed["index"]
+
+
 def get_scheduled_matches(round=None):
-    xml_data = get_scheduled_matches_from_api_v1()
-    if not xml_data:
+    index = get_schedule_index()
+    if index is None:
         return []
 
-    grouped_matches = parse_scheduled_matches(xml_data)
-    if not grouped_matches:
-        return []
+    now = datetime.now()
 
     # Si se pasa un número de ronda, filtramos los partidos por esa ronda
     if round:
-        if round in grouped_matches:
-            return grouped_matches[round]
-        else:
-            return []
+        return index.round(round, now)
 
     # Si no se pasa ronda, devolvemos TODOS los partidos de todas las jornadas con 'round'
-    print("📊 Devolviendo todos los partidos programados agrupados por jornada")
+    logger.debug("📊 Devolviendo todos los partidos programados agrupados por jornada")
+    return index.all(now)
+
+
+def get_scheduled_matches_for_team(team):
+    index = get_schedule_index()
+    return index.team(team, datetime.now()) if index else []
 
-    all_matches = []
-    for gameday, match_list in grouped_matches.items():
-        for match in match_list:
-            match["round"] = gameday  # Redundante si ya viene, pero asegura que esté
-            all_matches.append(match)
 
-    return all_matches
+def get_scheduled_matches_between(start, end):
+    index = get_schedule_index()
+    return index.between(start, end, datetime.now()) if index else []
@@ -0,0 +1,362 @@
+"""
+Archivo histórico de temporadas terminadas en disco, en formato columnar.
+
+Cada temporada cerrada se descarga una sola vez (partidos jugados y
+clasificación final) y se guarda como Feather/Arrow IPC sin comprimir en
+ARCHIVE_DIR. Las temporadas terminadas no cambian, así que un fichero que ya
+existe no se vuelve a pedir nunca (una temporada sin partidos se guarda como
+ficheros vacíos). Las que faltan se descargan en segundo plano: la primera
+consulta arranca el relleno y responde con lo que ya hay en disco, y
+pending() dice si lo que se ha pedido aún se está rellenando (los endpoints
+contestan entonces 202). Una temporada que falla, sea por los partidos o por
+la clasificación, no se vuelve a pedir hasta pasado ARCHIVE_RETRY_AFTER.
+
+Las consultas abren los ficheros con memory-map (sin copiar a memoria) y
+filtran con pyarrow.compute, así que "todos los resultados del equipo X
+desde 2015" o un historial de enfrentamientos se responden en milisegundos.
+
+Rellenar el archivo a mano (desde backend/):
+    python -m euroleague_api_wrappers.season_archive 2010 2024
+"""
+import os
+import sys
+import threading
+import time
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.feather as feather
+from euroleague_api.standings import Standings
+
+import metrics
+from app_logging import get_logger
+
+from euroleague_api_wrappers import team_registry
+from euroleague_api_wrappers.played_matches_wrapper import played_matches_to_records
+from euroleague_api_wrappers.season_metadata import fetch_full_season
+from euroleague_api_wrappers.season_utils import get_current_season_code
+
+logger = get_logger(__name__)
+
+ARCHIVE_DIR = os.environ.get(
+    "EUROLEAGUE_ARCHIVE_DIR",
+    os.path.join(os.path.dirname(__file__), "..", "data", "archive"),
+)
+# Primera temporada con datos en el feed v1 de la Euroliga
+FIRST_ARCHIVE_SEASON = int(os.environ.get("EUROLEAGUE_ARCHIVE_FIRST_SEASON", "2000"))
+# Segundos antes de volver a intentar una temporada que falló al descargarse
+ARCHIVE_RETRY_AFTER = 3600
+
+GAMES_SCHEMA = pa.schema([
+    ("season", pa.int16()),
+    ("round", pa.int16()),
+    ("datetime", pa.string()),
+    ("home_team", pa.string()),
+    ("away_team", pa.string()),
+    ("home_code", pa.string()),
+    ("away_code", pa.string()),
+    ("home_score", pa.int16()),
+    ("away_score", pa.int16()),
+    ("arena", pa.string()),
+])
+
+_archive_lock = threading.Lock()
+_games = {"files": None, "table": None}  # tabla concatenada de todos los ficheros mapeados
+# Las descargas van con su propio lock: las consultas no esperan al relleno
+_backfill_lock = threading.Lock()
+_backfill_start_lock = threading.Lock()
+_backfill = {"thread": None, "failed": {}}  # failed: temporada -> {"at", "error"}
+
+
+def _games_path(season):
+    return os.path.join(ARCHIVE_DIR, f"games_{season}.feather")
+
+
+def _standings_path(season):
+    return os.path.join(ARCHIVE_DIR, f"standings_{season}.feather")
+
+
+def finished_seasons(since=None, until=None):
+    """
+    Temporadas que ya no pueden cambiar (anteriores a la actual), acotadas a [since, until].
+    """
+    last = get_current_season_code() - 1
+    first = max(FIRST_ARCHIVE_SEASON, since or FIRST_ARCHIVE_SEASON)
+    return list(range(first, min(last, until if until is not None else last) + 1))
+
+
+def _write_table(table, path):
+    # Sin compresión: es lo que permite leerlo con memory-map sin copiar
+    tmp_path = f"{path}.tmp"
+    feather.write_feather(table, tmp_path, compression="uncompressed")
+    os.replace(tmp_path, path)
+
+
+def _games_table(season, df):
+    played = df[df["played"] == True]
+    records = played_matches_to_records(played)
+    home_codes = played["homecode"].astype(str).tolist() if "homecode" in played.columns else [""] * len(records)
+    away_codes = played["awaycode"].astype(str).tolist() if "awaycode" in played.columns else [""] * len(records)
+    columns = {
+        "season": [season] * len(records),
+        "round": [r["round"] for r in records],
+        "datetime": [r["datetime"] for r in records],
+        "home_team": [r["home_team"] for r in records],
+        "away_team": [r["away_team"] for r in records],
+        "home_code": home_codes,
+        "away_code": away_codes,
+        "home_score": [r["home_score"] for r in records],
+        "away_score": [r["away_score"] for r in records],
+        "arena": [str(r["arena"]) for r in records],
+    }
+    return pa.table(columns, schema=GAMES_SCHEMA)
+
+
+def _arrow_columns(standings):
+    """
+    La API devuelve algunas columnas anidadas o con tipos mezclados que Arrow
+    no puede guardar: sólo esas se pasan a texto; las numéricas conservan su
+    tipo, como en la clasificación en vivo.
+    """
+    standings = standings.copy()
+    for column in standings.columns:
+        if standings[column].dtype != object:
+            continue
+        try:
+            if not pa.types.is_nested(pa.array(standings[column], from_pandas=True).type):
+                continue
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            pass
+        standings[column] = standings[column].astype(str)
+    return standings
+
+
+def _archive_standings(season, last_round):
+    if last_round is None:
+        # Sin partidos no hay clasificación: fichero vacío para no volver a pedirla
+        _write_table(pa.table({"season": pa.array([], pa.int16())}), _standings_path(season))
+        return
+    with metrics.track_upstream("euroleague_archive"):
+        standings = Standings().get_standings(season=season, round_number=last_round)
+    standings = _arrow_columns(standings)
+    standings.insert(0, "season", season)
+    _write_table(pa.Table.from_pandas(standings, preserve_index=False), _standings_path(season))
+
+
+def _archive_season(season):
+    """
+    Descarga lo que falte de la temporada: partidos y después clasificación.
+    Si ya están los partidos, la última jornada se saca del fichero.
+    """
+    if os.path.exists(_games_path(season)):
+        rounds = _read_mapped(_games_path(season))["round"]
+        last_round = pc.max(rounds).as_py() if len(rounds) else None
+    else:
+        with metrics.track_upstream("euroleague_archive"):
+            df = fetch_full_season(season)
+        if df.empty or not (df["played"] == True).any():
+            _write_table(GAMES_SCHEMA.empty_table(), _games_path(season))
+            logger.warning("⚠️ Temporada %s sin partidos jugados: archivada vacía", season)
+            last_round = None
+        else:
+            _write_table(_games_table(season, df), _games_path(season))
+            last_round = int(df.loc[df["played"] == True, "gameday"].max())
+            logger.info("🗄️ Temporada %s-%s archivada: %d partidos", season, season + 1, len(df))
+    _archive_standings(season, last_round)
+
+
+def _archived(season):
+    return os.path.exists(_games_path(season)) and os.path.exists(_standings_path(season))
+
+
+def _missing(seasons, retry_failed):
+    now = time.time()
+    failed = _backfill["failed"]
+    return [
+        s for s in seasons
+        if not _archived(s)
+        and (retry_failed or s not in failed or now - failed[s]["at"] >= ARCHIVE_RETRY_AFTER)
+    ]
+
+
+def ensure_archived(seasons=None, retry_failed=False):
+    """
+    Descarga las temporadas terminadas que falten en disco. Las que ya están no
+    se vuelven a pedir y las que fallaron hace menos de ARCHIVE_RETRY_AFTER
+    tampoco (salvo con retry_failed).
+    """
+    seasons = finished_seasons() if seasons is None else seasons
+    if not _missing(seasons, retry_failed):
+        return
+    with _backfill_lock:
+        os.makedirs(ARCHIVE_DIR, exist_ok=True)
+        for season in _missing(seasons, retry_failed):
+            try:
+                _archive_season(season)
+                _backfill["failed"].pop(season, None)
+            except Exception as e:
+                _backfill["failed"][season] = {"at": time.time(), "error": str(e)}
+                logger.error("❌ No se pudo archivar la temporada %s: %s", season, e)
+
+
+def start_backfill():
+    """
+    Rellena en segundo plano las temporadas que faltan. No hace nada si ya
+    hay un relleno en marcha o no falta ninguna.
+    """
+    with _backfill_start_lock:
+        thread = _backfill["thread"]
+        if thread is not None and thread.is_alive():
+            return
+        if not _missing(finished_seasons(), retry_failed=False):
+            return
+        thread = _backfill["thread"] = threading.Thread(target=ensure_archived, daemon=True, name="archive-backfill")
+        thread.start()
+
+
+def pending(since=None, until=None, standings=False):
+    """
+    True si a alguna temporada terminada de [since, until] todavía le faltan
+    los partidos (o la clasificación, con standings=True) y el relleno está en
+    marcha: lo que devuelva una consulta ahora puede estar incompleto.
+    """
+    thread = _backfill["thread"]
+    if thread is None or not thread.is_alive():
+        return False
+    path = _standings_path if standings else _games_path
+    return any(not os.path.exists(path(s)) for s in finished_seasons(since, until))
+
+
+def _read_mapped(path):
+    with pa.memory_map(path, "r") as source:
+        return pa.ipc.open_file(source).read_all()
+
+
+def _load_games():
+    """
+    Tabla con todos los partidos archivados. Se reconstruye sólo cuando
+    aparece un fichero nuevo; los buffers apuntan al memory-map.
+    """
+    files = sorted(f for f in os.listdir(ARCHIVE_DIR) if f.startswith("games_") and f.endswith(".feather")) \
+        if os.path.isdir(ARCHIVE_DIR) else []
+    with _archive_lock:
+        if _games["files"] != files:
+            tables = [_read_mapped(os.path.join(ARCHIVE_DIR, f)) for f in files]
+            _games["table"] = pa.concat_tables(tables) if tables else GAMES_SCHEMA.empty_table()
+            _games["files"] = files
+        return _games["table"]
+
+
+def _team_code(table, team):
+    """
+    Código de club del equipo pedido: el propio código si lo es (del registro
+    o de un club antiguo que sólo está en el archivo) o el que resuelva el
+    registro a partir del nombre. None si no se reconoce.
+    """
+    code = team.strip().upper()
+    if team_registry.get_team(code):
+        return code
+    resolved = team_registry.resolve(team)
+    if resolved:
+        return resolved
+    for side in ("home", "away"):
+        if pc.any(pc.equal(table[f"{side}_code"], code)).as_py():
+            return code
+    return None
+
+
+def _team_mask(table, team):
+    """
+    Por código de club, que es estable entre temporadas. Sólo si el equipo no
+    tiene código conocido se busca por nombre, que cambia con los
+    patrocinadores: "barcelona" encuentra también "FC Barcelona Lassa".
+    Un código nunca se busca como trozo de nombre ("TEL" no es "Hapoel Tel Aviv").
+    """
+    code = _team_code(table, team)
+    if code is not None:
+        return pc.equal(table["home_code"], code), pc.equal(table["away_code"], code)
+    needle = team.strip().lower()
+    return tuple(pc.match_substring(pc.utf8_lower(table[f"{side}_team"]), needle) for side in ("home", "away"))
+
+
+def _query(since, until, mask_fn):
+    start_backfill()
+    table = _load_games()
+    if since is not None:
+        table = table.filter(pc.greater_equal(table["season"], since))
+    if until is not None:
+        table = table.filter(pc.less_equal(table["season"], until))
+    return table.filter(mask_fn(table)).sort_by([("datetime", "ascending")])
+
+
+def _with_team_ids(rows):
+    # En el archivo el código de club ya es el id canónico
+    for row in rows:
+        row["home_team_id"] = row["home_code"] or None
+        row["away_team_id"] = row["away_code"] or None
+    return rows
+
+
+def get_team_results(team, since=None, until=None):
+    """
+    Partidos archivados de un equipo en las temporadas [since, until] (año de inicio).
+    """
+    def mask(table):
+        home, away = _team_mask(table, team)
+        return pc.or_(home, away)
+    return _with_team_ids(_query(since, until, mask).to_pylist())
+
+
+def get_head_to_head(team1, team2, since=None, until=None):
+    """
+    Enfrentamientos archivados entre dos equipos y el balance de victorias.
+    """
+    def mask(table):
+        home1, away1 = _team_mask(table, team1)
+        home2, away2 = _team_mask(table, team2)
+        return pc.or_(pc.and_(home1, away2), pc.and_(home2, away1))
+
+    table = _query(since, until, mask)
+    team1_home, _ = _team_mask(table, team1)
+    home_won = pc.greater(table["home_score"], table["away_score"])
+    team1_wins = pc.sum(pc.equal(home_won, team1_home).cast(pa.int32())).as_py() or 0
+    return {
+        "team1": team1,
+        "team2": team2,
+        "games": _with_team_ids(table.to_pylist()),
+        "team1_wins": team1_wins,
+        "team2_wins": table.num_rows - team1_wins,
+    }
+
+
+def get_archived_standings(season):
+    """
+    Clasificación final archivada de una temporada terminada, o [] si no está disponible.
+    """
+    if season not in finished_seasons():
+        return []
+    start_backfill()
+    path = _standings_path(season)
+    if not os.path.exists(path):
+        return []
+    return _read_mapped(path).to_pylist()
+
+
+def get_archive_stats():
+    files = sorted(os.listdir(ARCHIVE_DIR)) if os.path.isdir(ARCHIVE_DIR) else []
+    seasons = sorted(int(f[6:-8]) for f in files if f.startswith("games_") and f.endswith(".feather"))
+    return {
+        "archive_dir": os.path.abspath(ARCHIVE_DIR),
+        "seasons": seasons,
+        "games": _load_games().num_rows,
+        "bytes": sum(os.path.getsize(os.path.join(ARCHIVE_DIR, f)) for f in files),
+        "backfill_running": bool(_backfill["thread"] and _backfill["thread"].is_alive()),
+        "failed": {season: dict(failure) for season, failure in _backfill["failed"].items()},
+    }
+
+
+if __name__ == "__main__":
+    first = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    last = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    ensure_archived(finished_seasons(first, last), retry_failed=True)
+    print(get_archive_stats())
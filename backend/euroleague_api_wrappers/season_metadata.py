@@ -0,0 +1,182 @@
+import threading
+import time
+
+import pandas as pd
+import requests
+import xmltodict
+from requests.adapters import HTTPAdapter
+from euroleague_api.EuroLeagueData import EuroLeagueData
+
+import upstream
+from app_logging import get_logger
+
+logger = get_logger(__name__)
+
+# Segundos que se sirve la metadata de temporada sin volver a consultar la API
+SEASON_METADATA_TTL = 300
+# Cada cuánto se descarga la temporada entera aunque haya caché (cambios de calendario)
+SEASON_METADATA_FULL_RELOAD = 6 * 3600
+V1_RESULTS_URL = "https://api-live.euroleague.net/v1/results"
+COMPETITION = "E"
+
+session = requests.Session()
+session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=8))
+
+_store = {}  # season -> {"rounds": {gameday: DataFrame}, "df": DataFrame, "fetched_at": float, "full_at": float}
+_store_lock = threading.Lock()
+_season_locks = {}
+
+
+def _season_lock(season):
+    with _store_lock:
+        return _season_locks.setdefault(season, threading.Lock())
+
+
+def _normalize(df):
+    """
+    Tipos homogéneos entre la descarga completa y la de una sola ronda.
+    """
+    df = df.copy()
+    for col in ("gameday", "homescore", "awayscore"):
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0).astype(int)
+    if "played" in df.columns:
+        df["played"] = df["played"].map(lambda v: v is True or str(v).strip().lower() == "true")
+    return df
+
+
+def fetch_full_season(season):
+    """
+    Descarga la metadata de todos los partidos de una temporada (sin caché).
+    """
+    euro = EuroLeagueData(competition=COMPETITION)
+    df = upstream.call("euroleague_season", euro.get_game_metadata_season, season)
+    return _normalize(df)
+
+
+def _get_round(season, round_number):
+    response = session.get(
+        V1_RESULTS_URL,
+        params={"seasonCode": f"{COMPETITION}{season}", "gameNumber": round_number},
+        timeout=upstream.timeout("euroleague_results_round"),
+    )
+    response.raise_for_status()
+    return response.content
+
+
+def _fetch_round(season, round_number):
+    """
+    Descarga sólo los partidos de una ronda (mismo feed v1 que la temporada completa).
+    """
+    content = upstream.call("euroleague_results_round", _get_round, season, round_number)
+    data = xmltodict.parse(content)
+    games = (data.get("results") or {}).get("game") or []
+    if isinstance(games, dict):
+        games = [games]
+    return _normalize(pd.DataFrame(games))
+
+
+def _split_rounds(df):
+    return {int(gameday): round_df for gameday, round_df in df.groupby("gameday")}
+
+
+def _join_rounds(rounds):
+    if not rounds:
+        return pd.DataFrame()
+    return pd.concat([rounds[r] for r in sorted(rounds)], ignore_index=True)
+
+
+def _open_rounds(rounds):
+    """
+    Rondas que todavía pueden cambiar: las que tienen algún partido sin jugar,
+    hasta la primera ronda que aún no ha empezado (las futuras se actualizan
+    con la recarga completa periódica).
+    """
+    open_rounds = []
+    for r in sorted(rounds):
+        played = rounds[r]["played"]
+        if played.all():
+            continue
+        open_rounds.append(r)
+        if not played.any():
+            break
+    return open_rounds
+
+
+def _refresh_incremental(season, entry):
+    rounds = dict(entry["rounds"])
+    to_fetch = _open_rounds(rounds)
+    # La siguiente ronda puede aparecer más tarde (p. ej. playoffs)
+    next_round = max(rounds) + 1 if rounds else 1
+    to_fetch.append(next_round)
+
+    for round_number in to_fetch:
+        round_df = _fetch_round(season, round_number)
+        if round_df.empty or "gameday" not in round_df.columns:
+            if round_number != next_round:
+                raise ValueError(f"Ronda {round_number} de {season} sin datos")
+            continue
+        rounds[round_number] = round_df
+
+    logger.info("♻️ Metadata %s: refrescadas %d rondas abiertas de %d", season, len(to_fetch), len(rounds))
+    return rounds
+
+
+def get_season_metadata(season: int) -> pd.DataFrame:
+    """
+    Devuelve la metadata de partidos de la temporada desde la caché compartida.
+
+    La primera vez descarga la temporada completa; cuando expira el TTL sólo
+    vuelve a pedir las rondas con partidos pendientes. El DataFrame devuelto es
+    compartido: filtrarlo está bien, modificarlo in place no.
+    """
+    entry = _store.get(season)
+    if entry and time.time() - entry["fetched_at"] < SEASON_METADATA_TTL:
+        return entry["df"]
+
+    with _season_lock(season):
+        # Otro hilo pudo refrescarla mientras esperábamos el lock
+        entry = _store.get(season)
+        if entry and time.time() - entry["fetched_at"] < SEASON_METADATA_TTL:
+            return entry["df"]
+
+        rounds = None
+        full_at = entry["full_at"] if entry else 0.0
+        if entry and entry["rounds"] and time.time() - full_at < SEASON_METADATA_FULL_RELOAD:
+            try:
+                rounds = _refresh_incremental(season, entry)
+            except Exception as e:
+                logger.warning("⚠️ Refresco incremental de %s falló, descargando temporada completa: %s", season, e)
+
+        if rounds is None:
+            try:
+                rounds = _split_rounds(fetch_full_season(season))
+            except Exception as e:
+                if not entry:
+                    raise
+                logger.warning("⚠️ No se pudo descargar la temporada %s, sirviendo caché anterior: %s", season, e)
+                return entry["df"]
+            full_at = time.time()
+
+        df = _join_rounds(rounds)
+        with _store_lock:
+            _store[season] = {"rounds": rounds, "df": df, "fetched_at": time.time(), "full_at": full_at}
+        return df
+
+
+def invalidate_season_metadata(season=None, full=False):
+    """
+    Marca la metadata como caducada para que la próxima lectura la refresque.
+
+    Con `full=True` se descarta por completo y se vuelve a bajar la temporada
+    entera; si no, sólo se refrescan las rondas abiertas.
+    """
+    with _store_lock:
+        seasons = list(_store) if season is None else [season]
+        for s in seasons:
+            if s not in _store:
+                continue
+            if full:
+                del _store[s]
+            else:
+                _store[s]["fetched_at"] = 0.0
@@ -1,5 +1,8 @@
 from datetime import datetime
-from euroleague_api.EuroLeagueData import EuroLeagueData
+from euroleague_api_wrappers.season_metadata import get_season_metadata
+from app_logging import get_logger
+
+logger = get_logger(__name__)
 
 def get_current_season_code() -> int:
     """
@@ -21,14 +24,13 @@ def get_latest_round(season: int) -> int:
         int: Número de la última ronda/jornada
     """
     try:
-        euro = EuroLeagueData(competition="E")
-        df = euro.get_game_metadata_season(season)
+        df = get_season_metadata(season)
         df_played = df[df["played"] == True]
 
         if not df_played.empty and "gameday" in df_played.columns:
             return int(df_played["gameday"].max())
 
     except Exception as e:
-        print(f"❌ Error obteniendo rondas de la Euroliga: {e}")
+        logger.error("❌ Error obteniendo rondas de la Euroliga: %s", e)
 
     return None
@@ -0,0 +1,343 @@
+"""
+Clasificación calculada en local a partir de los resultados de la temporada.
+
+La tabla se mantiene con los partidos jugados de get_season_metadata: cada
+resultado nuevo toca sólo a sus dos equipos y se reordena la tabla (O(equipos)).
+Encima de la tabla se puede "plegar" el marcador de los partidos en vivo
+para obtener la clasificación provisional tal y como va.
+
+La clasificación de la API (Standings().get_standings) ya no se pide por
+petición: sólo cada STANDINGS_RECONCILE_INTERVAL para comprobar que la tabla
+local coincide (si no, se reconstruye) y para tomar los datos de club
+(nombre, escudo...) que espera el frontend.
+
+Una tabla publicada no se modifica: los resultados nuevos y la
+reconciliación se aplican sobre una copia, fuera de _seasons_lock (las
+descargas pueden tardar), y la copia se publica al terminar. Mientras tanto
+las peticiones siguen leyendo la tabla anterior sin esperar.
+"""
+import copy
+import threading
+import time
+
+from euroleague_api.standings import Standings
+
+import upstream
+from app_logging import get_logger
+
+from euroleague_api_wrappers import team_registry
+from euroleague_api_wrappers.season_metadata import get_season_metadata
+from euroleague_api_wrappers.season_utils import get_latest_round
+
+logger = get_logger(__name__)
+
+STANDINGS_RECONCILE_INTERVAL = 3600
+FORM_LENGTH = 5
+REGULAR_SEASON = "RS"
+
+_seasons = {}  # season -> _SeasonTable publicada (no se modifica)
+_seasons_lock = threading.Lock()
+_refresh_locks = {}  # season -> Lock: una sola actualización a la vez por temporada
+
+# Última clasificación en vivo calculada: se repite mientras no cambien ni la
+# tabla ni los marcadores en vivo
+_live = {"table": None, "key": None, "rows": None}
+_live_lock = threading.Lock()
+
+
+def _team_key(code, name):
+    # Id canónico del registro de equipos; sin él, el nombre tal cual
+    return team_registry.team_id(name, code) or str(name).strip().lower()
+
+
+def _like(template, value, as_text):
+    """
+    Devuelve el número con el mismo formato que trae la API en ese campo.
+    """
+    if isinstance(template, str):
+        return as_text
+    return value
+
+
+def _add_result(teams, results, home_key, away_key, home_score, away_score):
+    home_won = home_score > away_score
+    for key, scored, conceded, won in (
+        (home_key, home_score, away_score, home_won),
+        (away_key, away_score, home_score, not home_won),
+    ):
+        team = teams[key]
+        team["won" if won else "lost"] += 1
+        team["points_for"] += scored
+        team["points_against"] += conceded
+        team["form"] = (team["form"] + ["W" if won else "L"])[-FORM_LENGTH:]
+    pair = (home_key, away_key) if home_won else (away_key, home_key)
+    results[pair] = results.get(pair, 0) + 1
+
+
+class _SeasonTable:
+    def __init__(self, season):
+        self.season = season
+        self.upstream = {}       # key -> fila de la API (datos de club y formato)
+        self.reconciled_at = 0.0
+        self.stats = {"games_applied": 0, "rebuilds": 0, "reconciliations": 0, "mismatches": 0}
+        self.reset()
+
+    def reset(self):
+        self.teams = {}          # key -> contadores del equipo
+        self.results = {}        # (ganador, perdedor) -> victorias
+        self.applied = set()     # partidos ya sumados
+        self.order = []          # claves ordenadas por posición
+        self.metadata_df = None  # último DataFrame de metadata procesado
+
+    def copy(self):
+        """
+        Copia sobre la que aplicar cambios sin tocar la tabla publicada.
+        """
+        clone = copy.copy(self)
+        clone.teams = {key: dict(team, form=list(team["form"])) for key, team in self.teams.items()}
+        clone.results = dict(self.results)
+        clone.applied = set(self.applied)
+        clone.order = list(self.order)
+        clone.stats = dict(self.stats)
+        return clone
+
+    def apply_game(self, game_id, home, away, home_score, away_score):
+        """
+        Suma un resultado. home/away son (clave, nombre). Sólo toca a dos equipos.
+        """
+        if game_id in self.applied:
+            return False
+        self.applied.add(game_id)
+        for key, name in (home, away):
+            if key not in self.teams:
+                self.teams[key] = {"name": name, "won": 0, "lost": 0,
+                                   "points_for": 0, "points_against": 0, "form": []}
+        _add_result(self.teams, self.results, home[0], away[0], home_score, away_score)
+        self.stats["games_applied"] += 1
+        return True
+
+    def rank(self, teams=None, results=None):
+        """
+        Orden por victorias; los empates se deshacen por el balance entre los
+        equipos empatados y después por diferencia de puntos.
+        """
+        teams = self.teams if teams is None else teams
+        results = self.results if results is None else results
+        by_wins = {}
+        for key, team in teams.items():
+            by_wins.setdefault(team["won"], []).append(key)
+
+        order = []
+        for wins in sorted(by_wins, reverse=True):
+            group = by_wins[wins]
+            if len(group) > 1:
+                # Copia: durante group.sort() la lista se ve vacía desde la clave
+                tied = tuple(group)
+
+                def tiebreak(key):
+                    h2h = sum(results.get((key, other), 0) for other in tied if other != key)
+                    team = teams[key]
+                    return (-h2h, -(team["points_for"] - team["points_against"]), -team["points_for"])
+                group.sort(key=tiebreak)
+            order += group
+        return order
+
+    def records(self, teams=None, order=None, live=None):
+        teams = self.teams if teams is None else teams
+        order = self.order if order is None else order
+        rows = []
+        for position, key in enumerate(order, start=1):
+            team = teams[key]
+            template = self.upstream.get(key, {})
+            played = team["won"] + team["lost"]
+            pct = 100.0 * team["won"] / played if played else 0.0
+            diff = team["points_for"] - team["points_against"]
+            row = dict(template)
+            row.setdefault("club.code", key)
+            row.setdefault("club.name", team["name"])
+            row.update({
+                "team_id": key,
+                "position": position,
+                "gamesPlayed": played,
+                "gamesWon": team["won"],
+                "gamesLost": team["lost"],
+                "winPercentage": _like(template.get("winPercentage"), round(pct, 2), f"{pct:.2f}%"),
+                "pointsFor": team["points_for"],
+                "pointsAgainst": team["points_against"],
+                "pointsDifference": _like(template.get("pointsDifference"), diff, f"{diff:+d}"),
+                "last5Form": list(team["form"]),
+            })
+            if live is not None:
+                row["live"] = key in live
+            rows.append(row)
+        return rows
+
+    def find_team(self, team_id, name=None):
+        """
+        Clave en la tabla de un equipo por su id canónico o, si no lo trae, por su nombre.
+        """
+        key = team_id or team_registry.resolve(name)
+        return key if key in self.teams else None
+
+
+def _games_from_metadata(df):
+    """
+    Partidos jugados de fase regular: (id, (clave, nombre) local, visitante, puntos local, puntos visitante).
+    """
+    if df.empty:
+        return
+    played = df[df["played"] == True]
+    if "round" in played.columns:
+        played = played[played["round"].fillna(REGULAR_SEASON).astype(str).str.upper() == REGULAR_SEASON]
+    has_codes = "homecode" in played.columns and "awaycode" in played.columns
+    for row in played.itertuples(index=False):
+        home_code = row.homecode if has_codes else None
+        away_code = row.awaycode if has_codes else None
+        home = (_team_key(home_code, row.hometeam), row.hometeam)
+        away = (_team_key(away_code, row.awayteam), row.awayteam)
+        game_id = getattr(row, "gamecode", None) or (row.gameday, home[0], away[0])
+        yield game_id, home, away, int(row.homescore), int(row.awayscore)
+
+
+def _sync(table):
+    """
+    Suma los resultados nuevos de la metadata (cacheada con TTL en
+    season_metadata). Si el DataFrame no ha cambiado no se recorre.
+    """
+    df = get_season_metadata(table.season)
+    if df is table.metadata_df:
+        return
+    changed = False
+    for game in _games_from_metadata(df):
+        changed |= table.apply_game(*game)
+    table.metadata_df = df
+    if changed or not table.order:
+        table.order = table.rank()
+
+
+def _reconcile(table):
+    """
+    Compara con la clasificación de la API. Si algún equipo no cuadra, la tabla
+    local se reconstruye desde la metadata.
+    """
+    round_number = get_latest_round(table.season)
+    if round_number is None:
+        return
+    df = upstream.call("euroleague_standings", Standings().get_standings, season=table.season, round_number=round_number)
+    api_rows = {}
+    for row in df.to_dict(orient="records"):
+        # Los nombres de club de la API (completo, abreviado, editorial) enseñan alias al registro
+        team_registry.register(row.get("club.code"), row.get("club.name"),
+                               aliases=(row.get("club.abbreviatedName"), row.get("club.editorialName")),
+                               crest=row.get("club.images.crest"))
+        api_rows[_team_key(row.get("club.code"), row.get("club.name"))] = row
+    table.upstream = api_rows
+    table.reconciled_at = time.time()
+    table.stats["reconciliations"] += 1
+
+    mismatched = [
+        key for key, row in api_rows.items()
+        if key in table.teams and (int(row.get("gamesWon", -1)) != table.teams[key]["won"]
+                                   or int(row.get("gamesLost", -1)) != table.teams[key]["lost"])
+    ]
+    if mismatched:
+        logger.warning("⚠️ Clasificación local de %s no cuadra con la API (%s), reconstruyendo",
+                       table.season, ", ".join(mismatched))
+        table.stats["mismatches"] += 1
+        table.stats["rebuilds"] += 1
+        table.reset()
+        _sync(table)
+
+
+def _refresh_lock(season):
+    with _seasons_lock:
+        return _refresh_locks.setdefault(season, threading.Lock())
+
+
+def _needs_refresh(table, df):
+    return table is None or df is not table.metadata_df \
+        or time.time() - table.reconciled_at >= STANDINGS_RECONCILE_INTERVAL
+
+
+def _get_table(season):
+    """
+    Tabla publicada de la temporada, al día. Si hay que actualizarla se hace
+    sobre una copia; si otro hilo ya lo está haciendo se devuelve la anterior.
+    """
+    table = _seasons.get(season)
+    if not _needs_refresh(table, get_season_metadata(season)):
+        return table
+
+    lock = _refresh_lock(season)
+    # Sin tabla todavía no hay nada que servir: se espera a la primera
+    if not lock.acquire(blocking=table is None):
+        return table
+    try:
+        table = _seasons.get(season)
+        if not _needs_refresh(table, get_season_metadata(season)):
+            return table
+        new = table.copy() if table is not None else _SeasonTable(season)
+        _sync(new)
+        if time.time() - new.reconciled_at >= STANDINGS_RECONCILE_INTERVAL:
+            try:
+                _reconcile(new)
+            except Exception as e:
+                # Sin API se sigue sirviendo la tabla local; se reintenta en el siguiente intervalo
+                new.reconciled_at = time.time()
+                logger.warning("⚠️ No se pudo reconciliar la clasificación de %s: %s", season, e)
+        with _seasons_lock:
+            _seasons[season] = new
+        return new
+    finally:
+        lock.release()
+
+
+def get_standings(season):
+    """
+    Clasificación de la temporada con el mismo formato de filas que la API.
+    """
+    return _get_table(season).records()
+
+
+def _live_key(live_matches):
+    return tuple((m.team1_id, m.team1, m.team2_id, m.team2, m.score1, m.score2) for m in live_matches)
+
+
+def get_live_standings(season, live_matches):
+    """
+    Clasificación "tal y como va": los partidos en vivo cuentan como si
+    terminasen con el marcador actual. Cada fila lleva "live": True si su
+    equipo está jugando. Se recalcula sólo cuando cambia la tabla o algún
+    marcador en vivo.
+    """
+    table = _get_table(season)
+    live_key = _live_key(live_matches)
+    with _live_lock:
+        if _live["table"] is table and _live["key"] == live_key:
+            return _live["rows"]
+
+    teams = {key: dict(team, form=list(team["form"])) for key, team in table.teams.items()}
+    results = dict(table.results)
+    live = set()
+    for match in live_matches:
+        home_key = table.find_team(match.team1_id, match.team1)
+        away_key = table.find_team(match.team2_id, match.team2)
+        if match.score1 is None or match.score2 is None or home_key is None or away_key is None \
+                or match.score1 == match.score2:
+            continue
+        live |= {home_key, away_key}
+        _add_result(teams, results, home_key, away_key, match.score1, match.score2)
+    rows = table.records(teams, table.rank(teams, results), live)
+
+    with _live_lock:
+        _live.update(table=table, key=live_key, rows=rows)
+    return rows
+
+
+def get_standings_stats():
+    with _seasons_lock:
+        return {
+            season: dict(table.stats, teams=len(table.teams), games=len(table.applied),
+                         reconciled_at=table.reconciled_at)
+            for season, table in _seasons.items()
+        }
@@ -1,23 +1,51 @@
 from euroleague_api.standings import Standings
 from euroleague_api_wrappers.season_utils import get_current_season_code, get_latest_round
+from euroleague_api_wrappers.standings_engine import get_standings, get_live_standings
+from euroleague_api_wrappers import team_registry
+import upstream
+from app_logging import get_logger
 
-def get_euroleague_standings():
-    try:
-        season = get_current_season_code()
-        round_number = get_latest_round(season)
+logger = get_logger(__name__)
 
-        if round_number is None:
-            print("❌ No se pudo determinar la ronda actual.")
-            return []
+def _get_upstream_standings(season):
+    round_number = get_latest_round(season)
 
-        print(f"📊 Obteniendo standings de la temporada {season}-{season+1}, ronda {round_number}")
+    if round_number is None:
+        logger.error("❌ No se pudo determinar la ronda actual.")
+        return []
 
-        standings_api = Standings()  # Por defecto usa "E" para Euroleague
-        df = standings_api.get_standings(season=season, round_number=round_number)
+    logger.info("📊 Obteniendo standings de la temporada %s-%s, ronda %s", season, season + 1, round_number)
 
-        data = df.to_dict(orient="records")
-        return data
+    standings_api = Standings()  # Por defecto usa "E" para Euroleague
+    df = upstream.call("euroleague_standings", standings_api.get_standings, season=season, round_number=round_number)
 
+    records = df.to_dict(orient="records")
+    for row in records:
+        row["team_id"] = team_registry.team_id(row.get("club.name"), row.get("club.code"))
+    return records
+
+def get_euroleague_standings():
+    """
+    Clasificación calculada en local (standings_engine). Si todavía no hay
+    resultados con los que calcularla se pide directamente a la API.
+    """
+    try:
+        season = get_current_season_code()
+        data = get_standings(season)
+        if data:
+            return data
+        return _get_upstream_standings(season)
+
+    except Exception as e:
+        logger.error("❌ Error al obtener standings de la Euroliga: %s", e)
+        return []
+
+def get_live_euroleague_standings(live_matches):
+    """
+    Clasificación provisional con los partidos en vivo como si acabasen ahora.
+    """
+    try:
+        return get_live_standings(get_current_season_code(), live_matches)
     except Exception as e:
-        print(f"❌ Error al obtener standings de la Euroliga: {e}")
+        logger.error("❌ Error al calcular standings en vivo: %s", e)
         return []
@@ -0,0 +1,209 @@
+"""
+Registro canónico de equipos: cada equipo se identifica por su código de club
+de la Euroliga ("MAD", "BAR", "ULK"...), que es estable entre temporadas y
+patrocinadores.
+
+Los nombres de cualquier fuente (Flashscore, feeds v1, clasificación v3) se
+resuelven a ese id con un índice de alias precalculado: cada nombre conocido
+genera sus claves normalizadas (sin tildes ni signos, sin "FC"/"BC"...) al
+registrarse, así que resolver un nombre es una consulta a un dict. Si la
+clave exacta no existe se prueba con el prefijo de 6 letras que usaba el
+frontend y con las palabras distintivas del nombre ("Maccabi Playtika Tel
+Aviv" → "maccabi"), siempre que el nombre tenga más palabras conocidas que
+desconocidas ("Hapoel Jerusalem" no es "Hapoel Tel Aviv"). Las claves y
+palabras que comparten dos equipos ("istanbul", "aviv") no resuelven a
+ninguno.
+
+El registro arranca con SEED_TEAMS (nombres de Flashscore incluidos) y
+aprende los nombres que traen los datos de la Euroliga junto a su código.
+"""
+import re
+import threading
+import unicodedata
+
+from app_logging import get_logger
+
+logger = get_logger(__name__)
+
+# Código de club -> (nombre oficial, alias conocidos: Flashscore, nombres cortos y antiguos)
+SEED_TEAMS = {
+    "ASV": ("LDLC ASVEL Villeurbanne", ["Asvel", "ASVEL Lyon-Villeurbanne", "Lyon-Villeurbanne"]),
+    "BAR": ("FC Barcelona", ["Barcelona", "Barça", "FC Barcelona Lassa"]),
+    "BAS": ("Baskonia Vitoria-Gasteiz", ["Baskonia", "Saski Baskonia", "Kosner Baskonia"]),
+    "BER": ("ALBA Berlin", ["Alba Berlin", "Alba"]),
+    "DUB": ("Dubai Basketball", ["Dubai", "Dubai BC"]),
+    "HTA": ("Hapoel IBI Tel Aviv", ["Hapoel Tel Aviv", "Hapoel Tel-Aviv"]),
+    "IST": ("Anadolu Efes Istanbul", ["Anadolu Efes", "Efes"]),
+    "MAD": ("Real Madrid", ["Real"]),
+    "MCO": ("AS Monaco", ["Monaco"]),
+    "MIL": ("EA7 Emporio Armani Milan", ["Olimpia Milano", "Armani Milano", "EA7 Milano", "Milano", "Milan"]),
+    "MUN": ("FC Bayern Munich", ["Bayern", "Bayern Munich", "Bayern Munchen", "FC Bayern"]),
+    "OLY": ("Olympiacos Piraeus", ["Olympiacos", "Olympiakos"]),
+    "PAM": ("Valencia Basket", ["Valencia"]),
+    "PAN": ("Panathinaikos AKTOR Athens", ["Panathinaikos", "Panathinaikos Athens"]),
+    "PAR": ("Partizan Mozzart Bet Belgrade", ["Partizan", "Partizan Belgrade"]),
+    "PRS": ("Paris Basketball", ["Paris"]),
+    "RED": ("Crvena Zvezda Meridianbet Belgrade", ["Crvena zvezda", "Crvena Zvezda", "Red Star", "Red Star Belgrade"]),
+    "TEL": ("Maccabi Rapyd Tel Aviv", ["Maccabi Tel Aviv", "Maccabi Tel-Aviv", "Maccabi"]),
+    "ULK": ("Fenerbahce Beko Istanbul", ["Fenerbahce", "Fenerbahçe", "Fenerbahce Beko"]),
+    "VIR": ("Virtus Bologna", ["Virtus Segafredo Bologna", "Virtus"]),
+    "ZAL": ("Zalgiris Kaunas", ["Zalgiris", "Žalgiris"]),
+}
+
+# Palabras que no distinguen a un equipo
+_FILLER = {"fc", "bc", "kk", "sk", "bk", "pbc", "ac", "cb", "club", "basket", "basketball", "the", "de"}
+_MIN_TOKEN = 4
+
+_lock = threading.Lock()
+_teams = {}          # id -> {"id", "name", "aliases": [...], "crest"}
+_alias_owners = {}   # clave normalizada -> {ids}
+_prefix_owners = {}  # prefijo de 6 letras -> {ids}
+_token_owners = {}   # palabra distintiva -> {ids}
+_resolved = {}       # nombre normalizado -> id (memo de resolve; los fallos no se guardan)
+# Los nombres pueden venir del cliente (?team=): el memo no crece sin límite
+MAX_RESOLVED = 1024
+_stats = {"hits": 0, "misses": 0}
+_unresolved = set()
+
+
+def _tokens(name):
+    text = unicodedata.normalize("NFKD", str(name))
+    text = "".join(ch for ch in text if not unicodedata.combining(ch)).lower()
+    return re.findall(r"[a-z0-9]+", text)
+
+
+def _keys(name):
+    """
+    Claves exactas de un nombre: completo y sin palabras de relleno.
+    """
+    tokens = _tokens(name)
+    if not tokens:
+        return set()
+    keys = {"".join(tokens)}
+    significant = [t for t in tokens if t not in _FILLER]
+    if significant:
+        keys.add("".join(significant))
+    return keys
+
+
+def _prefix(name):
+    letters = "".join(ch for ch in "".join(_tokens(name)) if ch.isalpha())
+    return letters[:6] if len(letters) >= 6 else None
+
+
+def _distinctive(name):
+    return {t for t in _tokens(name) if len(t) >= _MIN_TOKEN and t not in _FILLER and not t.isdigit()}
+
+
+def _register_locked(team_id, name, aliases=(), crest=None):
+    team = _teams.get(team_id)
+    if team is None:
+        team = _teams[team_id] = {"id": team_id, "name": name or team_id, "aliases": [], "crest": None}
+    if crest:
+        team["crest"] = crest
+
+    added = False
+    for alias in (team_id, name, *aliases):
+        if not alias or alias in team["aliases"]:
+            continue
+        team["aliases"].append(alias)
+        for key in _keys(alias):
+            _alias_owners.setdefault(key, set()).add(team_id)
+        if _prefix(alias):
+            _prefix_owners.setdefault(_prefix(alias), set()).add(team_id)
+        for token in _distinctive(alias):
+            _token_owners.setdefault(token, set()).add(team_id)
+        added = True
+    if added:
+        # Un alias nuevo puede resolver (o volver ambiguo) un nombre ya consultado
+        _resolved.clear()
+
+
+def register(team_id, name=None, aliases=(), crest=None):
+    """
+    Da de alta (o amplía) un equipo. Barato si no trae nada nuevo.
+    """
+    if not team_id:
+        return None
+    team_id = str(team_id).strip().upper()
+    with _lock:
+        team = _teams.get(team_id)
+        if team is not None and (not name or name in team["aliases"]) \
+                and all(a in team["aliases"] for a in aliases if a) and (not crest or team["crest"] == crest):
+            return team_id
+        _register_locked(team_id, name, aliases, crest)
+    return team_id
+
+
+def _resolve_locked(name):
+    owners = set()
+    for key in _keys(name):
+        ids = _alias_owners.get(key)
+        if ids and len(ids) == 1:
+            owners |= ids
+    if len(owners) == 1:
+        return next(iter(owners))
+    if owners:
+        return None
+
+    tokens = _distinctive(name)
+    known = [t for t in tokens if t in _token_owners]
+    if len(known) <= len(tokens) - len(known):
+        return None
+    for ids in [_prefix_owners.get(_prefix(name))] + [_token_owners[t] for t in known]:
+        if ids and len(ids) == 1:
+            owners |= ids
+    return next(iter(owners)) if len(owners) == 1 else None
+
+
+def resolve(name):
+    """
+    Id canónico de un nombre de equipo de cualquier fuente, o None si no se reconoce o es ambiguo.
+    """
+    if not name:
+        return None
+    # La resolución sólo depende de las palabras normalizadas del nombre
+    key = " ".join(_tokens(name))
+    with _lock:
+        team_id = _resolved.get(key)
+        if team_id is None:
+            team_id = _resolve_locked(name)
+            if team_id is not None:
+                if len(_resolved) >= MAX_RESOLVED:
+                    _resolved.clear()
+                _resolved[key] = team_id
+            elif name not in _unresolved and len(_unresolved) < 100:
+                _unresolved.add(name)
+                logger.warning("⚠️ Equipo sin id canónico: %s", name)
+        _stats["hits" if team_id else "misses"] += 1
+    return team_id
+
+
+def team_id(name, code=None):
+    """
+    Id de un equipo que llega con nombre y, si la fuente lo trae, código de
+    club (que manda y además enseña el nombre al registro).
+    """
+    if code and str(code).strip() and str(code).strip().lower() != "nan":
+        return register(code, name)
+    return resolve(name)
+
+
+def get_team(team_id):
+    with _lock:
+        team = _teams.get(team_id)
+        return dict(team, aliases=list(team["aliases"])) if team else None
+
+
+def get_teams():
+    with _lock:
+        return [dict(team, aliases=list(team["aliases"])) for _, team in sorted(_teams.items())]
+
+
+def get_registry_stats():
+    with _lock:
+        return dict(_stats, teams=len(_teams), aliases=len(_alias_owners), unresolved=sorted(_unresolved))
+
+
+for _code, (_name, _aliases) in SEED_TEAMS.items():
+    register(_code, _name, _aliases)
@@ -1,58 +1,446 @@
+import hashlib
+import os
+import re
 import threading
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import replace
 
-from scrapper.scrapper import get_live_matches, get_match_details
+from scrapper import backends, models
+from scrapper.backends import get_live_matches, get_match_details, get_backend_stats
+from scrapper.driver_pool import driver_pool, resolve_driver_path
+from euroleague_api_wrappers.season_metadata import invalidate_season_metadata
+from euroleague_api_wrappers import team_registry
+import response_cache
+import encoded_json
+import match_timeline
+import metrics
+import upstream
+from app_logging import get_logger
 from datetime import datetime
 
+logger = get_logger(__name__)
+
+scrape_phase_seconds = metrics.Histogram("scrape_phase_seconds", "Duración de cada fase del ciclo de scraping")
+scrape_cycles = metrics.Counter("scrape_cycles_total", "Ciclos de scraping por resultado")
+
 
 live_match_cache = []
 match_details_cache = {}
 cache_lock = threading.Lock()
 last_updated_timestamp = None
+last_cycle_at = None  # epoch del último ciclo cerrado, para medir lo desfasada que está la caché
+
+# Cada publicación que cambia algo incrementa cache_version y deja una entrada
+# (versión, tipo, url) en change_log; los suscriptores (SSE) esperan en
+# cache_changed y sólo leen lo que ha cambiado desde su última versión.
+CHANGE_LOG_SIZE = 1000
+cache_version = 0
+change_log = deque(maxlen=CHANGE_LOG_SIZE)
+cache_changed = threading.Condition(cache_lock)
+
+# Partidos que han dejado de estar en vivo desde el arranque del líder: viaja en
+# la caché compartida para que los seguidores también invaliden al acabar uno
+games_finished = 0
+
+# Resumen del último ciclo completo: qué versiones abarca y qué cambió
+cycle_count = 0
+last_cycle_changes = None
 
 SCRAPE_INTERVAL = 10
+DETAILS_WORKERS = int(os.environ.get("SCRAPER_DETAILS_WORKERS", "4"))
+DETAILS_TIMEOUT = float(os.environ.get("SCRAPER_DETAILS_TIMEOUT", "30"))
 
-def update_cache():
-    global live_match_cache, match_details_cache
+# Planificador adaptativo: cada partido se refresca a un ritmo según su estado
+LIVE_INTERVAL = SCRAPE_INTERVAL
+CLUTCH_INTERVAL = 4      # últimos minutos de un partido igualado
+BREAK_INTERVAL = 30      # descansos, fin de cuarto, partido acabado sin retirar
+IDLE_INTERVAL = 60       # sin partidos en vivo: sólo se comprueba la lista
+CLUTCH_SECONDS = 5 * 60
+CLUTCH_MARGIN = 10
+
+details_last_fetch = {}  # url -> instante del último scrapeo de detalles
+details_last_phase = {}  # url -> fase (periodo, en pausa) del partido en ese scrapeo
+scrape_schedule = {}
+wake_scraper = threading.Event()
+
+details_executor = ThreadPoolExecutor(max_workers=DETAILS_WORKERS, thread_name_prefix="match-details")
+details_in_flight = {}  # url -> future del último scrapeo lanzado
+
+# /api/live_matches serializado y comprimido una vez por versión de la caché
+_live_body = {"key": None, "body": None}
+_live_body_lock = threading.Lock()
+
+
+def _record_change(kind, url):
+    """
+    Registra un cambio en el log. Llamar con cache_lock tomado.
+    """
+    global cache_version
+    cache_version += 1
+    change_log.append((cache_version, kind, url))
+
+
+def _content_hash(record):
+    """
+    Hash del contenido para ETags. Los registros (scrapper.models) tienen los
+    campos en orden fijo, así que basta con serializarlos; se calcula sobre el
+    registro aún sin "version"/"hash".
+    """
+    return hashlib.sha1(encoded_json.dumps(record)).hexdigest()[:16]
+
+
+def _with_team_ids(record, sides):
+    """
+    Añade el id canónico de cada equipo ("team1" -> "team1_id") para que los
+    clientes crucen con clasificación y calendario sin comparar nombres.
+    """
+    ids = {f"{side}_id": team_registry.resolve(getattr(record, side)) for side in sides}
+    return replace(record, **ids)
+
+
+def publish_live_matches(live_data):
+    """
+    Sustituye la lista de partidos en vivo y registra qué partidos han
+    cambiado, aparecido o desaparecido. Cada partido publicado lleva "version"
+    (la de la caché cuando cambió por última vez) y "hash" de su contenido; si
+    el contenido no cambia (== entre registros, que no mira version ni hash)
+    se conserva el registro anterior. Devuelve las urls que ya no están en vivo.
+    """
+    global live_match_cache, games_finished
+    changed = []
+    live_data = [_with_team_ids(match, ("team1", "team2")) for match in live_data]
+    with cache_lock:
+        previous = {m.url: m for m in live_match_cache}
+        current_urls = {m.url for m in live_data}
+        finished = set(previous) - current_urls
+        published = []
+        for match in live_data:
+            old = previous.get(match.url)
+            if old is not None and old == match:
+                published.append(old)
+                continue
+            _record_change("match", match.url)
+            published.append(models.stamped(match, cache_version, _content_hash(match)))
+            changed.append((match, cache_version))
+        for url in finished:
+            _record_change("match_removed", url)
+        games_finished += len(finished)
+        live_match_cache = published
+        cache_changed.notify_all()
+
+    # La escritura en disco va fuera del lock
+    for match, version in changed:
+        match_timeline.append(match_id_from_url(match.url), "match", models.to_dict(match), version)
+    for url in finished:
+        match_timeline.finish(match_id_from_url(url))
+    return finished
+
+
+def publish_match_details(url, details):
+    if details.error is None:
+        details = _with_team_ids(details, ("home_team", "away_team"))
+    with cache_lock:
+        old = match_details_cache.get(url)
+        if old is not None and old == details:
+            return
+        _record_change("details", url)
+        match_details_cache[url] = models.stamped(details, cache_version, _content_hash(details))
+        version = cache_version
+        cache_changed.notify_all()
+    match_timeline.append(match_id_from_url(url), "details", models.to_dict(details), version)
+
+
+def _invalidate_results():
+    # Algún partido ha dejado de estar en vivo: su ronda ya tiene resultado nuevo
+    invalidate_season_metadata()
+    response_cache.invalidate()
+
+
+def _close_cycle(start_version):
+    """
+    Guarda qué partidos cambiaron entre start_version y la versión actual.
+    Llamar con cache_lock tomado.
+    """
+    global cycle_count, last_cycle_changes, last_updated_timestamp, last_cycle_at
+    cycle_count += 1
+    summary = {
+        "cycle": cycle_count,
+        "from_version": start_version,
+        "to_version": cache_version,
+        "matches": [],
+        "removed": [],
+        "details": [],
+        "details_removed": [],
+    }
+    keys = {"match": "matches", "match_removed": "removed", "details": "details", "details_removed": "details_removed"}
+    for version, kind, url in change_log:
+        if version > start_version and url not in summary[keys[kind]]:
+            summary[keys[kind]].append(url)
+    last_cycle_changes = summary
+    last_updated_timestamp = datetime.now().strftime('%H:%M:%S')
+    last_cycle_at = time.time()
+    cache_changed.notify_all()
+
+
+_PERIOD_RE = re.compile(r"\b(\d)\s*(?:st|nd|rd|th)?\s*(?:quarter|q)\b|\bq\s*(\d)\b", re.IGNORECASE)
+_CLOCK_RE = re.compile(r"^\s*(\d{1,2}):(\d{2})")
+_BREAK_WORDS = ("half", "break", "pause", "after", "end of", "interval", "finished", "awaiting", "interrupted")
+
+
+def parse_game_clock(quarter, clock):
+    """
+    Interpreta los campos "quarter" y "time" de Flashscore.
+    Devuelve (periodo o None, segundos restantes o None, en_pausa).
+    La prórroga cuenta como periodo 5.
+    """
+    text = (quarter or "").strip().lower()
+    on_break = any(word in text for word in _BREAK_WORDS)
+
+    period = None
+    if "overtime" in text or re.search(r"\bot\b", text):
+        period = 5
+    else:
+        m = _PERIOD_RE.search(text)
+        if m:
+            period = int(m.group(1) or m.group(2))
+
+    seconds = None
+    m = _CLOCK_RE.match(clock or "")
+    if m:
+        seconds = int(m.group(1)) * 60 + int(m.group(2))
+        if seconds == 0:
+            on_break = True
+
+    return period, seconds, on_break
+
+
+def _score_margin(match):
+    if match.score1 is None or match.score2 is None:
+        return None
+    return abs(match.score1 - match.score2)
+
+
+def match_interval(match):
+    """
+    Intervalo de refresco de un partido y el motivo, según reloj y marcador.
+    """
+    period, seconds, on_break = parse_game_clock(match.quarter, match.time)
+    if on_break:
+        return BREAK_INTERVAL, "break"
+    margin = _score_margin(match)
+    if (
+        period is not None and period >= 4
+        and seconds is not None and seconds <= CLUTCH_SECONDS
+        and margin is not None and margin <= CLUTCH_MARGIN
+    ):
+        return CLUTCH_INTERVAL, "clutch"
+    return LIVE_INTERVAL, "live"
+
+
+def match_phase(match):
+    """
+    Periodo y si está en pausa: lo que, al cambiar, merece refrescar los
+    detalles sin esperar al intervalo (cierre de cuarto, reanudación, final).
+    El reloj y el marcador cambian casi en cada ciclo y no cuentan.
+    """
+    period, _, on_break = parse_game_clock(match.quarter, match.time)
+    return period, on_break
+
+
+def due_match_urls(live_data, now):
+    """
+    Partidos cuyos detalles toca scrapear en este ciclo: nuevos, vencidos o
+    que han cambiado de periodo o de estado desde su último scrapeo.
+    """
+    due = set()
+    for match in live_data:
+        last = details_last_fetch.get(match.url)
+        interval, _ = match_interval(match)
+        if (
+            last is None
+            or now - last >= interval - 0.5
+            or details_last_phase.get(match.url) != match_phase(match)
+        ):
+            due.add(match.url)
+    return due
+
+
+def plan_next_cycle(live_data, cycle_start, fetched_urls):
+    """
+    Apunta qué partidos se han scrapeado, calcula cuándo vence cada uno y
+    devuelve el instante del próximo ciclo (el vencimiento más cercano, o
+    IDLE_INTERVAL si no hay nada en vivo).
+    """
+    global scrape_schedule
+    live = {m.url: m for m in live_data}
+    for url in fetched_urls:
+        details_last_fetch[url] = cycle_start
+        if url in live:
+            details_last_phase[url] = match_phase(live[url])
+    for url in list(details_last_fetch):
+        if url not in live:
+            del details_last_fetch[url]
+            details_last_phase.pop(url, None)
+
+    matches = {}
+    for match in live_data:
+        interval, reason = match_interval(match)
+        matches[match.url] = {
+            "interval": interval,
+            "reason": reason,
+            "next_due": details_last_fetch.get(match.url, cycle_start) + interval,
+        }
 
+    if matches:
+        next_cycle_at = min(m["next_due"] for m in matches.values())
+        mode = "live"
+    else:
+        next_cycle_at = cycle_start + IDLE_INTERVAL
+        mode = "idle"
+
+    scrape_schedule = {
+        "mode": mode,
+        "cycle_started_at": cycle_start,
+        "cycle_duration": round(time.time() - cycle_start, 2),
+        "next_cycle_at": next_cycle_at,
+        "next_cycle_in": round(max(0.0, next_cycle_at - time.time()), 2),
+        "matches": matches,
+    }
+    return next_cycle_at
+
+
+def request_scrape_now():
+    """
+    Adelanta el próximo ciclo (p. ej. justo antes de un inicio de partido).
+    """
+    wake_scraper.set()
+
+
+def _fetch_details(url):
+    with scrape_phase_seconds.time(phase="match_details"):
+        return get_match_details(url)
+
+
+def fetch_details_concurrently(live_data, due_urls=None):
+    """
+    Scrapea los detalles de los partidos (todos, o sólo `due_urls`) en
+    paralelo y publica cada uno
+    en la caché en cuanto está listo. Pasados DETAILS_TIMEOUT desde el
+    encolado se deja de esperar: los que siguen en marcha y los que ni han
+    empezado (detrás de un driver colgado) se cancelan si se puede y
+    conservan sus detalles anteriores. Devuelve el número de partidos
+    publicados en este ciclo.
+    """
+    pending = {}
+    for match in live_data:
+        url = match.url
+        if due_urls is not None and url not in due_urls:
+            continue
+        previous = details_in_flight.get(url)
+        if previous and not previous.done():
+            # Sigue colgado del ciclo anterior: no se encola otra vez
+            logger.warning("⏳ Detalles de %s siguen en curso desde el ciclo anterior", url)
+            continue
+        future = details_executor.submit(_fetch_details, url)
+        details_in_flight[url] = future
+        pending[future] = url
+
+    published = 0
+    deadline = time.time() + DETAILS_TIMEOUT
+    while pending:
+        done, _ = wait(pending, timeout=min(0.5, max(0.0, deadline - time.time())), return_when=FIRST_COMPLETED)
+        for future in done:
+            url = pending.pop(future)
+            try:
+                details = future.result()
+            except Exception as e:
+                logger.error("❌ Error scraping detalles de %s: %s", url, e)
+                continue
+            publish_match_details(url, details)
+            published += 1
+
+        if pending and time.time() >= deadline:
+            for future, url in pending.items():
+                if future.cancel():
+                    logger.warning("⌛ Detalles de %s sin empezar tras %ss: cancelados", url, DETAILS_TIMEOUT)
+                else:
+                    logger.warning("⌛ Timeout scraping detalles de %s (%ss)", url, DETAILS_TIMEOUT)
+            pending.clear()
+
+    live_urls = {match.url for match in live_data}
+    with cache_lock:
+        removed = [url for url in match_details_cache if url not in live_urls]
+        for url in removed:
+            del match_details_cache[url]
+            _record_change("details_removed", url)
+        if removed:
+            cache_changed.notify_all()
+    for url in list(details_in_flight):
+        if url not in live_urls and details_in_flight[url].done():
+            del details_in_flight[url]
+
+    return published
+
+
+def update_cache():
     while True:
+        start_time = time.time()
+        next_cycle_at = start_time + SCRAPE_INTERVAL
         try:
-            start_time = time.time()
+            with cache_lock:
+                start_version = cache_version
 
             # Fase 1: scrapea solo los partidos
-            live_data = get_live_matches()
-            with cache_lock:
-                live_match_cache = live_data
-            print("🔄 Cache partidos actualizada")
-
-            # Fase 2: ahora scrapea los detalles de cada uno
-            details_dict = {}
-            for match in live_data:
-                url = match["url"]
-                try:
-                    details = get_match_details(url)
-                    details_dict[url] = details
-                except Exception as e:
-                    print(f"❌ Error scraping detalles de {url}: {e}")
+            with scrape_phase_seconds.time(phase="live_list"):
+                live_data = get_live_matches()
+            with scrape_phase_seconds.time(phase="publish"):
+                finished = publish_live_matches(live_data)
+            if finished:
+                _invalidate_results()
+            logger.debug("🔄 Cache partidos actualizada")
 
-            with cache_lock:
-                match_details_cache = details_dict
-                global last_updated_timestamp
-                last_updated_timestamp = datetime.now().strftime('%H:%M:%S')
+            # Fase 2: detalles en paralelo, sólo de los partidos a los que les toca
+            due = due_match_urls(live_data, start_time)
+            with scrape_phase_seconds.time(phase="details"):
+                published = fetch_details_concurrently(live_data, due)
 
-            print(f"✅ Cache detalles actualizada con {len(details_dict)} partidos")
-            print(f"➡️ {len(live_data)} partidos live")
-            print(f"🕒 Backend: caché actualizada a las {last_updated_timestamp}")
+            with cache_lock:
+                _close_cycle(start_version)
+                changed = len(last_cycle_changes["matches"]) + len(last_cycle_changes["details"])
 
+            next_cycle_at = plan_next_cycle(live_data, start_time, due)
+            match_timeline.maybe_compact()
+            # El snapshot del ciclo se serializa aquí y no en la primera petición
+            get_live_matches_body()
 
-            print(f"⏱️ Tiempo total scraping: {round(time.time() - start_time, 2)}s")
+            elapsed = time.time() - start_time
+            scrape_phase_seconds.observe(elapsed, phase="cycle")
+            scrape_cycles.inc(result="ok")
+            logger.info(
+                "🔁 Ciclo: %d partidos live, %d cambios (versión %d), detalles %d/%d, %.2fs",
+                len(live_data), changed, cache_version, published, len(due), elapsed,
+            )
 
         except Exception as e:
-            print(f"⚠️ Error en update_cache(): {e}")
+            scrape_cycles.inc(result="error")
+            logger.error("⚠️ Error en update_cache(): %s", e)
 
-        time.sleep(SCRAPE_INTERVAL)
+        # El tiempo de scraping ya cuenta: sólo se espera lo que falte hasta el próximo ciclo
+        wake_scraper.wait(max(0.0, next_cycle_at - time.time()))
+        wake_scraper.clear()
 
 def start_background_scrapper():
+    # La ruta de chromedriver se resuelve una vez al arrancar, no por driver. Si
+    # falla (sin red para descargarlo) la API arranca igual: create_driver lo
+    # vuelve a intentar en el primer uso de Selenium, y sólo falla ese ciclo
+    if backends.SCRAPER_BACKEND == "selenium" or backends.SELENIUM_FALLBACK:
+        try:
+            resolve_driver_path()
+        except Exception as e:
+            logger.warning("⚠️ No se pudo resolver chromedriver al arrancar, se reintentará al usar Selenium: %s", e)
+    driver_pool.resize(max(driver_pool.size, DETAILS_WORKERS))
     scraper_thread = threading.Thread(target=update_cache, daemon=True)
     scraper_thread.start()
 
@@ -64,6 +452,225 @@ def get_cached_match_details(url):
     with cache_lock:
         return match_details_cache.get(url)
 
+def match_id_from_url(url):
+    """
+    Id de Flashscore de un partido a partir de su url de detalles.
+    """
+    parts = url.split("/match/", 1)
+    return parts[1].split("/", 1)[0] if len(parts) == 2 else url
+
+def get_cached_match_details_batch(urls=None, ids=None):
+    """
+    Detalles de varios partidos bajo un solo lock. Sin urls ni ids devuelve
+    los de todos los partidos en vivo. Devuelve (version, {url: detalles}, faltan).
+    """
+    with cache_lock:
+        if urls is None and ids is None:
+            wanted = [m.url for m in live_match_cache]
+        else:
+            wanted = list(urls or [])
+            if ids:
+                by_id = {match_id_from_url(url): url for url in match_details_cache}
+                by_id.update({match_id_from_url(m.url): m.url for m in live_match_cache})
+                wanted += [by_id.get(match_id, match_id) for match_id in ids]
+        found = {url: match_details_cache[url] for url in wanted if url in match_details_cache}
+        missing = [url for url in wanted if url not in match_details_cache]
+        return cache_version, found, missing
+
 def get_last_updated_time():
     with cache_lock:
-        return last_updated_timestamp
\ No newline at end of file
+        return last_updated_timestamp
+
+def get_live_matches_body():
+    """
+    Respuesta de /api/live_matches (last_updated, version, matches) como
+    encoded_json.EncodedBody. Se codifica una sola vez por versión, fuera de
+    cache_lock; el resto de peticiones de esa versión sirven los mismos bytes.
+    """
+    with _live_body_lock:
+        with cache_lock:
+            key = (cache_version, last_updated_timestamp)
+            if _live_body["key"] == key:
+                return _live_body["body"]
+            payload = {
+                "last_updated": last_updated_timestamp,
+                "version": cache_version,
+                "matches": list(live_match_cache),
+            }
+        _live_body["body"] = encoded_json.encode(payload)
+        _live_body["key"] = key
+        return _live_body["body"]
+
+def live_matches_body_ready():
+    """
+    True si get_live_matches_body() devolverá los bytes ya codificados de la
+    versión actual, sin serializar ni comprimir nada.
+    """
+    with cache_lock:
+        return _live_body["key"] == (cache_version, last_updated_timestamp)
+
+def get_live_matches_since(since):
+    """
+    Partidos cuya versión es posterior a `since` y urls de los que han dejado
+    de estar en vivo desde entonces. Si el log ya no cubre `since`, devuelve
+    la lista completa con "full": True.
+    """
+    with cache_lock:
+        covered = since <= cache_version and (
+            since == cache_version or (change_log and change_log[0][0] <= since + 1)
+        )
+        result = {
+            "version": cache_version,
+            "last_updated": last_updated_timestamp,
+            "full": not covered,
+            "matches": [],
+            "removed": [],
+        }
+        if not covered:
+            result["matches"] = list(live_match_cache)
+            return result
+
+        current_urls = {m.url for m in live_match_cache}
+        result["matches"] = [m for m in live_match_cache if m.version > since]
+        for version, kind, url in reversed(change_log):
+            if version <= since:
+                break
+            if kind == "match_removed" and url not in current_urls and url not in result["removed"]:
+                result["removed"].append(url)
+        return result
+
+def get_scraper_stats():
+    return {
+        "backend": get_backend_stats(),
+        "driver_pool": driver_pool.stats(),
+        "details_workers": DETAILS_WORKERS,
+        "details_timeout": DETAILS_TIMEOUT,
+        "cache_version": cache_version,
+        "last_cycle": last_cycle_changes,
+        "schedule": get_scrape_schedule(),
+        "timeline": match_timeline.get_timeline_stats(),
+        "team_registry": team_registry.get_registry_stats(),
+        # Circuit breaker de cada fuente externa (Flashscore, API de la Euroliga)
+        "upstream": upstream.get_upstream_stats(),
+    }
+
+def get_scrape_schedule():
+    return scrape_schedule
+
+def get_live_snapshot():
+    """
+    Estado completo de la caché en vivo con la versión a la que corresponde.
+    """
+    with cache_lock:
+        return {
+            "version": cache_version,
+            "last_updated": last_updated_timestamp,
+            "last_cycle_at": last_cycle_at,
+            "matches": list(live_match_cache),
+            "details": dict(match_details_cache),
+        }
+
+def wait_for_changes(since, timeout=None):
+    """
+    Bloquea hasta que haya cambios posteriores a la versión `since` (o hasta
+    `timeout` segundos). Devuelve None si no hubo cambios; si el log ya no
+    cubre `since` devuelve un snapshot completo con "resync": True; si no,
+    sólo los partidos y detalles que han cambiado.
+    """
+    with cache_changed:
+        # != y no >: si otro proceso líder reinicia la numeración también hay que avisar
+        if not cache_changed.wait_for(lambda: cache_version != since, timeout):
+            return None
+
+        if since > cache_version or not change_log or change_log[0][0] > since + 1:
+            return {
+                "version": cache_version,
+                "last_updated": last_updated_timestamp,
+                "resync": True,
+                "matches": list(live_match_cache),
+                "details": dict(match_details_cache),
+            }
+
+        changed = {}
+        for version, kind, url in reversed(change_log):
+            if version <= since:
+                break
+            changed.setdefault(url, set()).add(kind)
+
+        matches_by_url = {m.url: m for m in live_match_cache}
+        update = {
+            "version": cache_version,
+            "last_updated": last_updated_timestamp,
+            "resync": False,
+            "matches": [],
+            "removed": [],
+            "details": {},
+            "details_removed": [],
+        }
+        for url, kinds in changed.items():
+            if kinds & {"match", "match_removed"}:
+                if url in matches_by_url:
+                    update["matches"].append(matches_by_url[url])
+                else:
+                    update["removed"].append(url)
+            if kinds & {"details", "details_removed"}:
+                if url in match_details_cache:
+                    update["details"][url] = match_details_cache[url]
+                else:
+                    update["details_removed"].append(url)
+        return update
+
+def export_state():
+    """
+    Estado completo de la caché en vivo para compartirlo con otros procesos
+    (ver shared_cache). Los registros van tal cual: se serializan con
+    encoded_json y load_state los reconstruye.
+    """
+    with cache_lock:
+        return {
+            "version": cache_version,
+            "games_finished": games_finished,
+            "last_updated": last_updated_timestamp,
+            "last_cycle_at": last_cycle_at,
+            "matches": list(live_match_cache),
+            "details": dict(match_details_cache),
+            "change_log": list(change_log),
+            "last_cycle": last_cycle_changes,
+            "schedule": scrape_schedule,
+        }
+
+def load_state(state):
+    """
+    Sustituye la caché en vivo por un estado exportado por el proceso líder y
+    despierta a los suscriptores. En "details" valen dicts o MatchDetails ya
+    reconstruidos (shared_cache reutiliza los que no han cambiado). Si el
+    líder ha visto acabar algún partido desde el último estado, invalida la
+    metadata de la temporada y la caché de respuestas, como hace él.
+    """
+    global live_match_cache, match_details_cache, cache_version, change_log, games_finished
+    global last_updated_timestamp, last_cycle_changes, scrape_schedule, last_cycle_at
+    with cache_lock:
+        finals = state.get("games_finished", games_finished) != games_finished
+        live_match_cache = [models.live_match_from_dict(m) for m in state["matches"]]
+        match_details_cache = {
+            url: d if isinstance(d, models.MatchDetails) else models.match_details_from_dict(d)
+            for url, d in state["details"].items()
+        }
+        cache_version = state["version"]
+        games_finished = state.get("games_finished", games_finished)
+        change_log = deque((tuple(entry) for entry in state["change_log"]), maxlen=CHANGE_LOG_SIZE)
+        last_updated_timestamp = state["last_updated"]
+        last_cycle_at = state.get("last_cycle_at")
+        last_cycle_changes = state["last_cycle"]
+        scrape_schedule = state["schedule"]
+        cache_changed.notify_all()
+    if finals:
+        _invalidate_results()
+
+
+metrics.Gauge("scrape_staleness_seconds", "Segundos desde el último ciclo de scraping cerrado",
+              lambda: time.time() - last_cycle_at if last_cycle_at else None)
+metrics.Gauge("live_matches", "Partidos en vivo en la caché", lambda: len(live_match_cache))
+metrics.Gauge("cache_version", "Versión actual de la caché en vivo", lambda: cache_version)
+metrics.Gauge("details_in_flight", "Scrapes de detalles en curso",
+              lambda: sum(1 for future in list(details_in_flight.values()) if not future.done()))
@@ -0,0 +1,263 @@
+"""
+Línea de tiempo de cada partido en vivo: un log en disco, sólo de añadir,
+con un fichero NDJSON por partido en TIMELINE_DIR.
+
+Cada vez que la caché en vivo publica un cambio de un partido (marcador,
+reloj) o de sus detalles se añade una línea con los campos que han cambiado
+respecto a la anterior del mismo tipo:
+
+    {"t": 1739990000.123, "v": 57, "k": "m", "d": {"score1": 78, "score2": 74, "time": "03:12"}}
+
+k = "m" (registro de la lista en vivo) o "d" (detalles). La primera línea de
+cada tipo (y la primera tras reiniciar el proceso) lleva el registro entero,
+así que el estado en un instante T es el pliegue de las líneas hasta T.
+
+Añadir es O(1) (una línea al final del fichero) y en memoria sólo se guarda
+el último estado escrito de los partidos que siguen en vivo. Cuando un
+partido deja de estar en vivo su log se compacta: se quitan las líneas que
+no cambian nada y se reescribe comprimido ({id}.ndjson.gz). compact() hace
+lo mismo con los logs que llevan TIMELINE_IDLE_SECONDS sin escribirse (por
+ejemplo, tras reiniciar el proceso a mitad de partido).
+"""
+import gzip
+import json
+import os
+import re
+import threading
+import time
+
+import encoded_json
+import metrics
+from app_logging import get_logger
+
+logger = get_logger(__name__)
+
+TIMELINE_ENABLED = os.environ.get("LIVE_TIMELINE", "1") == "1"
+TIMELINE_DIR = os.environ.get("LIVE_TIMELINE_DIR", os.path.join(os.path.dirname(__file__), "data", "timelines"))
+TIMELINE_IDLE_SECONDS = float(os.environ.get("LIVE_TIMELINE_IDLE_SECONDS", "1800"))
+COMPACT_INTERVAL = float(os.environ.get("LIVE_TIMELINE_COMPACT_INTERVAL", "600"))
+
+KINDS = {"match": "m", "details": "d"}
+_KIND_NAMES = {code: kind for kind, code in KINDS.items()}
+# Campos de control de la caché en vivo, no del estado del partido
+_SKIP_FIELDS = ("version", "hash")
+
+_lock = threading.Lock()
+_last = {}  # match_id -> {"m": registro, "d": registro}: último estado escrito de los partidos en vivo
+_last_write = {}  # match_id -> instante de la última línea
+_last_compact = 0.0
+_stats = {"appends": 0, "bytes": 0, "compacted": 0, "errors": 0}
+
+timeline_appends = metrics.Counter("timeline_appends_total", "Líneas añadidas a las líneas de tiempo de los partidos")
+
+
+def _path(match_id, compressed=False):
+    safe_id = re.sub(r"[^A-Za-z0-9_-]", "_", match_id)
+    return os.path.join(TIMELINE_DIR, safe_id + (".ndjson.gz" if compressed else ".ndjson"))
+
+
+def _encode(entry):
+    # orjson serializa también los registros anidados (scrapper.models) que traen los cambios
+    return encoded_json.dumps(entry) + b"\n"
+
+
+def _changes(previous, record):
+    if previous is None:
+        return dict(record)
+    changes = {key: value for key, value in record.items() if previous.get(key) != value}
+    for key in previous:
+        if key not in record:
+            changes[key] = None
+    return changes
+
+
+def append(match_id, kind, record, version=None, at=None):
+    """
+    Añade al log del partido los campos de `record` que han cambiado desde la
+    última línea de ese tipo. Devuelve False si no había nada que escribir.
+    """
+    if not TIMELINE_ENABLED:
+        return False
+    code = KINDS[kind]
+    state = {key: value for key, value in record.items() if key not in _SKIP_FIELDS}
+    with _lock:
+        last = _last.setdefault(match_id, {})
+        changes = _changes(last.get(code), state)
+        if not changes:
+            return False
+        at = time.time() if at is None else at
+        line = _encode({"t": round(at, 3), "v": version, "k": code, "d": changes})
+        try:
+            os.makedirs(TIMELINE_DIR, exist_ok=True)
+            with open(_path(match_id), "ab") as f:
+                f.write(line)
+        except OSError as e:
+            _stats["errors"] += 1
+            logger.error("❌ Error escribiendo la línea de tiempo de %s: %s", match_id, e)
+            return False
+        last[code] = state
+        _last_write[match_id] = at
+        _stats["appends"] += 1
+        _stats["bytes"] += len(line)
+    timeline_appends.inc(kind=kind)
+    return True
+
+
+def _read_lines(f):
+    entries = []
+    for line in f:
+        try:
+            entries.append(json.loads(line))
+        except ValueError:
+            # Última línea a medio escribir si el proceso murió durante un append
+            continue
+    return entries
+
+
+def _read_entries(match_id):
+    """
+    Líneas del log del partido (compactado y sin compactar), en orden. Llamar con _lock tomado.
+    """
+    entries = []
+    compressed = _path(match_id, compressed=True)
+    if os.path.exists(compressed):
+        with gzip.open(compressed, "rb") as f:
+            entries += _read_lines(f)
+    raw = _path(match_id)
+    if os.path.exists(raw):
+        with open(raw, "rb") as f:
+            entries += _read_lines(f)
+    return entries
+
+
+def _compact_locked(match_id):
+    entries = _read_entries(match_id)
+    raw = _path(match_id)
+    if not os.path.exists(raw):
+        return False
+
+    states = {}
+    kept = []
+    for entry in entries:
+        previous = states.get(entry["k"])
+        changes = entry["d"] if previous is None else {
+            key: value for key, value in entry["d"].items() if previous.get(key) != value
+        }
+        if not changes:
+            continue
+        states[entry["k"]] = {**(previous or {}), **changes}
+        kept.append(dict(entry, d=changes))
+
+    compressed = _path(match_id, compressed=True)
+    tmp = compressed + ".tmp"
+    with gzip.open(tmp, "wb") as f:
+        f.writelines(_encode(entry) for entry in kept)
+    os.replace(tmp, compressed)
+    os.remove(raw)
+    _stats["compacted"] += 1
+    logger.info("🗜️ Línea de tiempo de %s compactada: %d → %d líneas", match_id, len(entries), len(kept))
+    return True
+
+
+def finish(match_id):
+    """
+    El partido ha dejado de estar en vivo: libera su estado en memoria y compacta su log.
+    """
+    with _lock:
+        _last.pop(match_id, None)
+        _last_write.pop(match_id, None)
+        try:
+            return _compact_locked(match_id)
+        except (OSError, ValueError) as e:
+            _stats["errors"] += 1
+            logger.error("❌ Error compactando la línea de tiempo de %s: %s", match_id, e)
+            return False
+
+
+def compact(now=None):
+    """
+    Compacta los logs sin compactar que llevan TIMELINE_IDLE_SECONDS sin
+    escribirse y olvida el estado en memoria de esos partidos.
+    """
+    global _last_compact
+    now = time.time() if now is None else now
+    _last_compact = now
+    if not os.path.isdir(TIMELINE_DIR):
+        return 0
+    compacted = 0
+    for name in os.listdir(TIMELINE_DIR):
+        if not name.endswith(".ndjson"):
+            continue
+        match_id = name[: -len(".ndjson")]
+        try:
+            if now - os.path.getmtime(os.path.join(TIMELINE_DIR, name)) < TIMELINE_IDLE_SECONDS:
+                continue
+        except OSError:
+            continue
+        if finish(match_id):
+            compacted += 1
+    return compacted
+
+
+def maybe_compact():
+    """
+    compact() como mucho una vez cada COMPACT_INTERVAL segundos (se llama en cada ciclo del scraper).
+    """
+    if TIMELINE_ENABLED and time.time() - _last_compact >= COMPACT_INTERVAL:
+        compact()
+
+
+def get_timeline(match_id, kind=None, since=None, until=None):
+    """
+    Cambios del partido en orden, opcionalmente de un solo tipo ("match" o
+    "details") y entre dos instantes (epoch). None si no hay log.
+    """
+    with _lock:
+        entries = _read_entries(match_id)
+    if not entries:
+        return None
+    code = KINDS.get(kind) if kind else None
+    return {
+        "id": match_id,
+        "entries": [
+            {"t": entry["t"], "version": entry["v"], "kind": _KIND_NAMES[entry["k"]], "changes": entry["d"]}
+            for entry in entries
+            if (code is None or entry["k"] == code)
+            and (since is None or entry["t"] > since)
+            and (until is None or entry["t"] <= until)
+        ],
+    }
+
+
+def get_state_at(match_id, at=None):
+    """
+    Estado del partido (registro de la lista en vivo y detalles) en el instante
+    `at` (epoch; por defecto el último). None si no hay nada hasta ese instante.
+    """
+    with _lock:
+        entries = _read_entries(match_id)
+    states = {}
+    last = None
+    for entry in entries:
+        if at is not None and entry["t"] > at:
+            break
+        states[entry["k"]] = {**states.get(entry["k"], {}), **entry["d"]}
+        last = entry
+    if last is None:
+        return None
+    return {
+        "id": match_id,
+        "at": at,
+        "t": last["t"],
+        "version": last["v"],
+        "match": states.get("m"),
+        "details": states.get("d"),
+    }
+
+
+def get_timeline_stats():
+    with _lock:
+        return dict(_stats, enabled=TIMELINE_ENABLED, live_games=len(_last), last_compact=_last_compact or None)
+
+
+metrics.Gauge("timeline_live_games", "Partidos con línea de tiempo abierta (en memoria)", lambda: len(_last))
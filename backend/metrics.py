@@ -0,0 +1,199 @@
+"""
+Métricas en memoria con salida en formato de texto de Prometheus (/metrics).
+
+- Counter / Histogram con etiquetas, actualizados desde los caminos calientes
+  (fases del scraper, llamadas a la API de la Euroliga, endpoints, caché).
+- Gauges calculados al pedir /metrics a partir de una función (staleness,
+  procesos de Chrome, estado del pool...), así no cuestan nada entre scrapes.
+
+Cada worker expone sus propias métricas; Prometheus las agrega por instancia.
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+PREFIX = "liveapp_"
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+_registry = {}  # nombre -> métrica, en orden de registro
+_registry_lock = threading.Lock()
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help_text):
+        self.name = PREFIX + name
+        self.help = help_text
+        self._lock = threading.Lock()
+        with _registry_lock:
+            _registry[self.name] = self
+
+    def header(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, help_text):
+        super().__init__(name, help_text)
+        self._values = {}
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(_label_key(labels), 0)
+
+    def render(self):
+        with self._lock:
+            items = list(self._values.items())
+        return self.header() + [f"{self.name}{_format_labels(k)} {_format_value(v)}" for k, v in items]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text)
+        self.buckets = tuple(buckets) + (float("inf"),)
+        self._values = {}  # key -> [cuentas por bucket..., suma, total]
+
+    def observe(self, value, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            data = self._values.get(key)
+            if data is None:
+                data = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    data[i] += 1
+                    break
+            data[-2] += value
+            data[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self):
+        with self._lock:
+            items = [(k, list(v)) for k, v in self._values.items()]
+        lines = self.header()
+        for key, data in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, data):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(key, [('le', _format_value(bound))])} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(data[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {data[-1]}")
+        return lines
+
+
+class Gauge(_Metric):
+    """
+    Valor calculado al renderizar. fn devuelve un número o un dict
+    {((etiqueta, valor), ...): número}.
+    """
+    kind = "gauge"
+
+    def __init__(self, name, help_text, fn, kind="gauge"):
+        super().__init__(name, help_text)
+        self.fn = fn
+        self.kind = kind
+
+    def render(self):
+        try:
+            value = self.fn()
+        except Exception:
+            return []
+        if value is None:
+            return []
+        if not isinstance(value, dict):
+            value = {(): value}
+        return self.header() + [f"{self.name}{_format_labels(k)} {_format_value(v)}" for k, v in value.items()]
+
+
+def count_processes(*names):
+    """
+    Procesos vivos cuyo nombre empieza por alguno de `names` (leyendo /proc).
+    """
+    counts = {name: 0 for name in names}
+    if not os.path.isdir("/proc"):
+        return counts
+    for pid in os.listdir("/proc"):
+        if not pid.isdigit():
+            continue
+        try:
+            with open(f"/proc/{pid}/comm") as f:
+                comm = f.read().strip()
+        except OSError:
+            continue
+        for name in names:
+            if comm.startswith(name):
+                counts[name] += 1
+                break
+    return counts
+
+
+def render():
+    with _registry_lock:
+        metrics = list(_registry.values())
+    lines = []
+    for metric in metrics:
+        lines += metric.render()
+    return "\n".join(lines) + "\n"
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Métricas compartidas por varios módulos
+upstream_seconds = Histogram("upstream_request_seconds", "Duración de las llamadas a fuentes externas")
+upstream_errors = Counter("upstream_errors_total", "Llamadas a fuentes externas que fallaron")
+http_request_seconds = Histogram("http_request_seconds", "Duración de las peticiones HTTP por endpoint")
+cache_requests = Counter("response_cache_requests_total", "Consultas a la caché de respuestas por resultado")
+dom_extract_seconds = Histogram("dom_extract_seconds", "Extracción de datos de una página de Flashscore ya cargada")
+
+
+@contextmanager
+def track_upstream(source):
+    """
+    Mide una llamada a una fuente externa (Flashscore, API de la Euroliga) y cuenta los fallos.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        upstream_errors.inc(source=source)
+        raise
+    finally:
+        upstream_seconds.observe(time.perf_counter() - start, source=source)
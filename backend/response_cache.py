@@ -0,0 +1,185 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import encoded_json
+import metrics
+from app_logging import get_logger
+
+logger = get_logger(__name__)
+
+# (ttl, stale_ttl) en segundos por endpoint. Dentro de ttl se sirve la caché;
+# hasta stale_ttl se sirve la copia vieja y se refresca en segundo plano.
+ENDPOINT_TTLS = {
+    "current_round": (60, 1800),
+    "euroleague_standings": (300, 3600),
+    "played_matches": (120, 3600),
+    "all_played_matches": (300, 3600),
+    "scheduled_matches": (600, 6 * 3600),
+}
+# Las respuestas vacías suelen ser un error tragado por el wrapper: duran poco,
+# y si ya había una copia buena se sigue sirviendo ésa (ver _store)
+EMPTY_TTL = 15
+# Las claves llevan parámetros de la petición (ronda...): por encima de este
+# número de entradas se descartan las usadas hace más tiempo
+MAX_ENTRIES = int(os.environ.get("RESPONSE_CACHE_MAX_ENTRIES", "512"))
+
+_entries = OrderedDict()  # key -> {"value", "body", "empty", "fresh_until", "stale_until"}, en orden de uso
+_in_flight = {}  # key -> Future del fetch en curso
+_lock = threading.Lock()
+_refresh_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="swr-refresh")
+_stats = {"hits": 0, "stale_hits": 0, "misses": 0, "shared_waits": 0, "refreshes": 0, "refresh_errors": 0,
+          "empty_kept": 0, "evictions": 0}
+
+
+def _count(stat, key):
+    """
+    Llamar con _lock tomado. Cuenta en las stats propias y en /metrics por endpoint.
+    """
+    _stats[stat] += 1
+    metrics.cache_requests.inc(endpoint=key[0] if isinstance(key, tuple) else key, result=stat)
+
+
+def _store(key, value, ttl, stale_ttl, encode):
+    """
+    Con encode se guarda sólo la respuesta ya serializada y comprimida
+    (encoded_json): se codifica aquí, una vez por refresco, en el hilo que
+    trae los datos.
+
+    Una respuesta vacía no pisa una copia buena: se sigue sirviendo la buena
+    como caducada y se vuelve a intentar pasados EMPTY_TTL segundos, hasta
+    que se acabe su stale_ttl (si el vacío es de verdad, acaba ganando).
+    """
+    now = time.time()
+    if not value:
+        with _lock:
+            previous = _entries.get(key)
+            if previous is not None and not previous["empty"] and now < previous["stale_until"]:
+                previous["fresh_until"] = min(now + EMPTY_TTL, previous["stale_until"])
+                _stats["empty_kept"] += 1
+                logger.warning("⚠️ %s devolvió una respuesta vacía: se sigue sirviendo la anterior", key)
+                return previous
+        ttl = min(ttl, EMPTY_TTL)
+        stale_ttl = min(stale_ttl, EMPTY_TTL)
+    body = encoded_json.encode(value) if encode else None
+    entry = {
+        "value": None if encode else value,
+        "body": body,
+        "empty": not value,
+        "fresh_until": now + ttl,
+        "stale_until": now + max(ttl, stale_ttl),
+    }
+    with _lock:
+        _entries[key] = entry
+        _entries.move_to_end(key)
+        while len(_entries) > MAX_ENTRIES:
+            _entries.popitem(last=False)
+            _stats["evictions"] += 1
+    return entry
+
+
+def _result(entry, encode):
+    return entry["body"] if encode else entry["value"]
+
+
+def _run_fetch(key, fetch, ttl, stale_ttl, future, encode):
+    try:
+        entry = _store(key, fetch(), ttl, stale_ttl, encode)
+    except BaseException as e:
+        with _lock:
+            _in_flight.pop(key, None)
+        future.set_exception(e)
+        return
+    with _lock:
+        _in_flight.pop(key, None)
+    future.set_result(entry)
+
+
+def _background_refresh(key, fetch, ttl, stale_ttl, future, encode):
+    _run_fetch(key, fetch, ttl, stale_ttl, future, encode)
+    if future.exception() is not None:
+        with _lock:
+            _stats["refresh_errors"] += 1
+        logger.warning("⚠️ Refresco en segundo plano de %s falló: %s", key, future.exception())
+
+
+def cached_call(key, fetch, ttl, stale_ttl, encode=False):
+    """
+    Devuelve fetch() cacheado bajo `key` con stale-while-revalidate (o, con
+    encode, su encoded_json.EncodedBody).
+
+    - fresco: se devuelve la copia en caché
+    - caducado pero dentro de stale_ttl: se devuelve la copia y se lanza un
+      refresco en segundo plano (uno solo por clave)
+    - sin copia utilizable: se llama a fetch(); las peticiones concurrentes a
+      la misma clave esperan a ese mismo fetch en vez de lanzar el suyo
+    """
+    now = time.time()
+    with _lock:
+        entry = _entries.get(key)
+        if entry:
+            _entries.move_to_end(key)
+        if entry and now < entry["fresh_until"]:
+            _count("hits", key)
+            return _result(entry, encode)
+
+        future = _in_flight.get(key)
+        if entry and now < entry["stale_until"]:
+            _count("stale_hits", key)
+            if future is None:
+                future = Future()
+                _in_flight[key] = future
+                _stats["refreshes"] += 1
+                _refresh_executor.submit(_background_refresh, key, fetch, ttl, stale_ttl, future, encode)
+            return _result(entry, encode)
+
+        if future is not None:
+            _count("shared_waits", key)
+            owner = False
+        else:
+            future = Future()
+            _in_flight[key] = future
+            _count("misses", key)
+            owner = True
+
+    if owner:
+        _run_fetch(key, fetch, ttl, stale_ttl, future, encode)
+    return _result(future.result(), encode)
+
+
+def cached_endpoint(endpoint, fetch, *args):
+    """
+    Atajo para los endpoints: clave (endpoint, *args) y TTLs de ENDPOINT_TTLS.
+    """
+    ttl, stale_ttl = ENDPOINT_TTLS[endpoint]
+    return cached_call((endpoint,) + args, lambda: fetch(*args), ttl, stale_ttl)
+
+
+def cached_endpoint_body(endpoint, fetch, *args):
+    """
+    Como cached_endpoint, pero devuelve la respuesta ya serializada y
+    comprimida. La clave lleva "body" para no mezclarse con la de valores.
+    """
+    ttl, stale_ttl = ENDPOINT_TTLS[endpoint]
+    return cached_call((endpoint, "body") + args, lambda: fetch(*args), ttl, stale_ttl, encode=True)
+
+
+def invalidate(endpoint=None):
+    """
+    Marca como caducadas las entradas (todas, o las de un endpoint). La
+    siguiente petición recibe la copia vieja y dispara el refresco.
+    """
+    with _lock:
+        for key, entry in _entries.items():
+            if endpoint is None or key[0] == endpoint:
+                entry["fresh_until"] = 0.0
+
+
+def get_cache_stats():
+    with _lock:
+        stats = dict(_stats)
+        stats["entries"] = len(_entries)
+        stats["in_flight"] = len(_in_flight)
+    return stats
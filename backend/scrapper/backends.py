@@ -0,0 +1,103 @@
+import os
+import threading
+import time
+
+import requests
+
+from scrapper import http_scrapper
+from scrapper import scrapper as selenium_scrapper
+from scrapper.html_parser import PageStructureError
+import metrics
+import upstream
+from app_logging import get_logger
+
+logger = get_logger(__name__)
+
+# "http": requests + BeautifulSoup, con Selenium como respaldo
+# "selenium": siempre Chrome
+SCRAPER_BACKEND = os.environ.get("SCRAPER_BACKEND", "http").lower()
+SELENIUM_FALLBACK = os.environ.get("SCRAPER_SELENIUM_FALLBACK", "1") != "0"
+# Flashscore pinta sus páginas con JS: si el HTML llega sin renderizar, ese tipo
+# de página va directo a Selenium durante este tiempo en vez de pagar en cada
+# ciclo una descarga HTTP que no sirve
+HTTP_RETRY_AFTER = float(os.environ.get("SCRAPER_HTTP_RETRY_AFTER", "1800"))
+
+BACKENDS = {
+    "http": http_scrapper,
+    "selenium": selenium_scrapper,
+}
+
+_stats_lock = threading.Lock()
+_stats = {"http_ok": 0, "selenium_ok": 0, "fallbacks": 0, "http_skipped": 0}
+_http_skip_until = {}  # get_live_matches / get_match_details -> instante hasta el que no se prueba HTTP
+
+
+def _count(key):
+    with _stats_lock:
+        _stats[key] += 1
+
+
+def _selenium(name, *args):
+    result = getattr(selenium_scrapper, name)(*args)
+    _count("selenium_ok")
+    return result
+
+
+def _call(name, *args):
+    backend = BACKENDS.get(SCRAPER_BACKEND, selenium_scrapper)
+    if backend is selenium_scrapper:
+        return _selenium(name, *args)
+    if time.time() < _http_skip_until.get(name, 0.0):
+        _count("http_skipped")
+        return _selenium(name, *args)
+
+    try:
+        result = getattr(backend, name)(*args)
+        _count("http_ok")
+        return result
+    except PageStructureError as e:
+        if not SELENIUM_FALLBACK:
+            raise
+        _http_skip_until[name] = time.time() + HTTP_RETRY_AFTER
+        logger.warning("↩️ %s llega sin renderizar por HTTP (%s): Selenium directo durante %.0fs",
+                       name, e, HTTP_RETRY_AFTER)
+    except (requests.RequestException, upstream.UpstreamUnavailable) as e:
+        if not SELENIUM_FALLBACK:
+            raise
+        logger.warning("↩️ Backend HTTP falló en %s (%s), usando Selenium", name, e)
+    _count("fallbacks")
+    return _selenium(name, *args)
+
+
+def selenium_in_use():
+    """
+    Si los scrapeos acaban en Chrome: Selenium es el backend o el respaldo
+    del HTTP y ya ha hecho falta.
+    """
+    if BACKENDS.get(SCRAPER_BACKEND, selenium_scrapper) is selenium_scrapper:
+        return True
+    with _stats_lock:
+        return SELENIUM_FALLBACK and (_stats["fallbacks"] > 0 or _stats["http_skipped"] > 0)
+
+
+def get_live_matches(*args):
+    return _call("get_live_matches", *args)
+
+
+def get_match_details(detail_url):
+    return _call("get_match_details", detail_url)
+
+
+def get_backend_stats():
+    with _stats_lock:
+        stats = dict(_stats)
+    stats["backend"] = SCRAPER_BACKEND
+    stats["selenium_fallback"] = SELENIUM_FALLBACK
+    now = time.time()
+    stats["http_skipped_pages"] = {name: round(until - now) for name, until in _http_skip_until.items() if until > now}
+    return stats
+
+
+metrics.Gauge("scraper_backend_calls_total", "Llamadas al scraper por backend y resultado",
+              lambda: {(("result", k),): v for k, v in get_backend_stats().items() if k in _stats},
+              kind="counter")
@@ -0,0 +1,239 @@
+import atexit
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+
+import metrics
+from app_logging import get_logger
+
+logger = get_logger(__name__)
+
+POOL_SIZE = int(os.environ.get("SCRAPER_POOL_SIZE", "2"))
+MAX_PAGES_PER_DRIVER = int(os.environ.get("SCRAPER_MAX_PAGES_PER_DRIVER", "200"))
+CHECKOUT_TIMEOUT = float(os.environ.get("SCRAPER_CHECKOUT_TIMEOUT", "60"))
+PAGE_LOAD_TIMEOUT = float(os.environ.get("SCRAPER_PAGE_LOAD_TIMEOUT", "20"))
+
+_driver_path = None
+_driver_path_lock = threading.Lock()
+
+
+def resolve_driver_path():
+    """
+    Resuelve la ruta del binario de chromedriver una sola vez por proceso.
+    ChromeDriverManager().install() consulta la red y el disco, así que no
+    debe repetirse por cada driver. Si falla no se guarda nada y la siguiente
+    llamada lo reintenta.
+    """
+    global _driver_path
+    with _driver_path_lock:
+        if _driver_path is None:
+            _driver_path = os.environ.get("CHROMEDRIVER_PATH") or ChromeDriverManager().install()
+        return _driver_path
+
+
+def create_driver(driver_path=None):
+    """
+    Crea una instancia del WebDriver de Chrome en modo headless.
+    """
+    options = webdriver.ChromeOptions()
+    options.add_argument("--headless")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--log-level=3")
+    options.add_experimental_option("excludeSwitches", ["enable-logging"])
+    service = Service(driver_path or resolve_driver_path())
+    driver = webdriver.Chrome(service=service, options=options)
+    driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
+    return driver
+
+
+class DriverPool:
+    """
+    Pool acotado de drivers de Chrome reutilizables entre ciclos de scraping.
+
+    Cada driver se comprueba antes de entregarse y se recicla (quit + nuevo)
+    tras `max_pages` páginas o si la página que lo usaba falló.
+    """
+
+    def __init__(self, size=POOL_SIZE, max_pages=MAX_PAGES_PER_DRIVER):
+        self.size = size
+        self.max_pages = max_pages
+        self._idle = []  # [(driver, páginas servidas)]
+        self._created = 0
+        self._cond = threading.Condition()
+        self._closed = False
+        self._stats = {
+            "checkouts": 0,
+            "drivers_started": 0,
+            "recycles": 0,
+            "crashes": 0,
+            "health_check_failures": 0,
+            "wait_time_total": 0.0,
+            "wait_time_max": 0.0,
+            "timeouts": 0,
+        }
+
+    def resize(self, size):
+        with self._cond:
+            self.size = max(1, size)
+            self._cond.notify_all()
+
+    def _is_healthy(self, driver):
+        try:
+            driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    def _quit(self, driver):
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.warning("⚠️ Error cerrando driver: %s", e)
+
+    def acquire(self, timeout=CHECKOUT_TIMEOUT):
+        """
+        Devuelve (driver, páginas servidas). Espera hasta `timeout` segundos si
+        todos los drivers están ocupados.
+        """
+        start = time.time()
+        deadline = start + timeout
+        while True:
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("Driver pool cerrado")
+                    if self._idle:
+                        driver, pages = self._idle.pop()
+                        break
+                    if self._created < self.size:
+                        self._created += 1
+                        driver, pages = None, 0
+                        break
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        self._stats["timeouts"] += 1
+                        raise TimeoutError("No hay drivers libres en el pool")
+                    self._cond.wait(remaining)
+
+            if driver is None:
+                try:
+                    driver = create_driver()
+                except Exception:
+                    with self._cond:
+                        self._created -= 1
+                        self._cond.notify()
+                    raise
+                with self._cond:
+                    self._stats["drivers_started"] += 1
+            elif not self._is_healthy(driver):
+                self._quit(driver)
+                with self._cond:
+                    self._created -= 1
+                    self._stats["health_check_failures"] += 1
+                    self._cond.notify()
+                continue
+
+            waited = time.time() - start
+            with self._cond:
+                self._stats["checkouts"] += 1
+                self._stats["wait_time_total"] += waited
+                self._stats["wait_time_max"] = max(self._stats["wait_time_max"], waited)
+            return driver, pages
+
+    def release(self, driver, pages, broken=False):
+        pages += 1
+        recycle = broken or pages >= self.max_pages
+        with self._cond:
+            if not recycle and not self._closed and self._created <= self.size:
+                self._idle.append((driver, pages))
+                self._cond.notify()
+                return
+            self._created -= 1
+            self._stats["recycles"] += 1
+            if broken:
+                self._stats["crashes"] += 1
+            self._cond.notify()
+        self._quit(driver)
+
+    @contextmanager
+    def driver(self, timeout=CHECKOUT_TIMEOUT):
+        driver, pages = self.acquire(timeout)
+        try:
+            yield driver
+        except Exception:
+            self.release(driver, pages, broken=True)
+            raise
+        else:
+            self.release(driver, pages)
+
+    def warm_up(self, count=None):
+        """
+        Arranca por adelantado los drivers que falten hasta tener `count` vivos
+        (libres u ocupados) para que el primer ciclo no pague el coste de lanzar
+        Chrome. No espera a ningún driver ocupado ni cuenta como checkout:
+        el scraper sigue teniendo todo el pool mientras tanto. Devuelve
+        cuántos ha arrancado.
+        """
+        count = min(count or self.size, self.size)
+        started = 0
+        while True:
+            with self._cond:
+                if self._closed or self._created >= count:
+                    return started
+                self._created += 1
+            try:
+                driver = create_driver()
+            except Exception as e:
+                with self._cond:
+                    self._created -= 1
+                    self._cond.notify()
+                logger.warning("⚠️ No se pudo precalentar un driver: %s", e)
+                return started
+            with self._cond:
+                self._stats["drivers_started"] += 1
+                self._idle.append((driver, 0))
+                self._cond.notify()
+            started += 1
+
+    def stats(self):
+        with self._cond:
+            stats = dict(self._stats)
+            stats["size"] = self.size
+            stats["alive"] = self._created
+            stats["idle"] = len(self._idle)
+            stats["in_use"] = self._created - len(self._idle)
+            stats["max_pages_per_driver"] = self.max_pages
+            checkouts = stats["checkouts"]
+            stats["wait_time_avg"] = stats["wait_time_total"] / checkouts if checkouts else 0.0
+        return stats
+
+    def shutdown(self):
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._created -= len(idle)
+            self._cond.notify_all()
+        for driver, _ in idle:
+            self._quit(driver)
+
+
+driver_pool = DriverPool()
+atexit.register(driver_pool.shutdown)
+
+metrics.Gauge("driver_pool_drivers", "Drivers de Chrome del pool por estado",
+              lambda: {(("state", k),): v for k, v in driver_pool.stats().items() if k in ("idle", "in_use")})
+metrics.Gauge("driver_pool_events_total", "Eventos del pool de drivers desde el arranque",
+              lambda: {(("event", k),): driver_pool.stats()[k]
+                       for k in ("checkouts", "drivers_started", "recycles", "crashes", "health_check_failures", "timeouts")},
+              kind="counter")
+metrics.Gauge("driver_pool_wait_seconds_max", "Espera máxima para obtener un driver",
+              lambda: driver_pool.stats()["wait_time_max"])
+# chromedriver antes que chrome: el nombre de uno es prefijo del otro
+metrics.Gauge("chrome_processes", "Procesos de Chrome y chromedriver vivos en la máquina",
+              lambda: {(("process", k),): v for k, v in metrics.count_processes("chromedriver", "chrome").items()})
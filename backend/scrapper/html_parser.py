@@ -0,0 +1,255 @@
+import re
+from collections import defaultdict
+
+from bs4 import BeautifulSoup, Tag
+
+from scrapper.models import (
+    MISSING,
+    LiveMatch,
+    MatchDetails,
+    PlayerStat,
+    PlayerTable,
+    QuarterScores,
+    TeamStat,
+)
+
+_NUMBER_RE = re.compile(r"^[+-]?\d+(?:[.,]\d+)?$")
+
+
+class PageStructureError(ValueError):
+    """
+    El HTML no tiene la estructura esperada de Flashscore (por ejemplo, la
+    página vino sin renderizar). Distinto de "no hay partidos en vivo".
+    """
+
+
+def _soup(html):
+    return BeautifulSoup(html, "lxml")
+
+
+def _text(element):
+    """
+    Texto visible de un nodo con los espacios normalizados, como `.text` en Selenium.
+    """
+    if element is None:
+        return ""
+    return " ".join(element.get_text(" ").split())
+
+
+def _number(text):
+    """
+    "78" -> 78, "59%" -> 59, "+12" -> 12, "45.5" -> 45.5; vacío o no numérico -> MISSING.
+    """
+    text = (text or "").strip().rstrip("%").strip()
+    if not _NUMBER_RE.match(text):
+        return MISSING
+    text = text.replace(",", ".")
+    return float(text) if "." in text else int(text)
+
+
+def _stat(text):
+    """
+    Valor de una celda de estadísticas: número si lo es, si no el texto tal
+    cual (minutos "25:11"), MISSING si está vacía.
+    """
+    value = _number(text)
+    if value is MISSING and text and text != "-":
+        return text
+    return value
+
+
+def _lines(element):
+    return [line for line in element.get_text("\n", strip=True).split("\n") if line]
+
+
+def parse_live_matches_html(html):
+    """
+    Extrae los partidos en vivo del HTML de la página de una liga de Flashscore.
+    Devuelve la misma lista de LiveMatch que `scrapper.get_live_matches`.
+    """
+    soup = _soup(html)
+    live_section = soup.select_one(".leagues--live.contest--leagues")
+    if live_section is None:
+        if soup.select_one(".event__match") is not None:
+            # Página renderizada pero sin sección en vivo: no hay partidos
+            return []
+        raise PageStructureError("Live matches section not found")
+
+    live_matches = []
+    for match in live_section.select(".event__match"):
+        if not match.select("span[data-state='live']"):
+            continue
+
+        teams = match.select(".event__participant")
+        score_elements = match.select(".event__score")
+        match_id = match.get("id")
+        if len(teams) < 2 or not match_id:
+            continue
+
+        match_id_clean = match_id.replace("g_3_", "")
+        match_url = f"https://www.flashscore.com/match/{match_id_clean}/#/match-summary/match-summary"
+
+        score1 = score2 = MISSING
+        if len(score_elements) >= 2:
+            score1, score2 = _number(_text(score_elements[0])), _number(_text(score_elements[1]))
+
+        quarter = ""
+        time = ""
+        stage_block = match.select_one(".event__stage--block")
+        if stage_block is not None:
+            raw_text = _lines(stage_block)
+            if len(raw_text) >= 2:
+                quarter, time = raw_text[0], raw_text[1]
+            elif len(raw_text) == 1:
+                quarter = raw_text[0]
+
+        live_matches.append(LiveMatch(
+            team1=_text(teams[0]),
+            team2=_text(teams[1]),
+            score1=score1,
+            score2=score2,
+            quarter=quarter,
+            time=time,
+            url=match_url,
+        ))
+
+    return live_matches
+
+
+def _class_index(soup):
+    """
+    Nodos por clase CSS en una sola pasada por el árbol, en orden de documento.
+    Las clases con hash de CSS modules (wcl-row_OFViZ) se indexan también por
+    su raíz (wcl-row), que es lo que se busca.
+    """
+    index = defaultdict(list)
+    for element in _tags(soup):
+        for name in element.get("class", ()):
+            index[name].append(element)
+            if name.startswith("wcl-") and "_" in name:
+                index[name.rsplit("_", 1)[0]].append(element)
+    return index
+
+
+def _tags(root):
+    # Recorrido directo: find_all() pasa cada nodo por la maquinaria de filtros de bs4
+    return (node for node in root.descendants if isinstance(node, Tag))
+
+
+def _first(index, name, *also):
+    for element in index.get(name, ()):
+        if all(extra in element["class"] for extra in also):
+            return element
+    return None
+
+
+def _value_text(element):
+    if element is None:
+        return None
+    for node in _tags(element):
+        if node.get("data-testid") == "wcl-scores-simpleText-01":
+            return _text(node)
+    return None
+
+
+def _parse_player_table(index):
+    """
+    Tabla completa de jugadores: columnas de la cabecera (PTS, REB, AST...) y
+    un PlayerStat por jugador con sus valores en ese orden y los puntos de la
+    columna de ordenación (para el top 3).
+    """
+    headers = [h.get("title") or _text(h) for h in index.get("playerStatsTable__headerCell", ())]
+    players = []
+    for row in index.get("playerStatsTable__row", ()):
+        name = team = ""
+        stats = []
+        points = MISSING
+        for cell in row.children:
+            classes = cell.get("class", ()) if isinstance(cell, Tag) else ()
+            if "playerStatsTable__cell" not in classes:
+                continue
+            value = _text(cell)
+            if "playerStatsTable__participantCell" in classes:
+                name = value
+            elif "playerStatsTable__teamCell" in classes:
+                team = value
+            else:
+                stats.append(_stat(value))
+                if "playerStatsTable__cell--sortingColumn" in classes:
+                    points = _number(value)
+        players.append(PlayerStat(name, team, points, tuple(stats)))
+
+    stat_count = max((len(p.stats) for p in players), default=0)
+    # Las primeras columnas de la cabecera son Player y Team
+    columns = headers[len(headers) - stat_count:] if len(headers) >= stat_count else headers
+    return PlayerTable(tuple(columns), tuple(players))
+
+
+def _parse_team_statistics(index):
+    parsed_stats = []
+    for row in index.get("wcl-row", ()):
+        if row["class"][0].rsplit("_", 1)[0] != "wcl-row":
+            continue
+        label = home = away = None
+        for node in _tags(row):
+            if node.get("data-testid") == "wcl-statistics-category":
+                label = _value_text(node)
+            elif any("wcl-homeValue" in name for name in node.get("class", ())):
+                home = _value_text(node)
+            elif any("wcl-awayValue" in name for name in node.get("class", ())):
+                away = _value_text(node)
+        if label is None or home is None or away is None:
+            continue
+        parsed_stats.append(TeamStat(label, _number(home), _number(away)))
+    return parsed_stats
+
+
+def parse_match_details_html(html):
+    """
+    Extrae los detalles de un partido del HTML de su página de Flashscore:
+    puntos por cuarto, top 3 jugadores y estadísticas básicas por equipo (lo
+    que pinta la tarjeta), más las tablas completas de jugadores
+    (`player_stats`) y de estadísticas de equipo (`all_team_statistics`).
+    El árbol se recorre una sola vez para indexarlo por clase.
+    """
+    soup = _soup(html)
+    index = _class_index(soup)
+    if not index.get("smh__part"):
+        raise PageStructureError("Match details container not found")
+
+    teams = index.get("event__participant", [])
+    home_team, away_team = (_text(teams[0]), _text(teams[1])) if len(teams) >= 2 else (MISSING, MISSING)
+
+    # Puntos por cuarto (1 a 4 + OT)
+    home_scores, away_scores = [], []
+    for i in range(1, 6):
+        home_score = _first(index, f"smh__part--{i}", "smh__part", "smh__home")
+        away_score = _first(index, f"smh__part--{i}", "smh__part", "smh__away")
+        home_scores.append(_number(_text(home_score)))
+        away_scores.append(_number(_text(away_score)))
+    quarter_scores = QuarterScores(
+        tuple(home_scores),
+        tuple(away_scores),
+        _number(_text(_first(index, "smh__score", "smh__home"))),
+        _number(_text(_first(index, "smh__score", "smh__away"))),
+    )
+
+    # Jugadores: tabla completa + top 3 (orden de la página, ya ordenada por puntos)
+    player_stats = top_player_stats = MISSING
+    if index.get("playerStatsTable"):
+        player_stats = _parse_player_table(index)
+        top_player_stats = player_stats.players[:3]
+
+    # Estadísticas por equipo: todas las filas y las tres que muestra la tarjeta
+    stats_labels = ["Field Goals Attempted", "Field Goals %", "Total Rebounds"]
+    all_stats = tuple(_parse_team_statistics(index))
+    basic_stats = tuple(stat for stat in all_stats if stat.label in stats_labels)
+    return MatchDetails(
+        home_team=home_team,
+        away_team=away_team,
+        quarter_scores=quarter_scores,
+        top_player_stats=top_player_stats,
+        player_stats=player_stats,
+        team_statistics=basic_stats or MISSING,
+        all_team_statistics=all_stats or MISSING,
+    )
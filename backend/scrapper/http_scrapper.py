@@ -0,0 +1,62 @@
+import os
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import metrics
+import upstream
+from scrapper.html_parser import parse_live_matches_html, parse_match_details_html
+
+HTTP_TIMEOUT = upstream.timeout("flashscore_http")
+HTTP_POOL_SIZE = int(os.environ.get("SCRAPER_HTTP_POOL_SIZE", "10"))
+
+HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+
+def _create_session():
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=HTTP_POOL_SIZE)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(HEADERS)
+    return session
+
+
+session = _create_session()
+
+
+def _get(url):
+    response = session.get(url, timeout=HTTP_TIMEOUT)
+    response.raise_for_status()
+    return response.text
+
+
+def fetch_html(url):
+    return upstream.call("flashscore_http", _get, url)
+
+
+def get_live_matches(url="https://www.flashscore.com/basketball/europe/euroleague/"):
+    """
+    Versión HTTP de `scrapper.get_live_matches`: descarga el HTML sin navegador
+    y lo parsea con BeautifulSoup. Lanza PageStructureError si la página no
+    trae los partidos renderizados.
+    """
+    html = fetch_html(url)
+    with metrics.dom_extract_seconds.time(backend="http", page="live"):
+        return parse_live_matches_html(html)
+
+
+def get_match_details(detail_url):
+    """
+    Versión HTTP de `scrapper.get_match_details`.
+    """
+    html = fetch_html(detail_url)
+    with metrics.dom_extract_seconds.time(backend="http", page="match"):
+        return parse_match_details_html(html)
@@ -0,0 +1,146 @@
+"""
+Registros tipados que produce el scraper y guarda la caché en vivo.
+
+Son dataclasses con __slots__ e inmutables: ocupan bastante menos que un
+dict por registro, se comparan campo a campo sin serializar (== entre el
+registro nuevo y el publicado) y orjson las serializa directamente. Los
+números (marcador, puntos por cuarto, estadísticas) se parsean una vez al
+scrapear; lo que no está en la página es MISSING (null en JSON) en vez del
+antiguo "Not found".
+
+"version" y "hash" los pone live_cache_manager al publicar y no cuentan al
+comparar: dos registros con el mismo contenido son iguales aunque se
+publicaran en versiones distintas.
+"""
+from dataclasses import dataclass, field, fields, replace
+
+# Dato que no estaba en la página (o no se pudo leer)
+MISSING = None
+
+
+@dataclass(slots=True, frozen=True)
+class LiveMatch:
+    team1: str
+    team2: str
+    score1: int | None
+    score2: int | None
+    quarter: str
+    time: str
+    url: str
+    team1_id: str | None = None
+    team2_id: str | None = None
+    version: int = field(default=0, compare=False)
+    hash: str = field(default="", compare=False)
+
+
+@dataclass(slots=True, frozen=True)
+class QuarterScores:
+    """
+    Puntos por periodo (1º a 4º cuarto y prórroga) y totales. Un periodo sin
+    jugar es MISSING, no 0.
+    """
+    home: tuple
+    away: tuple
+    home_total: int | None
+    away_total: int | None
+
+
+@dataclass(slots=True, frozen=True)
+class PlayerStat:
+    """
+    Una fila de la tabla de jugadores. `stats` va en el orden de
+    PlayerTable.columns; los minutos ("25:11") se dejan como texto.
+    """
+    name: str
+    team: str
+    points: int | None
+    stats: tuple = ()
+
+
+@dataclass(slots=True, frozen=True)
+class PlayerTable:
+    columns: tuple
+    players: tuple
+
+
+@dataclass(slots=True, frozen=True)
+class TeamStat:
+    label: str
+    home: int | float | None
+    away: int | float | None
+
+
+@dataclass(slots=True, frozen=True)
+class MatchDetails:
+    """
+    Detalles de un partido. Si el scrapeo falla sólo lleva `error` (ver failed()).
+    top_player_stats comparte los PlayerStat de player_stats.
+    """
+    home_team: str | None = MISSING
+    away_team: str | None = MISSING
+    quarter_scores: QuarterScores | None = MISSING
+    top_player_stats: tuple | None = MISSING
+    player_stats: PlayerTable | None = MISSING
+    team_statistics: tuple | None = MISSING
+    all_team_statistics: tuple | None = MISSING
+    home_team_id: str | None = None
+    away_team_id: str | None = None
+    error: str | None = None
+    version: int = field(default=0, compare=False)
+    hash: str = field(default="", compare=False)
+
+    @classmethod
+    def failed(cls, message):
+        return cls(error=message)
+
+
+def field_names(record):
+    return [f.name for f in fields(record)]
+
+
+def to_dict(record):
+    """
+    Campos de un registro como dict, sin copiar: los valores anidados siguen
+    siendo registros (comparables con == y serializables con orjson). Para
+    diffs por campo, como los de match_timeline.
+    """
+    return {name: getattr(record, name) for name in field_names(record)}
+
+
+def stamped(record, version, content_hash):
+    return replace(record, version=version, hash=content_hash)
+
+
+def _player(row):
+    return PlayerStat(row["name"], row["team"], row["points"], tuple(row["stats"]))
+
+
+def _players(rows):
+    return None if rows is None else tuple(_player(row) for row in rows)
+
+
+def _team_stats(rows):
+    return None if rows is None else tuple(TeamStat(**row) for row in rows)
+
+
+def live_match_from_dict(data):
+    return LiveMatch(**data)
+
+
+def match_details_from_dict(data):
+    """
+    Reconstruye un MatchDetails a partir de su JSON (caché compartida entre procesos).
+    """
+    data = dict(data)
+    scores = data.get("quarter_scores")
+    if scores is not None:
+        data["quarter_scores"] = QuarterScores(
+            tuple(scores["home"]), tuple(scores["away"]), scores["home_total"], scores["away_total"]
+        )
+    table = data.get("player_stats")
+    if table is not None:
+        data["player_stats"] = PlayerTable(tuple(table["columns"]), _players(table["players"]))
+    data["top_player_stats"] = _players(data.get("top_player_stats"))
+    data["team_statistics"] = _team_stats(data.get("team_statistics"))
+    data["all_team_statistics"] = _team_stats(data.get("all_team_statistics"))
+    return MatchDetails(**data)
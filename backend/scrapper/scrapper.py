@@ -1,194 +1,122 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
+import os
+import time
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
-from collections import OrderedDict
 
-def create_driver():
+from scrapper.driver_pool import driver_pool
+from scrapper.html_parser import PageStructureError, parse_live_matches_html, parse_match_details_html
+from scrapper.models import MatchDetails
+import metrics
+import upstream
+from app_logging import get_logger
+
+logger = get_logger(__name__)
+
+# Lo que se espera a que la página pinte su contenido (timeout de la fuente en upstream)
+RENDER_WAIT = upstream.timeout("flashscore_selenium")
+# La tabla de jugadores se pinta algo más tarde; si Flashscore va degradado no se espera
+OPTIONAL_WAIT = float(os.environ.get("SCRAPER_OPTIONAL_WAIT", "5"))
+
+# Cualquier partido pintado: con la sección en vivo o sin ella (sin partidos en vivo)
+# la página ya está lista, sin esperar RENDER_WAIT en los ratos sin partidos
+LIVE_READY = ".event__match"
+# Como se da por lista la página con el primer partido pintado, una lista más
+# corta que la anterior puede ser una página a medio pintar: antes de darla por
+# buena se vuelve a leer pasado este tiempo y se queda la lectura más larga
+LIVE_CONFIRM_WAIT = float(os.environ.get("SCRAPER_LIVE_CONFIRM_WAIT", "1.5"))
+_last_live = {"count": 0}
+DETAILS_READY = ".smh__part"
+DETAILS_OPTIONAL = ".playerStatsTable"
+
+
+def _wait_for(driver, selector, seconds):
+    try:
+        WebDriverWait(driver, seconds).until(EC.presence_of_element_located((By.CSS_SELECTOR, selector)))
+        return True
+    except TimeoutException:
+        return False
+
+
+def _page_html(driver, ready, optional=None):
     """
-    Crea una instancia del WebDriver de Chrome en modo headless.
+    HTML de la página ya cargada en cuanto aparece `ready` (y `optional`, si
+    llega a tiempo). None si no se pintó dentro de RENDER_WAIT.
     """
-    options = webdriver.ChromeOptions()
-    options.add_argument("--headless")
-    options.add_argument("--disable-gpu")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--log-level=3")
-    options.add_experimental_option("excludeSwitches", ["enable-logging"])
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=options)
-    return driver
+    if not _wait_for(driver, ready, RENDER_WAIT):
+        return None
+    if optional and not upstream.is_degraded("flashscore_selenium"):
+        _wait_for(driver, optional, OPTIONAL_WAIT)
+    # Un único viaje a chromedriver: el HTML renderizado se parsea en local
+    return driver.page_source
+
+
+def _load(url, ready, optional=None):
+    with driver_pool.driver() as driver:
+        driver.get(url)
+        html = _page_html(driver, ready, optional)
+    # Fuera del pool: una página lenta no es motivo para reciclar el driver
+    if html is None:
+        raise upstream.UpstreamTimeout(f"{url} sin pintar tras {RENDER_WAIT:.0f}s")
+    return html
+
+
+def _fetch(url, ready, optional=None):
+    return upstream.call("flashscore_selenium", _load, url, ready, optional, errors=(WebDriverException,))
+
+
+def _extract_live(html):
+    with metrics.dom_extract_seconds.time(backend="selenium", page="live"):
+        return _parse_live_matches(html)
+
+
+def _load_live(url):
+    with driver_pool.driver() as driver:
+        driver.get(url)
+        html = _page_html(driver, LIVE_READY)
+        matches = None if html is None else _extract_live(html)
+        if matches is not None and len(matches) < _last_live["count"]:
+            time.sleep(LIVE_CONFIRM_WAIT)
+            second = _extract_live(driver.page_source)
+            logger.info("🔎 Lista en vivo con %d partidos (antes %d), segunda lectura: %d",
+                        len(matches), _last_live["count"], len(second))
+            matches = max(matches, second, key=len)
+    if matches is None:
+        raise upstream.UpstreamTimeout(f"{url} sin pintar tras {RENDER_WAIT:.0f}s")
+    _last_live["count"] = len(matches)
+    return matches
+
 
 def get_live_matches(url="https://www.flashscore.com/basketball/europe/euroleague/"):
     """
     Scrapea los partidos en vivo de una liga de baloncesto desde Flashscore.
-    Devuelve una lista de diccionarios con datos básicos de cada partido.
+    Devuelve una lista de LiveMatch (scrapper.models) con los datos básicos de cada partido.
+    Si la página no llega a pintarse lanza UpstreamTimeout: la caché conserva la lista anterior.
+    Si sale con menos partidos que la vez anterior se confirma con una segunda lectura.
     """
-    driver = create_driver()
-    driver.get(url)
+    return upstream.call("flashscore_selenium", _load_live, url, errors=(WebDriverException,))
 
+def _parse_live_matches(html):
     try:
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.CLASS_NAME, "leagues--live.contest--leagues"))
-        )
-        live_section = driver.find_element(By.CLASS_NAME, "leagues--live.contest--leagues")
-        matches = live_section.find_elements(By.CLASS_NAME, "event__match")
-    except Exception as e:
-        print(f"Error finding live matches section: {e}")
-        driver.quit()
+        return parse_live_matches_html(html)
+    except PageStructureError as e:
+        logger.warning("Error finding live matches section: %s", e)
         return []
 
-    live_matches = []
-
-    for match in matches:
-        live_status = match.find_elements(By.XPATH, ".//span[@data-state='live']")
-        if live_status:
-            teams = match.find_elements(By.CLASS_NAME, "event__participant")
-            score_elements = match.find_elements(By.CLASS_NAME, "event__score")
-            match_id = match.get_attribute("id")
-
-            if teams and match_id:
-                team1 = teams[0].text.strip()
-                team2 = teams[1].text.strip()
-                match_id_clean = match_id.replace("g_3_", "")
-                match_url = f"https://www.flashscore.com/match/{match_id_clean}/#/match-summary/match-summary"
-
-                score = "-"
-                if score_elements and len(score_elements) >= 2:
-                    score = f"{score_elements[0].text.strip()} - {score_elements[1].text.strip()}"
-
-                # Obtener cuarto y tiempo de juego correctamente
-                quarter = ""
-                time = ""
-
-                stage_block = match.find_elements(By.CLASS_NAME, "event__stage--block")
-                if stage_block:
-                    raw_text = stage_block[0].text.strip().split("\n")
-                    if len(raw_text) >= 2:
-                        quarter = raw_text[0]
-                        time = raw_text[1]
-                    elif len(raw_text) == 1:
-                        quarter = raw_text[0]
-                        time = ""
-
-                live_matches.append(OrderedDict([
-                    ("team1", team1),
-                    ("team2", team2),
-                    ("score", score),
-                    ("quarter", quarter),
-                    ("time", time),
-                    ("url", match_url)
-                ]))
-
-    driver.quit()
-    return live_matches
-
 def get_match_details(detail_url):
     """
-    Scrapea los detalles de un partido en vivo (puntos por cuarto, top 3 jugadores, estadísticas básicas por equipo).
+    Scrapea los detalles de un partido en vivo (puntos por cuarto, top 3 jugadores, estadísticas básicas por equipo)
+    y las tablas completas de jugadores y de estadísticas de equipo.
     """
-    driver = create_driver()
-    driver.get(detail_url)
-    details = {}
+    html = _fetch(detail_url, DETAILS_READY, DETAILS_OPTIONAL)
+    with metrics.dom_extract_seconds.time(backend="selenium", page="match"):
+        return _parse_match_details(html)
 
+def _parse_match_details(html):
     try:
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.CLASS_NAME, "smh__part"))
-        )
-    except Exception as e:
-        print("Error waiting for match details container:", e)
-        driver.quit()
-        return {"error": "Match details container not found"}
-
-    details["home_quarter_scores"] = []
-    details["away_quarter_scores"] = []
-    details["top_player_stats"] = []
-    details["team_statistics"] = []
-
-    # Obtener nombre de los equipos desde el contenedor superior
-    try:
-        teams = driver.find_elements(By.CLASS_NAME, "event__participant")
-        if len(teams) >= 2:
-            details["home_team"] = teams[0].text.strip()
-            details["away_team"] = teams[1].text.strip()
-        else:
-            details["home_team"] = "Unknown"
-            details["away_team"] = "Unknown"
-    except Exception as e:
-        print("Error extracting team names:", e)
-        details["home_team"] = "Unknown"
-        details["away_team"] = "Unknown"
-
-    # Puntos por cuarto (1 a 4 + OT)
-    for i in range(1, 6):
-        home_score = driver.find_elements(By.CLASS_NAME, f"smh__part.smh__home.smh__part--{i}")
-        away_score = driver.find_elements(By.CLASS_NAME, f"smh__part.smh__away.smh__part--{i}")
-        details["home_quarter_scores"].append(home_score[0].text.strip() if home_score else "0")
-        details["away_quarter_scores"].append(away_score[0].text.strip() if away_score else "0")
-
-    # Puntos totales
-    home_total = driver.find_elements(By.CLASS_NAME, "smh__score.smh__home")
-    away_total = driver.find_elements(By.CLASS_NAME, "smh__score.smh__away")
-    details["home_total"] = home_total[0].text.strip() if home_total else "0"
-    details["away_total"] = away_total[0].text.strip() if away_total else "0"
-
-    # Top 3 jugadores (opcional, puede no existir)
-    try:
-        WebDriverWait(driver, 5).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, ".playerStatsTable"))
-        )
-
-        player_names = driver.find_elements(By.CSS_SELECTOR, ".playerStatsTable__cell.playerStatsTable__participantCell.playerStatsTable__cell--clickable.playerStatsTable__cell--shadow")
-        player_teams = driver.find_elements(By.CSS_SELECTOR, ".playerStatsTable__cell.playerStatsTable__teamCell")
-        player_points = driver.find_elements(By.CSS_SELECTOR, ".playerStatsTable__cell.playerStatsTable__cell--sortingColumn")
-
-        top_players = []
-        for i in range(min(3, len(player_names), len(player_teams), len(player_points))):
-            top_players.append({
-                "name": player_names[i].text.strip(),
-                "team": player_teams[i].text.strip(),
-                "points": player_points[i].text.strip()
-            })
-
-        details["top_player_stats"] = top_players
-    except Exception as e:
-        details["top_player_stats"] = "Not found"
-
-    # Estadísticas por equipo (Field Goals Attempted, FG%, Rebounds)
-    try:
-        stats_labels = ["Field Goals Attempted", "Field Goals %", "Total Rebounds"]
-        parsed_stats = []
-
-        rows = driver.find_elements(By.CSS_SELECTOR, "[class^='wcl-row_']")
-        
-        for row in rows:
-            try:
-                label_elem = row.find_element(By.CSS_SELECTOR, "[data-testid='wcl-statistics-category'] [data-testid='wcl-scores-simpleText-01']")
-                label = label_elem.text.strip()
-
-                if label in stats_labels:
-                    home_val_elem = row.find_element(By.CSS_SELECTOR, "[class*='wcl-homeValue'] [data-testid='wcl-scores-simpleText-01']")
-                    away_val_elem = row.find_element(By.CSS_SELECTOR, "[class*='wcl-awayValue'] [data-testid='wcl-scores-simpleText-01']")
-                    home_val = home_val_elem.text.strip()
-                    away_val = away_val_elem.text.strip()
-
-                    parsed_stats.append({
-                        "label": label,
-                        "home": home_val,
-                        "away": away_val
-                    })
-
-            except Exception as inner_error:
-                continue
-
-        if parsed_stats:
-            details["team_statistics"] = parsed_stats
-        else:
-            details["team_statistics"] = "Not found"
-
-    except Exception as e:
-        details["team_statistics"] = "Not found"
-
-    driver.quit()
-    return details
\ No newline at end of file
+        return parse_match_details_html(html)
+    except PageStructureError as e:
+        logger.warning("Error waiting for match details container: %s", e)
+        return MatchDetails.failed("Match details container not found")
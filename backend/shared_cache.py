@@ -0,0 +1,243 @@
+"""
+Modo multi-proceso: varios workers WSGI sirven /api/* y sólo uno scrapea.
+
+- Elección de líder: cada worker intenta un flock exclusivo no bloqueante
+  sobre LEADER_LOCK_PATH. El que lo consigue arranca el scraper; si muere,
+  el sistema libera el lock y otro worker lo toma en su siguiente intento.
+- Caché compartida: el líder vuelca el estado de live_cache_manager en
+  SHARED_CACHE_PATH (escritura atómica con os.replace, en /dev/shm cuando
+  existe) cada vez que cambia. Los seguidores vigilan el fichero, lo leen
+  con mmap y lo cargan en su propia live_cache_manager, así que endpoints,
+  ETags y SSE funcionan igual en todos los workers.
+- Los detalles de cada partido (con las tablas de jugadores, lo que más pesa)
+  van en su propio fichero en SHARED_DETAILS_DIR y el líder sólo reescribe los
+  que han cambiado; el snapshot principal lleva la versión y el hash de cada
+  uno y los seguidores sólo leen los que no tienen ya.
+- El snapshot lleva también cuántos partidos han acabado: al ver que cambia,
+  el seguidor invalida su metadata de temporada y su caché de respuestas.
+"""
+import fcntl
+import hashlib
+import json
+import mmap
+import os
+import tempfile
+import threading
+import time
+
+import encoded_json
+import live_cache_manager
+import tipoff_prefetcher
+from app_logging import get_logger
+
+logger = get_logger(__name__)
+
+_default_dir = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+SHARED_DIR = os.environ.get("LIVEAPP_SHARED_DIR", os.path.join(_default_dir, "euroleague_liveapp"))
+LEADER_LOCK_PATH = os.path.join(SHARED_DIR, "scraper.lock")
+SHARED_CACHE_PATH = os.path.join(SHARED_DIR, "live_cache.json")
+SHARED_DETAILS_DIR = os.path.join(SHARED_DIR, "details")
+
+FOLLOWER_POLL_INTERVAL = 0.5   # cada cuánto mira un seguidor si hay snapshot nuevo
+LEADER_RETRY_INTERVAL = 5      # cada cuánto intenta un seguidor hacerse líder
+EXPORT_MAX_WAIT = 2            # el líder vuelca al menos con esta frecuencia si hay cambios
+
+_state = {
+    "role": None, "lock_fd": None, "snapshots_written": 0, "snapshots_loaded": 0,
+    "details_written": 0, "details_loaded": 0,
+}
+# Líder: (versión, hash) de los detalles ya volcados, por url
+_written_details = {}
+
+
+def try_become_leader():
+    """
+    Intenta coger el lock de líder sin bloquear. El fd se mantiene abierto
+    mientras viva el proceso: cerrarlo (o morir) libera el liderazgo.
+    """
+    os.makedirs(SHARED_DIR, exist_ok=True)
+    fd = os.open(LEADER_LOCK_PATH, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        os.close(fd)
+        return False
+    os.ftruncate(fd, 0)
+    os.write(fd, str(os.getpid()).encode())
+    _state["lock_fd"] = fd
+    return True
+
+
+def _write_atomic(path, data):
+    tmp_fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp.")
+    try:
+        with os.fdopen(tmp_fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def _details_file(url):
+    return hashlib.sha1(url.encode("utf-8")).hexdigest()[:16] + ".json"
+
+
+def write_snapshot(state):
+    """
+    Vuelca `state` (live_cache_manager.export_state). Los detalles se escriben
+    antes que el snapshot que los referencia, y sólo los que han cambiado
+    desde el último volcado; los de partidos retirados se borran después.
+    """
+    os.makedirs(SHARED_DETAILS_DIR, exist_ok=True)
+    refs = {}
+    for url, details in state["details"].items():
+        stamp = (details.version, details.hash)
+        name = _details_file(url)
+        if _written_details.get(url) != stamp:
+            # encoded_json serializa directamente los registros de scrapper.models
+            _write_atomic(os.path.join(SHARED_DETAILS_DIR, name), encoded_json.dumps(details))
+            _written_details[url] = stamp
+            _state["details_written"] += 1
+        refs[url] = {"version": details.version, "hash": details.hash, "file": name}
+
+    _write_atomic(SHARED_CACHE_PATH, encoded_json.dumps(dict(state, details=refs)))
+    _state["snapshots_written"] += 1
+
+    names = {ref["file"] for ref in refs.values()}
+    for url in set(_written_details) - set(refs):
+        del _written_details[url]
+    # Además de los retirados, lo que dejara otro líder anterior
+    for name in os.listdir(SHARED_DETAILS_DIR):
+        if name not in names and not name.startswith("."):
+            try:
+                os.unlink(os.path.join(SHARED_DETAILS_DIR, name))
+            except FileNotFoundError:
+                pass
+
+
+def _read_json(path):
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return json.loads(mm[:])
+
+
+def read_snapshot():
+    return _read_json(SHARED_CACHE_PATH)
+
+
+def _load_details(refs):
+    """
+    Detalles del snapshot: los que ya tiene este proceso con la misma versión
+    y hash se reutilizan; el resto se leen de su fichero. Si el líder acaba de
+    borrar uno se conserva el que hubiera.
+    """
+    with live_cache_manager.cache_lock:
+        current = dict(live_cache_manager.match_details_cache)
+    details = {}
+    for url, ref in refs.items():
+        old = current.get(url)
+        if old is not None and (old.version, old.hash) == (ref["version"], ref["hash"]):
+            details[url] = old
+            continue
+        try:
+            data = _read_json(os.path.join(SHARED_DETAILS_DIR, ref["file"]))
+        except FileNotFoundError:
+            data = None
+        if data is not None:
+            details[url] = data
+            _state["details_loaded"] += 1
+        elif old is not None:
+            details[url] = old
+    return details
+
+
+def _export_loop():
+    """
+    Líder: vuelca el estado cada vez que cambia la versión o se cierra un ciclo.
+    """
+    last = None
+    while True:
+        with live_cache_manager.cache_changed:
+            live_cache_manager.cache_changed.wait(EXPORT_MAX_WAIT)
+            marker = (live_cache_manager.cache_version, live_cache_manager.last_updated_timestamp)
+        if marker == last:
+            continue
+        try:
+            write_snapshot(live_cache_manager.export_state())
+            last = marker
+        except Exception as e:
+            logger.warning("⚠️ No se pudo escribir la caché compartida: %s", e)
+
+
+def _start_leader():
+    _state["role"] = "leader"
+    logger.info("👑 Proceso %d elegido líder: arranca el scraper", os.getpid())
+    live_cache_manager.start_background_scrapper()
+    tipoff_prefetcher.start()
+    threading.Thread(target=_export_loop, daemon=True, name="shared-cache-export").start()
+
+
+def _follow_loop():
+    """
+    Seguidor: recarga el snapshot cuando cambia el fichero y, cada cierto
+    tiempo, intenta quedarse con el liderazgo por si el líder ha muerto.
+    """
+    last_stat = None
+    next_leader_try = time.time() + LEADER_RETRY_INTERVAL
+    while True:
+        try:
+            st = os.stat(SHARED_CACHE_PATH)
+            stat_key = (st.st_ino, st.st_mtime_ns, st.st_size)
+            if stat_key != last_stat:
+                snapshot = read_snapshot()
+                if snapshot is not None:
+                    snapshot["details"] = _load_details(snapshot["details"])
+                    live_cache_manager.load_state(snapshot)
+                    _state["snapshots_loaded"] += 1
+                    # Como el líder al cerrar ciclo: el snapshot se codifica aquí, no en la primera petición
+                    live_cache_manager.get_live_matches_body()
+                last_stat = stat_key
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning("⚠️ Error leyendo la caché compartida: %s", e)
+
+        if time.time() >= next_leader_try:
+            next_leader_try = time.time() + LEADER_RETRY_INTERVAL
+            if try_become_leader():
+                _start_leader()
+                return
+
+        time.sleep(FOLLOWER_POLL_INTERVAL)
+
+
+def start_shared_mode():
+    """
+    Arranca este proceso como líder (scraper + volcado) o como seguidor
+    (lector de la caché compartida). Llamar una vez por worker.
+    """
+    if _state["role"] is not None:
+        return _state["role"]
+    if try_become_leader():
+        _start_leader()
+    else:
+        _state["role"] = "follower"
+        logger.info("👥 Proceso %d en modo seguidor de la caché compartida", os.getpid())
+        threading.Thread(target=_follow_loop, daemon=True, name="shared-cache-follow").start()
+    return _state["role"]
+
+
+def get_shared_mode_stats():
+    return {
+        "role": _state["role"],
+        "pid": os.getpid(),
+        "shared_cache_path": SHARED_CACHE_PATH,
+        "snapshots_written": _state["snapshots_written"],
+        "snapshots_loaded": _state["snapshots_loaded"],
+        "details_written": _state["details_written"],
+        "details_loaded": _state["details_loaded"],
+    }
@@ -0,0 +1,42 @@
+"""
+Tests contra las páginas y respuestas grabadas de benchmarks/fixtures, sin red.
+
+Uso (desde backend/):
+    python -m pytest -q tests
+"""
+import os
+import sys
+from collections import deque
+
+import pytest
+
+BACKEND_DIR = os.path.join(os.path.dirname(__file__), "..")
+sys.path.append(os.path.join(BACKEND_DIR, "euroleague_api", "src"))
+sys.path.insert(0, BACKEND_DIR)
+
+import live_cache_manager
+import match_timeline
+import response_cache
+
+
+@pytest.fixture
+def live_cache(monkeypatch):
+    """
+    live_cache_manager vacío para el test, sin escribir timelines en disco.
+    """
+    monkeypatch.setattr(live_cache_manager, "live_match_cache", [])
+    monkeypatch.setattr(live_cache_manager, "match_details_cache", {})
+    monkeypatch.setattr(live_cache_manager, "cache_version", 0)
+    monkeypatch.setattr(live_cache_manager, "change_log", deque(maxlen=live_cache_manager.CHANGE_LOG_SIZE))
+    monkeypatch.setattr(live_cache_manager, "games_finished", 0)
+    monkeypatch.setattr(live_cache_manager, "_live_body", {"key": None, "body": None})
+    monkeypatch.setattr(match_timeline, "append", lambda *args, **kwargs: None)
+    monkeypatch.setattr(match_timeline, "finish", lambda *args, **kwargs: False)
+    return live_cache_manager
+
+
+@pytest.fixture
+def empty_response_cache(monkeypatch):
+    monkeypatch.setattr(response_cache, "_entries", type(response_cache._entries)())
+    monkeypatch.setattr(response_cache, "_in_flight", {})
+    return response_cache
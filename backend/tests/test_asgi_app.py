@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+
+import asgi_app
+from scrapper.models import LiveMatch
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+@pytest.fixture
+def client(live_cache):
+    return asgi_app.app.test_client()
+
+
+def test_cors_preflight_for_json_post(client):
+    async def preflight():
+        return await client.options("/api/match_details/batch", headers={
+            "Origin": "https://example.com",
+            "Access-Control-Request-Method": "POST",
+            "Access-Control-Request-Headers": "content-type",
+        })
+
+    response = _run(preflight())
+    assert response.status_code == 200
+    assert response.headers["Access-Control-Allow-Origin"] == "*"
+    assert "POST" in response.headers["Access-Control-Allow-Methods"]
+    assert response.headers["Access-Control-Allow-Headers"] == "content-type"
+
+
+def test_cors_origin_on_regular_responses(client):
+    response = _run(client.get("/api/live_matches"))
+    assert response.headers["Access-Control-Allow-Origin"] == "*"
+    assert "Access-Control-Allow-Methods" not in response.headers
+
+
+def test_live_matches_encoded_once_and_304(client, live_cache):
+    live_cache.publish_live_matches([LiveMatch("Real Madrid", "Barcelona", 10, 8, "1st Quarter", "05:00", "u1")])
+    assert not live_cache.live_matches_body_ready()
+
+    async def requests():
+        first = await client.get("/api/live_matches", headers={"Accept-Encoding": "br"})
+        again = await client.get("/api/live_matches", headers={"If-None-Match": first.headers["ETag"]})
+        return first, again
+
+    first, again = _run(requests())
+    assert first.status_code == 200
+    # La primera petición codifica la versión (en el executor); la siguiente sirve esos bytes
+    assert live_cache.live_matches_body_ready()
+    assert first.headers["ETag"].strip('"').startswith(live_cache.get_live_matches_body().etag)
+    assert again.status_code == 304
+
+
+def test_batch_post_rejects_malformed_body(client):
+    response = _run(client.post("/api/match_details/batch", json={"urls": "https://www.flashscore.com/match/x/"}))
+    assert response.status_code == 400
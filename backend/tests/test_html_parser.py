@@ -0,0 +1,61 @@
+import pytest
+
+from benchmarks.fixture_server import load_fixture
+from scrapper.html_parser import PageStructureError, parse_live_matches_html, parse_match_details_html
+
+
+@pytest.fixture(scope="module")
+def live_matches():
+    return parse_live_matches_html(load_fixture("flashscore_live.html", "r"))
+
+
+@pytest.fixture(scope="module")
+def details():
+    return parse_match_details_html(load_fixture("flashscore_match.html", "r"))
+
+
+def test_live_matches_only_live_rows(live_matches):
+    # La página trae otros 10 partidos que no están en vivo: sólo cuentan los 9 en vivo
+    assert len(live_matches) == 9
+    assert len({match.url for match in live_matches}) == 9
+
+
+def test_live_match_fields(live_matches):
+    first = live_matches[0]
+    assert (first.team1, first.team2) == ("Real Madrid", "Barcelona")
+    assert (first.score1, first.score2) == (70, 59)
+    assert (first.quarter, first.time) == ("4th Quarter", "00:04")
+    assert first.url == "https://www.flashscore.com/match/MADBARLv00/#/match-summary/match-summary"
+
+
+def test_live_matches_without_section():
+    with pytest.raises(PageStructureError):
+        parse_live_matches_html("<html><body></body></html>")
+
+
+def test_match_details_scores(details):
+    assert (details.home_team, details.away_team) == ("Real Madrid", "Barcelona")
+    assert details.error is None
+    scores = details.quarter_scores
+    assert scores.home[:4] == (27, 20, 27, 22)
+    assert scores.away[:4] == (18, 25, 20, 19)
+    assert (scores.home_total, scores.away_total) == (96, 82)
+
+
+def test_match_details_players(details):
+    assert [p.name for p in details.top_player_stats] == ["Facundo Campazzo", "Sasha Vezenkov", "Kendrick Nunn"]
+    assert details.player_stats.columns[:4] == ("PTS", "REB", "AST", "MIN")
+    campazzo = details.player_stats.players[0]
+    assert (campazzo.team, campazzo.points, campazzo.stats[0]) == ("Real Madrid", 25, 25)
+
+
+def test_match_details_team_statistics(details):
+    labels = [stat.label for stat in details.all_team_statistics]
+    assert "Field Goals Made" in labels
+    # El resumen es un subconjunto de la tabla completa
+    assert set(details.team_statistics) <= set(details.all_team_statistics)
+
+
+def test_match_details_without_container():
+    with pytest.raises(PageStructureError):
+        parse_match_details_html("<html><body></body></html>")
@@ -0,0 +1,69 @@
+from werkzeug.datastructures import ETags
+
+import api_handlers
+from scrapper.models import LiveMatch
+
+
+def _match(code, score1, score2, quarter="2nd Quarter", clock="05:00"):
+    return LiveMatch("Real Madrid", "Barcelona", score1, score2, quarter, clock,
+                     f"https://www.flashscore.com/match/{code}/#/match-summary/match-summary")
+
+
+def _since(version, etags=ETags()):
+    return api_handlers.live_matches(version, etags)
+
+
+def test_since_returns_only_changed_matches(live_cache):
+    live_cache.publish_live_matches([_match("A", 10, 8), _match("B", 20, 22)])
+    version = live_cache.cache_version
+    live_cache.publish_live_matches([_match("A", 12, 8), _match("B", 20, 22)])
+
+    result = _since(version)
+    assert result.status == 200
+    assert [m.url for m in result.payload["matches"]] == [_match("A", 0, 0).url]
+    assert result.payload["removed"] == []
+    assert result.payload["full"] is False
+    assert result.payload["version"] == live_cache.cache_version
+
+
+def test_since_reports_removed_matches(live_cache):
+    live_cache.publish_live_matches([_match("A", 10, 8), _match("B", 20, 22)])
+    version = live_cache.cache_version
+    live_cache.publish_live_matches([_match("A", 10, 8)])
+
+    result = _since(version)
+    assert result.payload["matches"] == []
+    assert result.payload["removed"] == [_match("B", 0, 0).url]
+
+
+def test_unchanged_match_keeps_its_version(live_cache):
+    live_cache.publish_live_matches([_match("A", 10, 8)])
+    first = live_cache.live_match_cache[0]
+    live_cache.publish_live_matches([_match("A", 10, 8)])
+    assert live_cache.live_match_cache[0] is first
+    assert _since(live_cache.cache_version).payload["matches"] == []
+
+
+def test_since_matching_etag_is_304(live_cache):
+    live_cache.publish_live_matches([_match("A", 10, 8)])
+    first = _since(0)
+    assert first.status == 200 and first.weak
+
+    again = _since(0, ETags(weak_etags=[first.etag]))
+    assert again.status == 304
+    assert again.etag == first.etag
+
+
+def test_since_etag_changes_with_new_version(live_cache):
+    live_cache.publish_live_matches([_match("A", 10, 8)])
+    first = _since(0)
+    live_cache.publish_live_matches([_match("A", 12, 8)])
+    assert _since(0, ETags(weak_etags=[first.etag])).status == 200
+
+
+def test_since_beyond_change_log_returns_full_snapshot(live_cache):
+    live_cache.publish_live_matches([_match("A", 10, 8), _match("B", 20, 22)])
+    # Una versión futura (p. ej. de antes de reiniciar el servidor) no está cubierta por el log
+    result = _since(live_cache.cache_version + 50)
+    assert result.payload["full"] is True
+    assert len(result.payload["matches"]) == 2
@@ -0,0 +1,90 @@
+import pytest
+from werkzeug.datastructures import ETags, MultiDict
+
+import api_handlers
+from benchmarks.fixture_server import load_fixture
+from scrapper.html_parser import parse_match_details_html
+
+URL = "https://www.flashscore.com/match/MADBARLv00/#/match-summary/match-summary"
+
+
+@pytest.fixture
+def details_cache(live_cache):
+    live_cache.publish_match_details(URL, parse_match_details_html(load_fixture("flashscore_match.html", "r")))
+    return live_cache
+
+
+def _batch(urls=None, ids=None, fields=None, view=None, etags=ETags()):
+    return api_handlers.match_details_batch(urls, ids, fields, view, etags)
+
+
+def test_fields_keep_only_requested_and_versioning(details_cache):
+    result = _batch(urls=[URL], fields=["quarter_scores", "home_team_id"])
+    assert result.status == 200
+    assert set(result.payload["details"][URL]) == {"quarter_scores", "home_team_id", "version", "hash", "error"}
+    assert result.payload["details"][URL]["home_team_id"] == "MAD"
+
+
+def test_unknown_fields_are_rejected(details_cache):
+    result = _batch(urls=[URL], fields=["home_total"])
+    assert result.status == 400
+    assert "home_total" in result.payload["error"]
+
+
+def test_unknown_view_is_rejected(details_cache):
+    assert _batch(view="nope").status == 400
+
+
+def test_card_view(details_cache):
+    result = _batch(urls=[URL], view="card")
+    assert set(result.payload["details"][URL]) == set(api_handlers.DETAILS_VIEWS["card"]) | {"version", "hash", "error"}
+
+
+def test_lookup_by_id_and_missing(details_cache):
+    result = _batch(ids=["MADBARLv00", "NOPE"])
+    assert list(result.payload["details"]) == [URL]
+    assert result.payload["missing"] == ["NOPE"]
+
+
+def test_same_request_is_304(details_cache):
+    first = _batch(urls=[URL])
+    assert _batch(urls=[URL], etags=ETags([first.etag])).status == 304
+
+
+def test_etag_depends_on_missing_set(details_cache):
+    first = _batch(ids=["MADBARLv00", "NOPE1"])
+    second = _batch(ids=["MADBARLv00", "NOPE2"], etags=ETags([first.etag]))
+    assert second.status == 200
+    assert second.etag != first.etag
+
+
+def test_etag_changes_when_details_change(details_cache):
+    first = _batch(urls=[URL])
+    details = details_cache.match_details_cache[URL]
+    details_cache.publish_match_details(URL, details.__class__.failed("gone"))
+    assert _batch(urls=[URL], etags=ETags([first.etag])).status == 200
+
+
+@pytest.mark.parametrize("value, everything", [("1", True), ("true", True), ("0", False), ("false", False)])
+def test_query_all_flag(value, everything):
+    urls, ids, _, _ = api_handlers.batch_args_from_query(MultiDict([("all", value), ("id", "abc")]))
+    assert (ids is None) == everything
+
+
+@pytest.mark.parametrize("body", [
+    {"urls": URL},
+    {"ids": "abc"},
+    {"fields": "quarter_scores"},
+    {"urls": [1, 2]},
+    {"view": ["card"]},
+    ["not", "an", "object"],
+])
+def test_malformed_body_is_rejected(body):
+    with pytest.raises(ValueError):
+        api_handlers.batch_args_from_body(body)
+
+
+def test_body_args():
+    body = {"urls": [URL], "fields": ["quarter_scores"], "view": None, "all": False}
+    assert api_handlers.batch_args_from_body(body) == ([URL], None, ["quarter_scores"], None)
+    assert api_handlers.batch_args_from_body(None) == (None, None, None, None)
@@ -0,0 +1,84 @@
+import threading
+import time
+
+
+def _wait_refresh(cache, key, timeout=2):
+    deadline = time.time() + timeout
+    while key in cache._in_flight and time.time() < deadline:
+        time.sleep(0.01)
+
+
+def test_fresh_entry_is_served_from_cache(empty_response_cache):
+    cache = empty_response_cache
+    calls = []
+    fetch = lambda: calls.append(1) or ["a"]
+    assert cache.cached_call(("t", "fresh"), fetch, 60, 60) == ["a"]
+    assert cache.cached_call(("t", "fresh"), fetch, 60, 60) == ["a"]
+    assert len(calls) == 1
+
+
+def test_stale_entry_is_served_while_refreshing(empty_response_cache):
+    cache = empty_response_cache
+    values = iter([["old"], ["new"]])
+    fetch = lambda: next(values)
+    key = ("t", "stale")
+    # ttl 0: la entrada caduca al momento pero sigue siendo utilizable durante stale_ttl
+    assert cache.cached_call(key, fetch, 0, 60) == ["old"]
+    assert cache.cached_call(key, fetch, 0, 60) == ["old"]
+    _wait_refresh(cache, key)
+    assert cache._entries[key]["value"] == ["new"]
+
+
+def test_expired_entry_is_fetched_again(empty_response_cache):
+    cache = empty_response_cache
+    values = iter([["old"], ["new"]])
+    key = ("t", "expired")
+    cache.cached_call(key, lambda: next(values), 60, 60)
+    cache._entries[key]["fresh_until"] = cache._entries[key]["stale_until"] = 0.0
+    assert cache.cached_call(key, lambda: next(values), 60, 60) == ["new"]
+
+
+def test_concurrent_misses_share_one_fetch(empty_response_cache):
+    cache = empty_response_cache
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        release.wait(2)
+        return ["shared"]
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.cached_call(("t", "single"), fetch, 60, 60)))
+               for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    while len(cache._in_flight) == 0:
+        time.sleep(0.01)
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join(2)
+    assert len(calls) == 1
+    assert results == [["shared"]] * 5
+
+
+def test_empty_refresh_keeps_previous_value(empty_response_cache):
+    cache = empty_response_cache
+    values = iter([["good"], []])
+    key = ("t", "empty")
+    cache.cached_call(key, lambda: next(values), 0, 60)
+    cache.cached_call(key, lambda: next(values), 0, 60)
+    _wait_refresh(cache, key)
+    assert cache._entries[key]["value"] == ["good"]
+
+
+def test_entries_are_bounded(empty_response_cache, monkeypatch):
+    cache = empty_response_cache
+    monkeypatch.setattr(cache, "MAX_ENTRIES", 3)
+    for i in range(5):
+        cache.cached_call(("t", i), lambda: [i], 60, 60)
+    # ("t", 2) se acaba de usar: se descartan las más antiguas y ella se queda
+    cache.cached_call(("t", 2), lambda: ["unused"], 60, 60)
+    cache.cached_call(("t", 5), lambda: [5], 60, 60)
+    assert list(cache._entries) == [("t", 4), ("t", 2), ("t", 5)]
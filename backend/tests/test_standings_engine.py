@@ -0,0 +1,46 @@
+from euroleague_api_wrappers.standings_engine import _SeasonTable
+
+
+def _table(games):
+    table = _SeasonTable(2025)
+    for game_id, (home, away, home_score, away_score) in enumerate(games):
+        table.apply_game(game_id, (home, home), (away, away), home_score, away_score)
+    return table
+
+
+def test_more_wins_ranks_first():
+    table = _table([("A", "B", 80, 70), ("A", "C", 80, 70), ("C", "B", 90, 60)])
+    assert table.rank() == ["A", "C", "B"]
+
+
+def test_head_to_head_beats_point_difference():
+    # A y B con una victoria: B tiene +39 de diferencia y A +1, pero A ganó el duelo directo
+    table = _table([("A", "B", 71, 70), ("B", "C", 100, 60)])
+    assert table.rank() == ["A", "B", "C"]
+
+
+def test_circular_tie_falls_back_to_point_difference():
+    # Se ganan en círculo (un duelo cada uno): B +39, A -9, C -30
+    table = _table([("A", "B", 71, 70), ("B", "C", 100, 60), ("C", "A", 80, 70)])
+    assert table.rank() == ["B", "A", "C"]
+
+
+def test_same_difference_falls_back_to_points_for():
+    # A y B sin duelo directo y con +10 los dos: pasa delante quien anotó más
+    table = _table([("B", "C", 70, 60), ("A", "C", 90, 80)])
+    assert table.rank() == ["A", "B", "C"]
+
+
+def test_apply_game_is_idempotent():
+    table = _table([("A", "B", 80, 70)])
+    assert table.apply_game(0, ("A", "A"), ("B", "B"), 80, 70) is False
+    assert table.teams["A"]["won"] == 1
+
+
+def test_copy_does_not_touch_published_table():
+    table = _table([("A", "B", 80, 70)])
+    clone = table.copy()
+    clone.apply_game(1, ("B", "B"), ("A", "A"), 90, 60)
+    assert table.teams["B"]["won"] == 0
+    assert table.teams["A"]["form"] == ["W"]
+    assert clone.teams["A"]["form"] == ["W", "L"]
@@ -0,0 +1,160 @@
+"""
+Prefetch de inicios de partido para el scraper.
+
+Con las horas del calendario (ScheduleIndex.upcoming), TIPOFF_PREFETCH_LEAD
+segundos antes de cada inicio se arrancan los drivers de Chrome que falten
+(si los scrapeos acaban en Selenium, como backend o como respaldo del HTTP)
+y se lanza un ciclo de scraping, que deja cargada la página de la liga (y la
+conexión HTTP abierta si es ese el backend). Desde la hora de inicio se adelantan
+ciclos cada TIPOFF_POLL_INTERVAL hasta ver los partidos en vivo (cruzando por
+id de equipo) o hasta TIPOFF_WINDOW. Sin esto el scraper en reposo
+(IDLE_INTERVAL) podía tardar un ciclo entero en verlos.
+
+Las urls de Flashscore de cada partido no vienen en el calendario de la
+Euroliga: se resuelven en esos ciclos adelantados. Corre sólo en el proceso
+que scrapea.
+"""
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+import live_cache_manager
+import metrics
+from app_logging import get_logger
+from euroleague_api_wrappers.scheduled_games_wrapper import get_schedule_index
+from scrapper import backends
+from scrapper.driver_pool import driver_pool
+
+logger = get_logger(__name__)
+
+TIPOFF_PREFETCH_ENABLED = os.environ.get("LIVE_TIPOFF_PREFETCH", "1") == "1"
+TIPOFF_PREFETCH_LEAD = float(os.environ.get("LIVE_TIPOFF_PREFETCH_LEAD", "300"))
+TIPOFF_POLL_INTERVAL = 15       # ciclos adelantados desde la hora de inicio hasta verlo en vivo
+TIPOFF_WINDOW = 15 * 60         # pasado esto sin verlo en vivo se deja al planificador normal
+CHECK_INTERVAL = 60             # como mucho se duerme esto: el calendario puede cambiar
+
+tipoff_prefetches = metrics.Counter("tipoff_prefetch_total", "Acciones del prefetcher de inicios de partido")
+
+_lock = threading.Lock()
+_state = {"running": False, "warm_ups": 0, "early_cycles": 0, "tipoffs": []}
+_warmed = set()      # inicios (datetime) ya precalentados
+_next_poll = {}      # inicio -> instante del próximo ciclo adelantado
+
+
+def _tipoffs(index, now):
+    """
+    Partidos agrupados por hora de inicio, desde TIPOFF_WINDOW atrás hasta
+    el próximo chequeo más la antelación.
+    """
+    horizon = now + timedelta(seconds=TIPOFF_PREFETCH_LEAD + CHECK_INTERVAL)
+    groups = {}
+    for dt, match in index.upcoming(now - timedelta(seconds=TIPOFF_WINDOW)):
+        if dt > horizon:
+            break
+        groups.setdefault(dt, []).append(match)
+    return groups
+
+
+def _live_pairs():
+    return {(m.team1_id, m.team2_id) for m in live_cache_manager.get_cached_live_matches()}
+
+
+def _is_live(match, live_pairs):
+    pair = (match.get("home_team_id"), match.get("away_team_id"))
+    return None not in pair and pair in live_pairs
+
+
+def _warm_sessions(tipoff, games):
+    """
+    Antelación: los drivers que falten (si se está usando Selenium) y un
+    ciclo que deja cargada la página de la liga con el backend en uso. Los
+    drivers se arrancan en su propio hilo sin tocar los ocupados: si ya hay
+    un partido en vivo, su scraper no espera por el precalentamiento.
+    """
+    if backends.selenium_in_use():
+        threading.Thread(target=driver_pool.warm_up, args=(min(len(games) + 1, driver_pool.size),),
+                         daemon=True, name="driver-warmup").start()
+    live_cache_manager.request_scrape_now()
+    with _lock:
+        _state["warm_ups"] += 1
+    tipoff_prefetches.inc(action="warm_up")
+    logger.info("🌡️ Scraper precalentado para %d partidos a las %s", len(games), tipoff.strftime("%H:%M"))
+
+
+def step(now=None):
+    """
+    Una pasada del prefetcher. Devuelve cuántos segundos dormir hasta la siguiente.
+    """
+    now = now or datetime.now()
+    index = get_schedule_index()
+    if index is None:
+        return CHECK_INTERVAL
+
+    groups = _tipoffs(index, now)
+    live_pairs = _live_pairs()
+    wake_at = now + timedelta(seconds=CHECK_INTERVAL)
+    summary = []
+    for tipoff, games in sorted(groups.items()):
+        pending = [g for g in games if not _is_live(g, live_pairs)]
+        warm_at = tipoff - timedelta(seconds=TIPOFF_PREFETCH_LEAD)
+
+        if tipoff not in _warmed and tipoff > now:
+            if now >= warm_at:
+                _warmed.add(tipoff)
+                _warm_sessions(tipoff, games)
+            else:
+                wake_at = min(wake_at, warm_at)
+
+        if pending and now >= tipoff:
+            poll_at = _next_poll.get(tipoff, tipoff)
+            if now >= poll_at:
+                live_cache_manager.request_scrape_now()
+                with _lock:
+                    _state["early_cycles"] += 1
+                tipoff_prefetches.inc(action="early_cycle")
+                poll_at = now + timedelta(seconds=TIPOFF_POLL_INTERVAL)
+                _next_poll[tipoff] = poll_at
+            wake_at = min(wake_at, poll_at)
+        elif pending:
+            wake_at = min(wake_at, tipoff)
+
+        summary.append({
+            "tipoff": tipoff.strftime("%Y-%m-%d %H:%M"),
+            "games": [f"{g['home_team']} - {g['away_team']}" for g in games],
+            "warmed": tipoff in _warmed,
+            "pending": len(pending),
+        })
+
+    # Olvida los inicios que ya han salido de la ventana
+    for tipoff in [t for t in _next_poll if t not in groups]:
+        del _next_poll[tipoff]
+    _warmed.intersection_update(groups)
+    with _lock:
+        _state["tipoffs"] = summary
+    return max(1.0, (wake_at - now).total_seconds())
+
+
+def _prefetch_loop():
+    while True:
+        try:
+            wait = step()
+        except Exception as e:
+            logger.error("❌ Error en el prefetcher de inicios: %s", e)
+            wait = CHECK_INTERVAL
+        time.sleep(wait)
+
+
+def start():
+    """
+    Sólo en el proceso que scrapea (junto a start_background_scrapper).
+    """
+    if not TIPOFF_PREFETCH_ENABLED or _state["running"]:
+        return
+    _state["running"] = True
+    threading.Thread(target=_prefetch_loop, daemon=True, name="tipoff-prefetch").start()
+
+
+def get_prefetch_stats():
+    with _lock:
+        return dict(_state, lead=TIPOFF_PREFETCH_LEAD, tipoffs=list(_state["tipoffs"]))
@@ -0,0 +1,257 @@
+"""
+Capa común para las llamadas a fuentes externas (Flashscore, API de la Euroliga).
+
+Cada fuente tiene su timeout por intento, unos pocos reintentos con espera
+exponencial y jitter, y un circuit breaker: tras BREAKER_FAILURES fallos
+seguidos la fuente se da por caída y durante el enfriamiento las llamadas
+fallan al momento con UpstreamUnavailable, sin esperar a ningún timeout.
+Quien llama ya sabe servir el último dato bueno (snapshot en vivo, índice
+del calendario, metadata anterior, caché de respuestas), así que una fuente
+degradada no arrastra la duración de los ciclos ni la de las peticiones.
+
+Pasado el enfriamiento se deja pasar una única llamada de prueba (half-open):
+si sale bien el circuito se cierra; si falla se vuelve a abrir con el doble de
+enfriamiento (hasta BREAKER_MAX_COOLDOWN).
+
+Sólo cuentan como fallo los errores de disponibilidad (conexión, timeout, 5xx,
+429). Si la fuente contesta con algo que no sabemos leer (404, página con otra
+estructura) el error sube tal cual y el circuito sigue cerrado.
+"""
+import os
+import random
+import threading
+import time
+
+import requests
+
+import metrics
+from app_logging import get_logger
+
+logger = get_logger(__name__)
+
+BREAKER_FAILURES = int(os.environ.get("UPSTREAM_BREAKER_FAILURES", "3"))
+BREAKER_COOLDOWN = float(os.environ.get("UPSTREAM_BREAKER_COOLDOWN", "30"))
+BREAKER_MAX_COOLDOWN = float(os.environ.get("UPSTREAM_BREAKER_MAX_COOLDOWN", "300"))
+# Espera antes del reintento n: aleatoria entre 0 y min(RETRY_BACKOFF_MAX, RETRY_BACKOFF * 2^(n-1))
+RETRY_BACKOFF = float(os.environ.get("UPSTREAM_RETRY_BACKOFF", "0.5"))
+RETRY_BACKOFF_MAX = float(os.environ.get("UPSTREAM_RETRY_BACKOFF_MAX", "4"))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class UpstreamUnavailable(Exception):
+    """
+    El circuito de la fuente está abierto: no se ha llegado a llamar.
+    """
+
+
+class UpstreamTimeout(Exception):
+    """
+    La fuente respondió pero no a tiempo (p. ej. la página no terminó de pintarse).
+    """
+
+
+def _source(name, timeout, retries):
+    """
+    Timeout (segundos por intento) y reintentos de una fuente, con
+    UPSTREAM_<FUENTE>_TIMEOUT / UPSTREAM_<FUENTE>_RETRIES para cambiarlos.
+    """
+    prefix = f"UPSTREAM_{name.upper()}_"
+    timeout = os.environ.get(prefix + "TIMEOUT", timeout)
+    return {
+        "timeout": None if timeout is None else float(timeout),
+        "retries": int(os.environ.get(prefix + "RETRIES", retries)),
+    }
+
+
+# timeout None: lo pone el cliente (euroleague_api usa 60s y no deja cambiarlo);
+# ahí es el breaker el que evita esperarlo en cada llamada.
+SOURCES = {
+    "flashscore_http": _source("flashscore_http", os.environ.get("SCRAPER_HTTP_TIMEOUT", 10), 1),
+    # Espera a que la página pinte los partidos; un reintento con Chrome cuesta un ciclo
+    "flashscore_selenium": _source("flashscore_selenium", 10, 0),
+    "euroleague_schedules": _source("euroleague_schedules", 15, 2),
+    "euroleague_results_round": _source("euroleague_results_round", 15, 2),
+    "euroleague_season": _source("euroleague_season", None, 1),
+    "euroleague_standings": _source("euroleague_standings", None, 1),
+}
+_DEFAULT_SOURCE = {"timeout": None, "retries": 0}
+
+RETRYABLE = (requests.ConnectionError, requests.Timeout, UpstreamTimeout)
+
+
+def timeout(source):
+    return SOURCES.get(source, _DEFAULT_SOURCE)["timeout"]
+
+
+class CircuitBreaker:
+    def __init__(self, source):
+        self.source = source
+        self.state = CLOSED
+        self.failures = 0  # fallos seguidos
+        self.cooldown = BREAKER_COOLDOWN
+        self.opened_at = None
+        self.probing = False
+        self.last_error = None
+        self.stats = {"calls": 0, "failures": 0, "retries": 0, "rejected": 0, "opened": 0}
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """
+        True si la llamada puede salir. Con el circuito abierto sólo pasa la
+        primera llamada tras el enfriamiento (la de prueba).
+        """
+        with self._lock:
+            if self.state == OPEN and time.time() - self.opened_at >= self.cooldown:
+                self.state = HALF_OPEN
+                self.probing = False
+            if self.state == OPEN or (self.state == HALF_OPEN and self.probing):
+                self.stats["rejected"] += 1
+                return False
+            if self.state == HALF_OPEN:
+                self.probing = True
+            self.stats["calls"] += 1
+            return True
+
+    def record_success(self):
+        with self._lock:
+            if self.state != CLOSED:
+                logger.info("✅ %s responde otra vez: circuito cerrado", self.source)
+            self.state = CLOSED
+            self.failures = 0
+            self.cooldown = BREAKER_COOLDOWN
+            self.probing = False
+
+    def record_failure(self, error):
+        with self._lock:
+            self.failures += 1
+            self.stats["failures"] += 1
+            self.last_error = f"{type(error).__name__}: {error}"
+            if self.state == HALF_OPEN:
+                self.cooldown = min(self.cooldown * 2, BREAKER_MAX_COOLDOWN)
+                self._open()
+            elif self.state == CLOSED and self.failures >= BREAKER_FAILURES:
+                self._open()
+
+    def _open(self):
+        self.state = OPEN
+        self.opened_at = time.time()
+        self.probing = False
+        self.stats["opened"] += 1
+        logger.warning("🔌 %s: %d fallos seguidos, circuito abierto %.0fs (%s)",
+                       self.source, self.failures, self.cooldown, self.last_error)
+
+    def count_retry(self):
+        with self._lock:
+            self.stats["retries"] += 1
+
+    def degraded(self):
+        return self.state != CLOSED or self.failures > 0
+
+    def snapshot(self):
+        with self._lock:
+            retry_in = None
+            if self.state == OPEN:
+                retry_in = round(max(0.0, self.opened_at + self.cooldown - time.time()), 2)
+            config = SOURCES.get(self.source, _DEFAULT_SOURCE)
+            return dict(
+                self.stats,
+                state=self.state,
+                consecutive_failures=self.failures,
+                cooldown=self.cooldown,
+                retry_in=retry_in,
+                last_error=self.last_error,
+                timeout=config["timeout"],
+                max_retries=config["retries"],
+            )
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(source):
+    with _breakers_lock:
+        breaker = _breakers.get(source)
+        if breaker is None:
+            breaker = _breakers[source] = CircuitBreaker(source)
+        return breaker
+
+
+def is_degraded(source):
+    """
+    La fuente falló en su última llamada o tiene el circuito abierto: mejor
+    no esperar por nada opcional.
+    """
+    return get_breaker(source).degraded()
+
+
+def _retryable(error, errors):
+    if isinstance(error, RETRYABLE + tuple(errors)):
+        return True
+    response = getattr(error, "response", None)
+    return (isinstance(error, requests.HTTPError) and response is not None
+            and (response.status_code >= 500 or response.status_code == 429))
+
+
+def _backoff(attempt):
+    return random.uniform(0, min(RETRY_BACKOFF_MAX, RETRY_BACKOFF * 2 ** (attempt - 1)))
+
+
+def call(source, fn, *args, errors=(), **kwargs):
+    """
+    Llama a fn(*args, **kwargs) contra `source` a través de su breaker.
+
+    Los errores de disponibilidad (RETRYABLE, 5xx/429 y los de `errors`) se
+    reintentan hasta los reintentos de la fuente; si se agotan cuentan como
+    un fallo y se relanza el último. Con el circuito abierto lanza
+    UpstreamUnavailable sin llamar.
+    """
+    breaker = get_breaker(source)
+    if not breaker.allow():
+        raise UpstreamUnavailable(f"{source}: circuito abierto")
+    retries = SOURCES.get(source, _DEFAULT_SOURCE)["retries"]
+    attempt = 0
+    while True:
+        try:
+            with metrics.track_upstream(source):
+                result = fn(*args, **kwargs)
+        except Exception as e:
+            if not _retryable(e, errors):
+                # La fuente contestó: el error es nuestro o del contenido
+                breaker.record_success()
+                raise
+            # La llamada de prueba no se reintenta: decide ella sola
+            if attempt < retries and breaker.state == CLOSED:
+                attempt += 1
+                breaker.count_retry()
+                logger.debug("🔁 %s falló (%s), reintento %d/%d", source, e, attempt, retries)
+                time.sleep(_backoff(attempt))
+                continue
+            breaker.record_failure(e)
+            raise
+        breaker.record_success()
+        return result
+
+
+def get_upstream_stats():
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.source: breaker.snapshot() for breaker in breakers}
+
+
+def _breaker_values(key):
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {(("source", b.source),): key(b) for b in breakers}
+
+
+metrics.Gauge("upstream_breaker_state", "Circuito de cada fuente externa: 0 cerrado, 1 en prueba, 2 abierto",
+              lambda: _breaker_values(lambda b: _STATE_VALUES[b.state]))
+metrics.Gauge("upstream_rejected_total", "Llamadas que no salieron porque el circuito estaba abierto",
+              lambda: _breaker_values(lambda b: b.stats["rejected"]), kind="counter")
+metrics.Gauge("upstream_retries_total", "Reintentos de llamadas a fuentes externas",
+              lambda: _breaker_values(lambda b: b.stats["retries"]), kind="counter")
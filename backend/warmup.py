@@ -0,0 +1,103 @@
+"""
+Arranque en caliente: al arrancar cada proceso se cargan en paralelo la
+metadata de la temporada, el calendario, la clasificación y los partidos
+jugados, a través de los mismos api_handlers que los endpoints. La caché de
+respuestas (y la del calendario y la metadata debajo) queda llena y
+serializada antes de la primera petición, en vez de pagar cada fetch en
+frío la primera vez que alguien abre la web.
+
+Cada worker tiene su propia caché de respuestas, así que se llama en todos
+(líder y seguidores); el scraper arranca por su lado (shared_cache).
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import api_handlers
+import metrics
+from app_logging import get_logger
+from euroleague_api_wrappers.season_metadata import get_season_metadata
+from euroleague_api_wrappers.season_utils import get_current_season_code
+
+logger = get_logger(__name__)
+
+WARMUP_ENABLED = os.environ.get("LIVE_WARMUP", "1") == "1"
+
+warmup_seconds = metrics.Histogram("warmup_seconds", "Duración de cada tarea del arranque en caliente")
+
+_lock = threading.Lock()
+_warmup = {"started_at": None, "finished_at": None, "tasks": {}}
+
+
+def _season_metadata():
+    get_season_metadata(get_current_season_code())
+
+
+def _endpoint(handler, *args):
+    """
+    Los handlers no lanzan: devuelven un ApiResult con status 500.
+    """
+    def run():
+        result = handler(*args)
+        if result.status >= 500:
+            raise RuntimeError(f"{handler.__name__} devolvió {result.status}")
+    return run
+
+
+def _warm_tasks():
+    return {
+        "season_metadata": _season_metadata,
+        "schedule": _endpoint(api_handlers.scheduled_matches, None),
+        "standings": _endpoint(api_handlers.euroleague_standings),
+        "played_matches": _endpoint(api_handlers.all_played_matches),
+        "current_round": _endpoint(api_handlers.current_round),
+    }
+
+
+def _run_task(name, fn):
+    started = time.time()
+    try:
+        with warmup_seconds.time(task=name):
+            fn()
+        return {"ok": True, "seconds": round(time.time() - started, 3)}
+    except Exception as e:
+        logger.warning("⚠️ Arranque en caliente: %s falló: %s", name, e)
+        return {"ok": False, "seconds": round(time.time() - started, 3), "error": str(e)}
+
+
+def warm_up():
+    """
+    Carga en paralelo lo que piden los endpoints al abrir la web. Una tarea
+    que falla no para las demás: su endpoint hará el fetch en frío como antes.
+    """
+    tasks = _warm_tasks()
+    with _lock:
+        _warmup.update(started_at=time.time(), finished_at=None, tasks={})
+    with ThreadPoolExecutor(max_workers=len(tasks), thread_name_prefix="warmup") as executor:
+        futures = {executor.submit(_run_task, name, fn): name for name, fn in tasks.items()}
+        for future in as_completed(futures):
+            with _lock:
+                _warmup["tasks"][futures[future]] = future.result()
+    with _lock:
+        _warmup["finished_at"] = time.time()
+        elapsed = _warmup["finished_at"] - _warmup["started_at"]
+        failed = [name for name, task in _warmup["tasks"].items() if not task["ok"]]
+    logger.info("🔥 Arranque en caliente en %.2fs (%d tareas, fallidas: %s)", elapsed, len(tasks), failed or "ninguna")
+
+
+def start_warm_up():
+    """
+    En segundo plano: el proceso empieza a servir ya; las peticiones que
+    lleguen mientras tanto esperan al mismo fetch (response_cache).
+    """
+    if not WARMUP_ENABLED:
+        return
+    threading.Thread(target=warm_up, daemon=True, name="warmup").start()
+
+
+def get_warmup_stats():
+    with _lock:
+        return dict(_warmup, tasks=dict(_warmup["tasks"]))
+
+
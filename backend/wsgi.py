@@ -0,0 +1,23 @@
+"""
+Punto de entrada para producción con varios workers:
+
+    gunicorn -w 4 --threads 8 -b 0.0.0.0:5000 wsgi:app
+
+Cada worker sirve /api/*; sólo el que gana la elección de líder scrapea
+(ver shared_cache), y todos precargan su caché de respuestas al
+arrancar (ver warmup). No usar --preload: la elección tiene que ocurrir en
+cada worker, después del fork.
+
+/api/live_stream (SSE) ocupa un hilo por cliente conectado, así que con
+gthread cada worker acepta como mucho FLASK_SSE_MAX_STREAMS streams y al resto
+le contesta 503 (que siguen con polling). Para servir SSE a muchos clientes
+usar asgi_app (uvicorn) o un worker asíncrono:
+
+    gunicorn -w 4 -k gevent --worker-connections 1000 -b 0.0.0.0:5000 wsgi:app
+"""
+from app_V0 import app
+from shared_cache import start_shared_mode
+from warmup import start_warm_up
+
+start_shared_mode()
+start_warm_up()
@@ -1,6 +1,7 @@
-import React, { useState, useEffect } from "react";
+import React, { useState, useEffect, useMemo } from "react";
 import TeamDisplay from "./TeamDisplay";
 import MatchCard from "./MatchCard";
+import { getTeamFromStandings, indexStandingsById } from "../utils/getTeamFromStandings";
 import {
   BarChart,
   Bar,
@@ -20,6 +21,7 @@ const LiveMatches = () => {
   const [loading, setLoading] = useState(true);
   const [standings, setStandings] = useState([]);
   const [currentRound, setCurrentRound] = useState(null);
+  const [streaming, setStreaming] = useState(false);
 
   useEffect(() => {
     fetch("/api/euroleague_standings")
@@ -38,6 +40,9 @@ const LiveMatches = () => {
   }, []);
 
   useEffect(() => {
+    let intervalId = null;
+    let source = null;
+
     const fetchLiveMatches = () => {
       fetch("/api/live_matches")
         .then((res) => res.json())
@@ -52,39 +57,100 @@ const LiveMatches = () => {
         });
     };
 
-    fetchLiveMatches();
-    const intervalId = setInterval(fetchLiveMatches, 10000);
-    return () => clearInterval(intervalId);
+    const startPolling = () => {
+      if (intervalId) return;
+      fetchLiveMatches();
+      intervalId = setInterval(fetchLiveMatches, 10000);
+    };
+
+    const stopPolling = () => {
+      clearInterval(intervalId);
+      intervalId = null;
+    };
+
+    if (typeof EventSource === "undefined") {
+      startPolling();
+    } else {
+      // Push: snapshot al conectar y luego sólo los partidos que cambian
+      source = new EventSource("/api/live_stream");
+
+      source.addEventListener("snapshot", (event) => {
+        const data = JSON.parse(event.data);
+        stopPolling();
+        setMatches(data.matches || []);
+        setMatchDetails(data.details || {});
+        setLastUpdated(data.last_updated || null);
+        setLoading(false);
+        setStreaming(true);
+      });
+
+      source.addEventListener("update", (event) => {
+        const data = JSON.parse(event.data);
+        stopPolling();
+        setMatches((prev) => {
+          const changed = Object.fromEntries(data.matches.map((m) => [m.url, m]));
+          const kept = prev
+            .filter((m) => !data.removed.includes(m.url))
+            .map((m) => changed[m.url] || m);
+          const added = data.matches.filter(
+            (m) => !prev.some((p) => p.url === m.url)
+          );
+          return [...kept, ...added];
+        });
+        setMatchDetails((prev) => {
+          const next = { ...prev, ...data.details };
+          data.details_removed.forEach((url) => delete next[url]);
+          return next;
+        });
+        setLastUpdated(data.last_updated || null);
+        setStreaming(true);
+      });
+
+      source.onerror = () => {
+        // EventSource reconecta solo; mientras tanto seguimos con polling
+        setStreaming(false);
+        startPolling();
+      };
+    }
+
+    return () => {
+      stopPolling();
+      if (source) source.close();
+    };
   }, []);
 
   useEffect(() => {
+    // Con el stream activo los detalles llegan por push
+    if (streaming) return;
+
     const fetchDetailsForVisibleMatches = () => {
-      matches.forEach((match) => {
-        const url = match.url;
-        if (detailsVisibility[url]) {
-          fetch(`/api/match_details?url=${encodeURIComponent(url)}`)
-            .then((res) => res.json())
-            .then((data) => {
-              setMatchDetails((prev) => ({ ...prev, [url]: data }));
-            })
-            .catch((err) => console.error("Error fetching match details:", err));
-        }
-      });
+      const urls = matches
+        .map((match) => match.url)
+        .filter((url) => detailsVisibility[url]);
+      if (urls.length === 0) return;
+
+      // Una sola petición para todos los partidos abiertos
+      fetch("/api/match_details/batch", {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({ urls, view: "summary" }),
+      })
+        .then((res) => res.json())
+        .then((data) => {
+          setMatchDetails((prev) => ({ ...prev, ...(data.details || {}) }));
+        })
+        .catch((err) => console.error("Error fetching match details:", err));
     };
 
     fetchDetailsForVisibleMatches();
     const interval = setInterval(fetchDetailsForVisibleMatches, 10000);
     return () => clearInterval(interval);
-  }, [detailsVisibility, matches]);
+  }, [detailsVisibility, matches, streaming]);
 
-  const normalize = (str) =>
-    str.toLowerCase().replace(/[^a-z]/g, "").slice(0, 6);
+  const standingsById = useMemo(() => indexStandingsById(standings), [standings]);
 
-  const getTeamData = (teamName) => {
-    const target = normalize(teamName);
-    const team = standings.find(
-      (team) => normalize(team["club.name"]) === target
-    );
+  const getTeamData = (teamId, teamName) => {
+    const team = getTeamFromStandings(teamId, standingsById);
     if (!team) {
       console.warn("❌ Team not found in standings:", teamName);
     }
@@ -95,11 +161,17 @@ const LiveMatches = () => {
     setDetailsVisibility((prev) => ({ ...prev, [url]: !prev[url] }));
   };
 
+  // Marcador ya numérico desde el backend; null = todavía sin marcador
+  const formatScore = (match) =>
+    match.score1 == null || match.score2 == null
+      ? "-"
+      : `${match.score1} - ${match.score2}`;
+
   const renderStatisticsChart = (stats) => {
     const data = stats.map((stat) => ({
       name: stat.label,
-      Home: parseInt(stat.home),
-      Away: parseInt(stat.away),
+      Home: stat.home ?? 0,
+      Away: stat.away ?? 0,
     }));
 
     return (
@@ -142,8 +214,8 @@ const LiveMatches = () => {
           </p>
         ) : (
           matches.map((match, index) => {
-            const homeTeam = getTeamData(match.team1);
-            const awayTeam = getTeamData(match.team2);
+            const homeTeam = getTeamData(match.team1_id, match.team1);
+            const awayTeam = getTeamData(match.team2_id, match.team2);
             const details = matchDetails[match.url];
 
             return (
@@ -158,7 +230,7 @@ const LiveMatches = () => {
                   away={
                     <TeamDisplay team={awayTeam} fallback={match.team2} />
                   }
-                  score={match.score}
+                  score={formatScore(match)}
                   status={`${match.quarter} - ${match.time}`}
                 />
                 <div className="mt-4 text-center">
@@ -172,7 +244,7 @@ const LiveMatches = () => {
                   </button>
                 </div>
 
-                {detailsVisibility[match.url] && details && (
+                {detailsVisibility[match.url] && details && !details.error && (
                   <div className="mt-4 bg-gray-800 p-4 rounded-lg">
                     <h4 className="text-white font-semibold mb-2">
                       Points by Quarter
@@ -204,13 +276,13 @@ const LiveMatches = () => {
                               />
                             )}
                           </td>
-                          {details.home_quarter_scores.map((score, i) => (
+                          {details.quarter_scores.home.map((score, i) => (
                             <td key={i} className="text-center">
                               {score}
                             </td>
                           ))}
                           <td className="text-center font-bold">
-                            {details.home_total}
+                            {details.quarter_scores.home_total}
                           </td>
                         </tr>
                         <tr>
@@ -223,13 +295,13 @@ const LiveMatches = () => {
                               />
                             )}
                           </td>
-                          {details.away_quarter_scores.map((score, i) => (
+                          {details.quarter_scores.away.map((score, i) => (
                             <td key={i} className="text-center">
                               {score}
                             </td>
                           ))}
                           <td className="text-center font-bold">
-                            {details.away_total}
+                            {details.quarter_scores.away_total}
                           </td>
                         </tr>
                       </tbody>
@@ -239,7 +311,7 @@ const LiveMatches = () => {
                       <h4 className="text-white font-semibold mb-2">
                         Top 3 Players
                       </h4>
-                      {details.top_player_stats === "Not found" ? (
+                      {!details.top_player_stats ? (
                         <p className="text-gray-400">
                           No top players available
                         </p>
@@ -258,7 +330,7 @@ const LiveMatches = () => {
                       <h4 className="text-white font-semibold mb-2">
                         Team Statistics
                       </h4>
-                      {details.team_statistics === "Not found" ? (
+                      {!details.team_statistics ? (
                         <p className="text-gray-400">
                           No team statistics available
                         </p>
@@ -1,7 +1,7 @@
-import React, { useEffect, useState } from "react";
+import React, { useEffect, useMemo, useState } from "react";
 import TeamDisplay from "./TeamDisplay";
 import MatchCard from "./MatchCard";
-import { getTeamFromStandings } from "../utils/getTeamFromStandings";
+import { getTeamFromStandings, indexStandingsById } from "../utils/getTeamFromStandings";
 
 const PlayedMatches = () => {
   const [matches, setMatches] = useState([]);
@@ -59,8 +59,10 @@ const PlayedMatches = () => {
     fetchMatches(round);
   };
 
-  const getTeamData = (teamName) => {
-    const team = getTeamFromStandings(teamName, standings);
+  const standingsById = useMemo(() => indexStandingsById(standings), [standings]);
+
+  const getTeamData = (teamId, teamName) => {
+    const team = getTeamFromStandings(teamId, standingsById);
     if (!team) {
       console.warn("❌ Team not found in standings:", teamName);
     }
@@ -105,8 +107,8 @@ const PlayedMatches = () => {
       ) : (
         <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6">
           {sortedMatches.map((match, index) => {
-            const homeTeam = getTeamData(match.home_team);
-            const awayTeam = getTeamData(match.away_team);
+            const homeTeam = getTeamData(match.home_team_id, match.home_team);
+            const awayTeam = getTeamData(match.away_team_id, match.away_team);
 
             const formatted = match.datetime || "Unknown date";
             const arena = match.arena || "Unknown arena";
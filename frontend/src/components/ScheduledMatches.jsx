@@ -1,6 +1,7 @@
-import React, { useEffect, useState } from "react";
+import React, { useEffect, useMemo, useState } from "react";
 import TeamDisplay from "./TeamDisplay";
 import MatchCard from "./MatchCard";
+import { getTeamFromStandings, indexStandingsById } from "../utils/getTeamFromStandings";
 
 const ScheduledMatches = () => {
   const [matches, setMatches] = useState([]);
@@ -51,17 +52,10 @@ const ScheduledMatches = () => {
       .catch((err) => console.error("Error fetching all scheduled matches:", err));
   }, []);
 
-  const normalizeName = (name) => name.toLowerCase().split(" ")[0];
+  const standingsById = useMemo(() => indexStandingsById(standings), [standings]);
 
-  const getTeamData = (teamName) => {
-    const normalize = (str) =>
-      str.toLowerCase().replace(/[^a-z]/g, "").slice(0, 6);
-
-    const target = normalize(teamName);
-
-    const team = standings.find(
-      (team) => normalize(team["club.name"]) === target
-    );
+  const getTeamData = (teamId, teamName) => {
+    const team = getTeamFromStandings(teamId, standingsById);
 
     if (!team) {
       console.warn("❌ Team not found in standings:", teamName);
@@ -128,8 +122,8 @@ const ScheduledMatches = () => {
             </p>
           ) : (
             sortedMatches.map((match, index) => {
-              const homeTeam = getTeamData(match.home_team);
-              const awayTeam = getTeamData(match.away_team);
+              const homeTeam = getTeamData(match.home_team_id, match.home_team);
+              const awayTeam = getTeamData(match.away_team_id, match.away_team);
 
               return (
                 <MatchCard
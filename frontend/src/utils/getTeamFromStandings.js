@@ -1,24 +1,11 @@
 // frontend/src/utils/getTeamFromStandings.js
 
-const teamNameMap = {
-    "FC Bayern Munich": ["FC Bayern Munich", "FC Bayern", "Bayern Munich"],
-    "FC Barcelona": ["FC Barcelona", "Barcelona", "Barça"],
-    "Real Madrid": ["Real Madrid"],
-    // Agrega más equivalencias si ves errores
-  };
-  
-  export const getTeamFromStandings = (teamName, standings) => {
-    for (const [officialName, aliases] of Object.entries(teamNameMap)) {
-      if (aliases.some(alias => teamName.toLowerCase().includes(alias.toLowerCase()))) {
-        return standings.find(
-          (team) => team["club.name"].toLowerCase() === officialName.toLowerCase()
-        );
-      }
-    }
-  
-    // Si no se encuentra en el map, intentar buscar por nombre completo
-    return standings.find(
-      (team) => team["club.name"].toLowerCase() === teamName.toLowerCase()
-    );
-  };
-  
\ No newline at end of file
+// El backend resuelve cada equipo a su id canónico (código de club de la
+// Euroliga): los cruces son por id, sin comparar nombres en el cliente.
+export const indexStandingsById = (standings) =>
+  new Map(standings.map((team) => [team.team_id, team]));
+
+export const getTeamFromStandings = (teamId, standingsById) => {
+  if (!teamId) return undefined;
+  return standingsById.get(teamId);
+};